@@ -0,0 +1,113 @@
+import os
+import sys
+import gzip
+import json
+import shutil
+import argparse
+import subprocess
+
+# =============================================================================
+# 🗜️ 数据格式对比: modules.json + wares.json (indent=2) vs 压缩 JSON vs 列式紧凑数据包
+# 比较原始 / gzip / brotli 体积；安装了 node 时额外测量浏览器同款 JSON.parse (+解码) 耗时。
+# 用法 (在项目根目录): python scripts/benchmarks/compact_output.py
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from x4_compact import encode_compact_bundle, decode_compact_bundle  # noqa: E402
+
+try:
+    import brotli  # 可选依赖: pip install brotli
+except ImportError:
+    brotli = None
+
+# 与 src/store/logic/compactGameData.ts 相同的解码步骤 (纯 JS 版本，仅用于计时)
+NODE_SCRIPT = r"""
+const fs = require('fs');
+const [pretty, minified, compact] = process.argv.slice(1).map(p => fs.readFileSync(p, 'utf8'));
+const amounts = (flat, ids) => { const m = {}; for (let i = 0; i < flat.length; i += 2) m[ids[flat[i]]] = flat[i + 1]; return m; };
+const decode = (d) => {
+  const c = d.modules, e = d.enums, out = [];
+  for (let i = 0; i < c.id.length; i++) {
+    const [capacity, needed, maxBonus] = c.workforce[i];
+    out.push({ id: c.id[i], wareId: c.wareId[i], nameId: c.nameId[i], name: c.name[i],
+      type: e['module.type'][c.type[i]], group: e['module.group'][c.group[i]], method: e['module.method'][c.method[i]],
+      race: e['module.race'][c.race[i]], isPlayerBlueprint: c.isPlayerBlueprint[i] === 1, buildTime: c.buildTime[i],
+      buildCost: amounts(c.buildCost[i], d.wareIds), cycleTime: c.cycleTime[i], workforce: { capacity, needed, maxBonus },
+      outputs: amounts(c.outputs[i], d.wareIds), inputs: amounts(c.inputs[i], d.wareIds) });
+  }
+  return out;
+};
+const time = (fn) => { for (let i = 0; i < 20; i++) fn(); const n = 200, t = process.hrtime.bigint(); for (let i = 0; i < n; i++) fn(); return Number(process.hrtime.bigint() - t) / n / 1e6; };
+const parseAll = (text) => text.split('\n\u0000\n').map(s => JSON.parse(s));
+console.log(JSON.stringify({
+  pretty: time(() => parseAll(pretty)),
+  minified: time(() => parseAll(minified)),
+  compact: time(() => JSON.parse(compact)),
+  compact_decoded: time(() => decode(JSON.parse(compact)))
+}));
+"""
+
+
+def sizes(payload):
+    row = {"raw": len(payload), "gzip": len(gzip.compress(payload, compresslevel=9, mtime=0))}
+    row["brotli"] = len(brotli.compress(payload, quality=11)) if brotli is not None else None
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比现有 JSON 与紧凑数据包的体积和解析耗时")
+    parser.add_argument('--data', default=os.path.join("src", "assets", "x4_game_data", "8.0-Diplomacy", "data"),
+                        help="处理器输出的 data 目录")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.data, "modules.json"), 'rb') as f:
+        modules_text = f.read()
+    with open(os.path.join(args.data, "wares.json"), 'rb') as f:
+        wares_text = f.read()
+    modules, wares = json.loads(modules_text), json.loads(wares_text)
+
+    bundle = encode_compact_bundle(modules, wares)
+    decoded_modules, decoded_wares = decode_compact_bundle(json.loads(json.dumps(bundle)))
+    if decoded_modules != modules or decoded_wares != wares:
+        print("❌ 紧凑数据包往返校验失败")
+        sys.exit(1)
+
+    sep = b"\n\x00\n"
+    variants = {
+        "pretty": modules_text + sep + wares_text,
+        "minified": json.dumps(modules, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + sep +
+                    json.dumps(wares, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+        "compact": json.dumps(bundle, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+    }
+
+    parse_ms = {}
+    node = shutil.which('node')
+    if node:
+        tmp_paths = []
+        for name, payload in variants.items():
+            path = os.path.join(args.data, f".bench_{name}.json")
+            with open(path, 'wb') as f:
+                f.write(payload)
+            tmp_paths.append(path)
+        try:
+            out = subprocess.run([node, '-e', NODE_SCRIPT] + tmp_paths, check=True, capture_output=True, text=True).stdout
+            parse_ms = json.loads(out)
+        finally:
+            for path in tmp_paths:
+                os.remove(path)
+
+    fmt = lambda n: f"{n / 1024:.1f} KB" if n is not None else "n/a"
+    print(f"{'format':<10} | {'raw':>10} | {'gzip':>10} | {'brotli':>10} | {'JSON.parse (ms)':>15} | {'+decode (ms)':>12}")
+    for name, payload in variants.items():
+        row = sizes(payload)
+        parse = parse_ms.get(name)
+        decoded = parse_ms.get("compact_decoded") if name == "compact" else parse
+        print(f"{name:<10} | {fmt(row['raw']):>10} | {fmt(row['gzip']):>10} | {fmt(row['brotli']):>10} | "
+              f"{(f'{parse:.2f}' if parse is not None else 'n/a'):>15} | {(f'{decoded:.2f}' if decoded is not None else 'n/a'):>12}")
+    print("✅ 紧凑数据包往返校验通过")
+
+
+if __name__ == "__main__":
+    main()
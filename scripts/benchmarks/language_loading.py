@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import argparse
+import contextlib
+import tempfile
+import tracemalloc
+
+# =============================================================================
+# 📚 语言文件加载对比: 全量载入 vs 仅保留引用闭包中的页面
+# 逐语言测量耗时与 Python 分配峰值 (tracemalloc)，并校验解析结果一致。
+# 用法 (在项目根目录): python scripts/benchmarks/language_loading.py
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+
+def measure(load):
+    # 计时与内存分开测量，避免 tracemalloc 的开销计入耗时
+    start = time.perf_counter()
+    load({})
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    lang_db = {}
+    load(lang_db)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, lang_db
+
+
+def main():
+    import x4_data_processor as processor
+    from x4_language import X4TextResolver, load_language_db, needed_pages_of
+
+    parser = argparse.ArgumentParser(description="对比全量与按页过滤的语言文件加载")
+    parser.add_argument('--raw', default=processor.X4_UNPACKED_DATA_PATH, help="解包目录 (包含 t/ 与 libraries/)")
+    args = parser.parse_args()
+
+    t_path = os.path.join(args.raw, "t")
+    if not os.path.isdir(t_path):
+        print(f"❌ 错误: 找不到语言目录: {t_path}")
+        sys.exit(1)
+
+    loader = processor.X4PrecisionLoader(args.raw, tempfile.gettempdir(), processor._config)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        loader.build_database()
+        loader.process_module_groups()
+    needed = sorted(loader.needed_raw_names)
+    needed_pages = needed_pages_of(needed)
+
+    print(f"{'lang':<6} | {'file (MB)':>9} | {'pages':>13} | {'full (ms)':>10} | {'filtered (ms)':>13} | {'full peak (MB)':>14} | {'filtered peak (MB)':>18}")
+    for x4_id, conf in processor.X4_LANG_CONFIG.items():
+        t_file = os.path.join(t_path, f"0001-L{x4_id}.xml")
+        if not os.path.exists(t_file): continue
+
+        full_s, full_peak, full_db = measure(lambda db: load_language_db(t_file, db))
+        part_s, part_peak, part_db = measure(lambda db: load_language_db(t_file, db, needed_pages))
+
+        full_res, part_res = X4TextResolver(full_db), X4TextResolver(part_db)
+        same = all(full_res.resolve(k) == part_res.resolve(k) for k in needed)
+        print(f"{conf['iso']:<6} | {os.path.getsize(t_file) / 1e6:>9.1f} | {len(part_db):>5} / {len(full_db):<5} | "
+              f"{full_s * 1000:>10.1f} | {part_s * 1000:>13.1f} | {full_peak / 1e6:>14.1f} | {part_peak / 1e6:>18.1f}"
+              f"{'' if same else '  ❌ 解析结果不一致'}")
+
+
+if __name__ == "__main__":
+    main()
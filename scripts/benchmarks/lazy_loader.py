@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+# =============================================================================
+# ⏱️ 按需加载的冷启动耗时
+# 每个场景在新的 Python 进程中运行 (不使用阶段缓存)，比较只取部分数据与完整处理的耗时。
+# 用法 (在项目根目录): python scripts/benchmarks/lazy_loader.py [--repeat 3]
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PRELUDE = f"""
+import sys, io, contextlib, tempfile
+sys.path.insert(0, {SCRIPTS_DIR!r})
+import x4_data_processor as processor
+"""
+
+SCENARIOS = {
+    "import": "",
+    "modules": "with contextlib.redirect_stdout(io.StringIO()): processor.X4PrecisionLoader.from_project().modules",
+    "wares": "with contextlib.redirect_stdout(io.StringIO()): processor.X4PrecisionLoader.from_project().wares",
+    "locale_de": "with contextlib.redirect_stdout(io.StringIO()): processor.X4PrecisionLoader.from_project().locale('de')",
+    "full": """
+with tempfile.TemporaryDirectory() as out, contextlib.redirect_stdout(io.StringIO()):
+    config = processor.load_project_config()
+    loader = processor.X4PrecisionLoader(processor.X4_UNPACKED_DATA_PATH, out, config)
+    loader.save()
+""",
+}
+
+
+def run(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", _PRELUDE + code], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按需加载的冷启动耗时")
+    parser.add_argument('--repeat', type=int, default=3, help="每个场景运行次数 (取最小值)")
+    args = parser.parse_args()
+
+    results = {name: min(run(code) for _ in range(args.repeat)) for name, code in SCENARIOS.items()}
+    full = results["full"]
+    print(f"{'scenario':<10} | {'wall (s)':>9} | {'vs full':>8}")
+    for name, elapsed in results.items():
+        print(f"{name:<10} | {elapsed:>9.3f} | {elapsed / full:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+import subprocess
+import contextlib
+import xml.etree.ElementTree as ET
+
+# =============================================================================
+# 📏 峰值内存对比: X4PrecisionLoader.build_database + scan_assets
+# 每种模式在独立子进程中运行 (峰值 RSS 只增不减)，并校验两种模式结果一致。
+# 用法 (在项目根目录): python scripts/benchmarks/loader_memory.py --scale 20
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_memory_kb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 返回字节，Linux 返回 KB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def scale_raw_assets(raw_path, scale, out_dir):
+    # 将 wares_final.xml / macros_final.xml 复制 scale 份 (id 加后缀)，模拟大量 Mod/DLC 合并后的体积
+    lib_in = os.path.join(raw_path, "libraries")
+    lib_out = os.path.join(out_dir, "libraries")
+    os.makedirs(lib_out, exist_ok=True)
+
+    wares_root = ET.parse(os.path.join(lib_in, "wares_final.xml")).getroot()
+    macros_root = ET.parse(os.path.join(lib_in, "macros_final.xml")).getroot()
+    wares_out = ET.Element(wares_root.tag)
+    macros_out = ET.Element(macros_root.tag)
+    for k in range(scale):
+        suffix = f"__x{k}" if k else ""
+        for ware in wares_root.findall('ware'):
+            ware = _copy(ware)
+            ware.set('id', ware.get('id') + suffix)
+            comp = ware.find('component')
+            if comp is not None and comp.get('ref'):
+                comp.set('ref', comp.get('ref') + suffix)
+            wares_out.append(ware)
+        for macro in macros_root.findall('macro'):
+            macro = _copy(macro)
+            macro.set('name', macro.get('name') + suffix)
+            macros_out.append(macro)
+    ET.ElementTree(wares_out).write(os.path.join(lib_out, "wares_final.xml"), encoding='utf-8', xml_declaration=True)
+    ET.ElementTree(macros_out).write(os.path.join(lib_out, "macros_final.xml"), encoding='utf-8', xml_declaration=True)
+
+
+def _copy(elem):
+    return ET.fromstring(ET.tostring(elem))
+
+
+def run_child(raw_path, streaming):
+    sys.path.insert(0, SCRIPTS_DIR)
+    import x4_data_processor as processor
+
+    base_kb = peak_memory_kb()
+    with tempfile.TemporaryDirectory() as tmp_out, open(os.devnull, 'w') as devnull:
+        loader = processor.X4PrecisionLoader(raw_path, tmp_out, processor._config, streaming=streaming)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            loader.build_database()
+            loader.scan_assets()
+        elapsed = time.perf_counter() - start
+
+    payload = json.dumps([loader.wares_data, loader.recipes, loader.valid_macros, loader.all_modules], sort_keys=True)
+    print(json.dumps({
+        "seconds": round(elapsed, 4),
+        "baseline_kb": base_kb,
+        "peak_kb": peak_memory_kb(),
+        "modules": len(loader.all_modules),
+        "wares": len(loader.wares_data),
+        "digest": hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比 ET.parse 与 iterparse 流式模式的峰值内存")
+    parser.add_argument('--raw', help="解包目录 (默认取 x4-station-calculator.config.json)")
+    parser.add_argument('--scale', type=int, default=1, help="将输入复制 N 倍后再测量")
+    parser.add_argument('--child', choices=['tree', 'stream', 'scale'], help=argparse.SUPPRESS)
+    parser.add_argument('--out', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.raw is None:
+        with open('x4-station-calculator.config.json', 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        args.raw = os.path.join(config['raw_assets_dir'], config['folder_name'])
+
+    if args.child == 'scale':
+        scale_raw_assets(args.raw, args.scale, args.out)
+        return
+    if args.child:
+        run_child(args.raw, streaming=(args.child == 'stream'))
+        return
+
+    with tempfile.TemporaryDirectory() as scaled_dir:
+        raw_path = args.raw
+        if args.scale > 1:
+            # 在子进程中生成，避免父进程的内存峰值被 fork 出的测量进程继承
+            subprocess.run([sys.executable, os.path.abspath(__file__), '--raw', args.raw, '--scale', str(args.scale),
+                            '--child', 'scale', '--out', scaled_dir], check=True)
+            raw_path = scaled_dir
+        wares_mb = os.path.getsize(os.path.join(raw_path, "libraries", "wares_final.xml")) / 1e6
+
+        results = {}
+        for mode in ('tree', 'stream'):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '--raw', raw_path, '--child', mode],
+                                 check=True, capture_output=True, text=True).stdout
+            results[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"wares_final.xml: {wares_mb:.1f} MB (scale x{args.scale})")
+    print(f"{'mode':<8} | {'time (s)':>9} | {'peak RSS (MB)':>14} | {'Δ vs start (MB)':>16} | {'modules':>8}")
+    for mode, r in results.items():
+        if r['peak_kb'] is None:
+            print(f"{mode:<8} | {r['seconds']:>9.3f} | {'n/a':>14} | {'n/a':>16} | {r['modules']:>8}")
+            continue
+        print(f"{mode:<8} | {r['seconds']:>9.3f} | {r['peak_kb'] / 1024:>14.1f} | {(r['peak_kb'] - r['baseline_kb']) / 1024:>16.1f} | {r['modules']:>8}")
+    same = results['tree']['digest'] == results['stream']['digest']
+    print("✅ 两种模式输出一致" if same else "❌ 两种模式输出不一致!")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
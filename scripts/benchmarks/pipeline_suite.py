@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import platform
+import argparse
+import datetime
+import tempfile
+import subprocess
+import contextlib
+
+from synthetic_dataset import DEFAULT_DLCS, MODULE_TYPE_KEYS
+
+# =============================================================================
+# ⏱️ 全流程基准: 合成数据集 (1× / 10× / 100×) 上的 Distiller 与 Processor 各阶段耗时与峰值内存
+# 每个工具在独立子进程中运行；结果追加到 history.jsonl，并与同一机器上一次的记录对比。
+# Distiller 使用内置补丁引擎，不需要 Customizer。
+# 用法 (在项目根目录): python scripts/benchmarks/pipeline_suite.py --scales 1,10
+# =============================================================================
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_HISTORY = os.path.join(BENCH_DIR, "history.jsonl")
+FOLDER_NAME = "synthetic"
+# 全量构建 (--force) 时 Distiller 必须记录的步骤
+DISTILLER_STAGES = ("setup", "sync_text", "merge_libraries", "index_structures", "aggregate_macros")
+
+
+def _stage_results(profiler):
+    return {f"{profiler.tool}.{r['stage']}": {"seconds": r['wall_s'], "cpu_seconds": r['cpu_s'],
+                                              "peak_rss_kb": r['peak_rss_kb'], "counts": r['counts']}
+            for r in profiler.records}
+
+
+def run_distiller_child(jobs):
+    sys.path.insert(0, SCRIPTS_DIR)
+    import x4_asset_distiller as distiller
+    from x4_profiling import StageProfiler
+
+    profiler = StageProfiler("distiller")
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        distiller.main(['--force', '--jobs', str(jobs)], profiler=profiler)
+    missing = [stage for stage in DISTILLER_STAGES if stage not in {r['stage'] for r in profiler.records}]
+    if missing:
+        raise RuntimeError(f"Distiller 缺少步骤记录: {', '.join(missing)}")
+    print(json.dumps(_stage_results(profiler)))
+
+
+def run_processor_child(raw_path, jobs):
+    sys.path.insert(0, SCRIPTS_DIR)
+    import x4_data_processor as processor
+    from x4_profiling import StageProfiler
+
+    profiler = StageProfiler("processor")
+    with tempfile.TemporaryDirectory() as out_dir, open(os.devnull, 'w') as devnull:
+        loader = processor.X4PrecisionLoader(raw_path, out_dir, processor._config, profiler=profiler)
+        with contextlib.redirect_stdout(devnull):
+            loader.build_database()
+            loader.process_module_groups()
+            loader.scan_assets()
+            loader.extract_and_resolve_languages(jobs=jobs)
+            loader.inject_english_names()
+            loader.build_production_chains()
+            loader.save()
+    stages = _stage_results(profiler)
+    stages["processor.result"] = {"modules": len(loader.all_modules), "wares": len(loader.wares_data)}
+    print(json.dumps(stages))
+
+
+def write_configs(work_dir):
+    with open('x4-station-calculator.config.json', 'r', encoding='utf-8') as f:
+        v_config = json.load(f)
+    v_config.update({
+        "folder_name": FOLDER_NAME,
+        "raw_assets_dir": os.path.join(work_dir, "raw"),
+        "processed_assets_dir": os.path.join(work_dir, "processed"),
+        "dlc_order": DEFAULT_DLCS,
+        "module_types": MODULE_TYPE_KEYS,
+    })
+    with open(os.path.join(work_dir, 'x4-station-calculator.config.json'), 'w', encoding='utf-8') as f:
+        json.dump(v_config, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(work_dir, 'x4-game.config.json'), 'w', encoding='utf-8') as f:
+        json.dump({"X4_PATHS": {"SOURCE": os.path.join(work_dir, "SOURCE")}}, f, indent=2)
+
+
+def run_child(work_dir, *child_args):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), *child_args], cwd=work_dir,
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(entry, history, threshold):
+    # 与同一机器、同一规模与并行度的上一条记录比较
+    previous = [h for h in history if (h['host'], h['scale'], h['jobs']) == (entry['host'], entry['scale'], entry['jobs'])]
+    if not previous:
+        return None, []
+    prev = previous[-1]
+    regressions = []
+    for stage, cur in entry['stages'].items():
+        old = prev['stages'].get(stage)
+        if not old or 'seconds' not in cur:
+            continue
+        # 忽略 50ms 以内的抖动
+        if cur['seconds'] > old['seconds'] * (1 + threshold) and cur['seconds'] - old['seconds'] > 0.05:
+            regressions.append((stage, old['seconds'], cur['seconds']))
+    return prev, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="在合成数据集上测量 Distiller / Processor 各阶段性能")
+    parser.add_argument('--scales', default="1,10,100", help="逗号分隔的规模倍数 (默认 1,10,100)")
+    parser.add_argument('--jobs', type=int, default=1, help="传给两个脚本的 --jobs")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="结果历史文件 (JSON Lines)")
+    parser.add_argument('--threshold', type=float, default=0.2, help="耗时增加超过该比例视为回退 (默认 0.2)")
+    parser.add_argument('--keep', help="保留生成的数据集到该目录 (默认使用临时目录)")
+    parser.add_argument('--child', choices=['distiller', 'processor'], help=argparse.SUPPRESS)
+    parser.add_argument('--raw', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == 'distiller':
+        run_distiller_child(args.jobs)
+        return
+    if args.child == 'processor':
+        run_processor_child(args.raw, args.jobs)
+        return
+
+    history = load_history(args.history)
+    any_regression = False
+    with (contextlib.nullcontext(args.keep) if args.keep else tempfile.TemporaryDirectory()) as root:
+        for scale in [int(s) for s in args.scales.split(',')]:
+            work_dir = os.path.abspath(os.path.join(root, f"scale_{scale}"))
+            os.makedirs(work_dir, exist_ok=True)
+            print(f"\n🧬 生成 {scale}× 合成数据集...")
+            # 在子进程中生成，避免父进程的内存峰值被测量进程继承
+            subprocess.run([sys.executable, os.path.join(BENCH_DIR, "synthetic_dataset.py"), '--out', work_dir,
+                            '--scale', str(scale)], check=True, capture_output=True)
+            with open(os.path.join(work_dir, "dataset.json"), 'r', encoding='utf-8') as f:
+                dataset = json.load(f)
+            write_configs(work_dir)
+
+            stages = run_child(work_dir, '--child', 'distiller', '--jobs', str(args.jobs))
+            raw_path = os.path.join(work_dir, "raw", FOLDER_NAME)
+            stages.update(run_child(work_dir, '--child', 'processor', '--raw', raw_path, '--jobs', str(args.jobs)))
+            result = stages.pop("processor.result")
+
+            entry = {
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                "commit": git_commit(),
+                "host": platform.node(),
+                "python": platform.python_version(),
+                "cpu_count": os.cpu_count(),
+                "scale": scale,
+                "jobs": args.jobs,
+                "dataset": dataset,
+                "result": result,
+                "stages": stages,
+            }
+            prev, regressions = find_regressions(entry, history, args.threshold)
+
+            print(f"{'stage':<44} | {'time (s)':>9} | {'prev (s)':>9} | {'peak RSS (MB)':>13}")
+            for stage, r in stages.items():
+                old = prev['stages'].get(stage, {}).get('seconds') if prev else None
+                rss = f"{r['peak_rss_kb'] / 1024:.1f}" if r['peak_rss_kb'] is not None else "n/a"
+                print(f"{stage:<44} | {r['seconds']:>9.3f} | {(f'{old:.3f}' if old is not None else '-'):>9} | {rss:>13}")
+            print(f"   ✅ {result['modules']} 个模块, {result['wares']} 个商品")
+            for stage, old, new in regressions:
+                print(f"   ❌ 性能回退: {stage} {old:.3f}s -> {new:.3f}s")
+            any_regression = any_regression or bool(regressions)
+
+            history.append(entry)
+            with open(args.history, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    print(f"\n📝 结果已追加到 {args.history}")
+    if any_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# =============================================================================
+# ⏱️ 批量方案评估吞吐量
+# 随机生成方案 (模块 -> 数量)，分别测量 方案 -> 矩阵 转换与矩阵评估的速度 (方案/秒)。
+# 单核测量请设置 OMP_NUM_THREADS=1 / OPENBLAS_NUM_THREADS=1。
+# 用法 (在项目根目录): python scripts/benchmarks/plan_evaluator.py [--plans 100000]
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from x4_plan_evaluator import PlanEvaluator, default_data_dir  # noqa: E402
+
+
+def random_plans(module_ids, n, max_modules, seed):
+    rng = random.Random(seed)
+    return [{rng.choice(module_ids): rng.randint(1, 10) for _ in range(rng.randint(1, max_modules))} for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量方案评估吞吐量")
+    parser.add_argument('--data', help="处理器输出的 data 目录 (默认按项目配置)")
+    parser.add_argument('--plans', type=int, default=100000, help="方案数量")
+    parser.add_argument('--modules', type=int, default=20, help="每个方案最多包含的模块种类")
+    parser.add_argument('--batch-size', type=int, default=8192, help="每批评估的方案数")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    evaluator = PlanEvaluator.from_data_dir(args.data or default_data_dir())
+    plans = random_plans(evaluator.module_ids, args.plans, args.modules, args.seed)
+    print(f"📦 {len(evaluator.module_ids)} 个模块 × {len(evaluator.ware_ids)} 种物品，{len(plans)} 个方案")
+
+    build_time = eval_time = 0.0
+    for i in range(0, len(plans), args.batch_size):
+        t0 = time.perf_counter()
+        batch = evaluator.plan_batch(plans[i:i + args.batch_size])
+        t1 = time.perf_counter()
+        evaluator.evaluate(batch)
+        t2 = time.perf_counter()
+        build_time += t1 - t0
+        eval_time += t2 - t1
+
+    print(f"{'stage':<12} | {'time (s)':>9} | {'plans/s':>12}")
+    for name, elapsed in (("plan_batch", build_time), ("evaluate", eval_time), ("total", build_time + eval_time)):
+        print(f"{name:<12} | {elapsed:>9.3f} | {len(plans) / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
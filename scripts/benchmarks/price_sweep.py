@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import random
+import argparse
+import numpy as np
+
+# =============================================================================
+# ⏱️ 价格敏感性扫描耗时
+# 随机生成方案，分别测量单个方案的 蒙特卡洛 / 网格 扫描 (含分位数等统计) 与整批方案的平均耗时。
+# 用法 (在项目根目录): python scripts/benchmarks/price_sweep.py [--points 1000000]
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+from x4_plan_evaluator import PlanEvaluator, default_data_dir  # noqa: E402
+from x4_price_sweep import PriceSweep, DEFAULT_QUANTILES  # noqa: E402
+from plan_evaluator import random_plans  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="价格敏感性扫描耗时")
+    parser.add_argument('--data', help="处理器输出的 data 目录 (默认按项目配置)")
+    parser.add_argument('--points', type=int, default=1000000, help="每个方案的价格点数")
+    parser.add_argument('--plans', type=int, default=64, help="方案数量")
+    parser.add_argument('--modules', type=int, default=8, help="每个方案最多包含的模块种类")
+    parser.add_argument('--grid', type=int, default=4, help="网格模式的价格位置数")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    evaluator = PlanEvaluator.from_data_dir(args.data or default_data_dir())
+    sweep = PriceSweep(evaluator)
+    plans = random_plans(evaluator.module_ids, args.plans, args.modules, args.seed)
+    result, _ = evaluator.evaluate_plans(plans)
+    coeffs = sweep.coefficients(result["net"])
+    traded = (coeffs != 0).sum(axis=1)
+    busiest = int(np.argmax(traded))
+    rng = np.random.default_rng(args.seed)
+    print(f"📦 {len(plans)} 个方案，每个方案买卖 {traded.min()}-{traded.max()} 种物品，{args.points:,} 个价格点")
+
+    def monte_carlo(rows):
+        list(sweep.summarize(coeffs[rows], sweep.sample(coeffs[rows], args.points, rng), DEFAULT_QUANTILES, 5))
+
+    def grid(p):
+        profits, _ = sweep.grid(coeffs[p], args.grid, args.points, rng)
+        list(sweep.summarize(coeffs[p:p + 1], profits[None], DEFAULT_QUANTILES, 5))
+
+    block = max(1, (1 << 24) // args.points)
+    scenarios = {
+        f"mc 1 plan ({traded[busiest]} wares)": lambda: monte_carlo(slice(busiest, busiest + 1)),
+        f"grid 1 plan ({traded[busiest]} wares)": lambda: grid(busiest),
+        f"mc {len(plans)} plans": lambda: [monte_carlo(slice(i, i + block)) for i in range(0, len(plans), block)],
+        f"grid {len(plans)} plans": lambda: [grid(p) for p in range(len(plans))],
+    }
+    print(f"{'scenario':<26} | {'time (s)':>9} | {'s/plan':>8}")
+    for name, fn in scenarios.items():
+        elapsed = timed(fn)
+        n = 1 if "1 plan" in name else len(plans)
+        print(f"{name:<26} | {elapsed:>9.3f} | {elapsed / n:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import os
+import re
+import sys
+import time
+import argparse
+import contextlib
+import tempfile
+import xml.etree.ElementTree as ET
+
+# =============================================================================
+# ⏱️ 翻译解析速度对比: 旧版逐次 re.sub 递归 vs X4TextResolver
+# 在真实 t/0001-L*.xml 上运行，并校验两者结果一致。
+# 用法 (在项目根目录): python scripts/benchmarks/resolver_speed.py [--all-keys]
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+
+def legacy_resolve(raw_name, lang_db, depth=0):
+    # 旧版 X4PrecisionLoader._resolve_name 的原样拷贝，仅用于对比
+    if not raw_name or depth > 5: return raw_name
+    text = re.sub(r"\([^)]*\)", "", raw_name)
+    def replace_callback(match):
+        page, tid = match.group(1), match.group(2)
+        if page in lang_db and tid in lang_db[page]:
+            return legacy_resolve(lang_db[page][tid], lang_db, depth + 1)
+        return match.group(0)
+    text = re.sub(r"\{\s*(\d+)\s*,\s*(\d+)\s*\}", replace_callback, text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def load_lang_db(path):
+    lang_db = {}
+    for page in ET.parse(path).getroot().findall('page'):
+        p_id = page.get('id')
+        if not p_id: continue
+        entries = lang_db.setdefault(p_id, {})
+        for t in page.findall('t'):
+            entries[t.get('id')] = "".join(t.itertext())
+    return lang_db
+
+
+def best_of(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    import x4_data_processor as processor
+    from x4_language import X4TextResolver
+
+    parser = argparse.ArgumentParser(description="对比旧版与预编译+缓存解析器的翻译解析耗时")
+    parser.add_argument('--raw', default=processor.X4_UNPACKED_DATA_PATH, help="解包目录 (包含 t/ 与 libraries/)")
+    parser.add_argument('--all-keys', action='store_true', help="解析语言文件中的全部条目，而不只是 needed_raw_names")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    t_path = os.path.join(args.raw, "t")
+    if not os.path.isdir(t_path):
+        print(f"❌ 错误: 找不到语言目录: {t_path}")
+        sys.exit(1)
+
+    loader = processor.X4PrecisionLoader(args.raw, tempfile.gettempdir(), processor._config)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        loader.build_database()
+        loader.process_module_groups()
+
+    print(f"{'lang':<6} | {'keys':>7} | {'legacy (ms)':>12} | {'resolver (ms)':>14} | {'speedup':>8}")
+    total_legacy = total_new = 0.0
+    for x4_id, conf in processor.X4_LANG_CONFIG.items():
+        t_file = os.path.join(t_path, f"0001-L{x4_id}.xml")
+        if not os.path.exists(t_file): continue
+        lang_db = load_lang_db(t_file)
+        keys = sorted(loader.needed_raw_names)
+        if args.all_keys:
+            keys = [f"{{{p},{t}}}" for p, entries in lang_db.items() for t in entries]
+
+        def run_resolver():
+            # 每轮新建解析器，计时包含缓存预热
+            resolver = X4TextResolver(lang_db)
+            return {k: resolver.resolve(k) for k in keys}
+
+        legacy_s, legacy_out = best_of(lambda: {k: legacy_resolve(k, lang_db) for k in keys}, args.repeat)
+        new_s, new_out = best_of(run_resolver, args.repeat)
+        mismatched = [k for k in keys if legacy_out[k] != new_out[k]]
+        total_legacy += legacy_s
+        total_new += new_s
+        flag = "" if not mismatched else f"  ⚠️ {len(mismatched)} 条结果不同 (循环/超深引用)"
+        print(f"{conf['iso']:<6} | {len(keys):>7} | {legacy_s * 1000:>12.1f} | {new_s * 1000:>14.1f} | {legacy_s / new_s:>7.1f}x{flag}")
+
+    if total_new:
+        print(f"{'total':<6} | {'':>7} | {total_legacy * 1000:>12.1f} | {total_new * 1000:>14.1f} | {total_legacy / total_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import os
+import json
+import random
+import argparse
+import xml.etree.ElementTree as ET
+
+# =============================================================================
+# 🧬 合成 X4 数据集生成器
+# 按真实 8.0 数据的规模与结构生成 SOURCE 目录 (Base + DLC <diff> 补丁 + 结构宏 + 语言文件)，
+# 并同时写出对应的合并结果 (expected/libraries/*_final.xml)，可单独测试处理器或校验 Distiller 的合并结果。
+# scale=1 约等于真实数据规模，数量按 scale 线性放大。
+# 用法: python scripts/benchmarks/synthetic_dataset.py --out /tmp/x4_synth --scale 10
+# =============================================================================
+
+# 1× 规模 (参照 8.0-Diplomacy 解包数据)
+BASE_COUNTS = {
+    "trade_wares": 120,      # container/solid/liquid 商品
+    "other_wares": 1400,     # 装备/舰船等 (处理器会跳过)
+    "modules": 330,          # 空间站模块 ware + 宏
+    "noise_macros": 1500,    # 与空间站无关的结构宏文件
+    "filler_pages": 40,      # 每个语言文件中与项目无关的页面
+}
+FILLER_TEXTS_PER_PAGE = 100
+
+LANG_IDS = ['044', '086', '088', '049', '033', '039', '034', '007', '081', '082', '055', '048']
+DEFAULT_DLCS = ["ego_dlc_split", "ego_dlc_terran", "ego_dlc_pirate", "ego_dlc_boron",
+                "ego_dlc_timelines", "ego_dlc_mini_01", "ego_dlc_mini_02"]
+DLC_SHARE = 0.3  # 由 DLC 补丁新增的 ware / 宏比例
+
+GROUPS = ["energy", "minerals", "gases", "refined", "hightech", "shiptech", "pharmaceutical",
+          "agricultural", "food", "water", "ice", "scrap"]
+RECIPE_METHODS = ["terran", "closedloop", "xenon", "teladi"]
+RACES = ["argon", "teladi", "paranid", "split", "terran", "boron", "xenon"]
+# (宏 class, 权重) 按真实数据中各类模块的数量分布
+MODULE_CLASSES = [
+    ("production", 64), ("storage", 66), ("connectionmodule", 68), ("habitation", 28), ("defencemodule", 27),
+    ("pier", 25), ("buildmodule", 23), ("dockarea", 13), ("welfaremodule", 3), ("processingmodule", 1),
+    ("radar", 1), ("ventureplatform", 1),
+]
+MODULE_TYPE_KEYS = {
+    "habitation": "{1001,2451}", "production": "{1001,2421}", "processingmodule": "{1001,9621}",
+    "welfaremodule": "{1001,9620}", "storage": "{1001,2422}", "defencemodule": "{1001,2424}",
+    "dockarea": "{20104,79901}", "pier": "{20104,79801}", "connectionmodule": "{20104,59901}",
+    "buildmodule": "{1001,2439}", "radar": "{1001,1706}", "ventureplatform": "{1001,2454}",
+}
+SHARED_TEXT_PAGE = 99990  # 嵌套引用的目标页
+
+
+def _write(elem, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    ET.indent(elem)
+    ET.ElementTree(elem).write(path, encoding='utf-8', xml_declaration=True)
+
+
+def _trade_ware(rng, i, inputs):
+    w_id = f"synth_ware_{i:05d}"
+    ware = ET.Element('ware', id=w_id, name=f"{{20201,{i * 100 + 1}}}", description=f"{{20201,{i * 100 + 2}}}",
+                      group=rng.choice(GROUPS), transport=rng.choice(["container", "container", "solid", "liquid"]),
+                      volume=str(rng.randint(1, 40)), tags="container economy")
+    average = rng.randint(10, 5000)
+    ET.SubElement(ware, 'price', min=str(average * 7 // 10), average=str(average), max=str(average * 13 // 10))
+    methods = ["default"] + rng.sample(RECIPE_METHODS, rng.randint(0, 1))
+    for method in methods:
+        prod = ET.SubElement(ware, 'production', time=str(rng.choice([60, 120, 300, 600, 900])),
+                             amount=str(rng.randint(10, 400)), method=method, name="{20206,101}")
+        if inputs:
+            primary = ET.SubElement(prod, 'primary')
+            for src in rng.sample(inputs, min(len(inputs), rng.randint(1, 4))):
+                ET.SubElement(primary, 'ware', ware=src, amount=str(rng.randint(5, 200)))
+        effects = ET.SubElement(prod, 'effects')
+        ET.SubElement(effects, 'effect', type="work", product=f"{rng.uniform(0.1, 0.6):.2f}")
+    return ware
+
+
+def _workunit_ware(rng, food):
+    ware = ET.Element('ware', id="workunit_busy", name="{20201,10001}", transport="workunit", tags="workunit")
+    for method in ["default"] + RACES[1:6]:
+        prod = ET.SubElement(ware, 'production', time="600", amount="200", method=method)
+        primary = ET.SubElement(prod, 'primary')
+        for src in rng.sample(food, 2):
+            ET.SubElement(primary, 'ware', ware=src, amount=str(rng.randint(5, 40)))
+    return ware
+
+
+def _other_ware(rng, i):
+    ware = ET.Element('ware', id=f"synth_equip_{i:05d}", name=f"{{20101,{i * 10 + 1}}}", group="equipment",
+                      transport=rng.choice(["equipment", "inventory", "ship"]), volume="1", tags="equipment")
+    average = rng.randint(1000, 100000)
+    ET.SubElement(ware, 'price', min=str(average // 2), average=str(average), max=str(average * 2))
+    return ware
+
+
+def _module_ware(rng, i, macro_name, trade_ids):
+    ware = ET.Element('ware', id=f"synth_module_{i:05d}", name=f"{{20104,{i * 100 + 1}}}", group="modules",
+                      transport="container", volume="1", tags="module")
+    ET.SubElement(ware, 'price', min="100000", average="200000", max="300000")
+    ET.SubElement(ware, 'component', ref=macro_name)
+    prod = ET.SubElement(ware, 'production', time=str(rng.randint(60, 600)), amount="1", method="default")
+    primary = ET.SubElement(prod, 'primary')
+    for src in rng.sample(trade_ids, 3):
+        ET.SubElement(primary, 'ware', ware=src, amount=str(rng.randint(10, 5000)))
+    return ware
+
+
+def _macro(rng, macro_name, m_class, i, trade_ids):
+    macro = ET.Element('macro', name=macro_name, **{"class": m_class})
+    ET.SubElement(macro, 'component', ref=macro_name[:-len("_macro")])
+    props = ET.SubElement(macro, 'properties')
+    ident = ET.SubElement(props, 'identification', name=f"{{20104,{i * 100 + 1}}}", makerrace=rng.choice(RACES))
+    if m_class == "processingmodule":
+        ident.set('type', "moduletypes_processing")
+    elif m_class == "ventureplatform":
+        ident.set('type', "moduletypes_venture")
+    if rng.random() < 0.9:
+        sets = ET.SubElement(ET.SubElement(props, 'build'), 'sets')
+        ET.SubElement(sets, 'set', ref="factory")
+    ET.SubElement(props, 'hull', max=str(rng.randint(10000, 500000)))
+    if m_class == "production":
+        outputs = rng.sample(trade_ids, rng.choice([1, 1, 1, 2]))
+        prod = ET.SubElement(props, 'production', wares=" ".join(outputs))
+        if len(outputs) > 1:
+            queue = ET.SubElement(prod, 'queue')
+            for w_id in outputs:
+                ET.SubElement(queue, 'item', ware=w_id, method="default")
+        else:
+            ET.SubElement(prod, 'queue', ware=outputs[0])
+        ET.SubElement(props, 'workforce', max=str(rng.randint(20, 200)))
+    elif m_class == "habitation":
+        ET.SubElement(props, 'workforce', capacity=str(rng.choice([250, 500, 1000])))
+    elif m_class == "storage":
+        ET.SubElement(props, 'cargo', max=str(rng.randint(5000, 1000000)), tags=rng.choice(["container", "solid", "liquid"]))
+    return macro
+
+
+def _language_file(rng, lang_id, scale, texts):
+    # texts: {(page, t_id): 文本}；约四分之一改为经共享页的嵌套引用，附带括号注释
+    root = ET.Element('language', id=str(int(lang_id)))
+    pages = {}
+    for (page, t_id), text in texts.items():
+        pages.setdefault(page, {})[t_id] = f"{text} [{lang_id}]"
+    shared = {}
+    for page in sorted(pages):
+        for t_id in sorted(pages[page]):
+            if rng.random() < 0.25:
+                ref = len(shared) + 1
+                shared[ref] = pages[page][t_id]
+                pages[page][t_id] = f"{{{SHARED_TEXT_PAGE},{ref}}} (synthetic comment)"
+    pages[SHARED_TEXT_PAGE] = shared
+    for k in range(BASE_COUNTS["filler_pages"] * scale):
+        pages[500000 + k] = {t: f"Filler text {k}-{t} " * 4 for t in range(1, FILLER_TEXTS_PER_PAGE + 1)}
+    for page in sorted(pages):
+        p_node = ET.SubElement(root, 'page', id=str(page))
+        for t_id, text in sorted(pages[page].items()):
+            ET.SubElement(p_node, 't', id=str(t_id)).text = text
+    return root
+
+
+def generate(out_dir, scale=1, dlc_order=None, seed=0):
+    """生成 out_dir/SOURCE (Distiller 输入) 与 out_dir/expected (合并后的处理器输入)，返回数据集统计。"""
+    rng = random.Random(seed)
+    dlc_order = list(dlc_order or DEFAULT_DLCS)
+    src = os.path.join(out_dir, "SOURCE")
+    expected = os.path.join(out_dir, "expected")
+    counts = {k: v * scale for k, v in BASE_COUNTS.items()}
+
+    def owner():
+        return rng.choice(dlc_order) if dlc_order and rng.random() < DLC_SHARE else None
+
+    # --- Wares: 配方只引用编号更小的商品，形成无环生产链 ---
+    trade_ids = []
+    wares = []
+    for i in range(counts["trade_wares"]):
+        ware = _trade_ware(rng, i, trade_ids[-60:] if i >= 10 else [])
+        trade_ids.append(ware.get('id'))
+        wares.append((owner(), ware))
+    wares.append((None, _workunit_ware(rng, trade_ids[:20])))
+    wares.extend((owner(), _other_ware(rng, i)) for i in range(counts["other_wares"]))
+
+    classes, weights = zip(*MODULE_CLASSES)
+    macros = []
+    for i in range(counts["modules"]):
+        m_class = rng.choices(classes, weights)[0]
+        macro_name = f"synth_{m_class}_{i:05d}_macro"
+        m_owner = owner()
+        wares.append((m_owner, _module_ware(rng, i, macro_name, trade_ids)))
+        macros.append((m_owner, _macro(rng, macro_name, m_class, i, trade_ids)))
+
+    base_wares = ET.Element('wares')
+    final_wares = ET.Element('wares')
+    patches = {dlc: ET.Element('diff') for dlc in dlc_order}
+    for w_owner, ware in wares:
+        if w_owner is None:
+            base_wares.append(ware)
+            continue
+        add = patches[w_owner].find('add')
+        if add is None: add = ET.SubElement(patches[w_owner], 'add', sel="/wares")
+        add.append(ware)
+    # 合并顺序: Base 在前，随后按 dlc_order 追加各 DLC 新增的 ware
+    final_wares.extend(base_wares)
+    for dlc in dlc_order:
+        final_wares.extend(patches[dlc].findall('add/ware'))
+    _write(base_wares, os.path.join(src, "libraries", "wares.xml"))
+    # 每个 DLC 额外修改一个 Base 商品的价格 (base 与 final 共享节点，写出 base 后再改值)
+    base_trade = [w for w in base_wares.findall('ware') if 'economy' in w.get('tags', '')]
+    for dlc in dlc_order:
+        ware = rng.choice(base_trade)
+        new_max = str(int(ware.find('price').get('max')) + 1)
+        ET.SubElement(patches[dlc], 'replace', sel=f"/wares/ware[@id='{ware.get('id')}']/price/@max").text = new_max
+        ware.find('price').set('max', new_max)
+    for dlc, diff in patches.items():
+        _write(diff, os.path.join(src, "extensions", dlc, "libraries", "wares.xml"))
+    _write(final_wares, os.path.join(expected, "libraries", "wares_final.xml"))
+
+    # --- Waregroups ---
+    base_groups = ET.Element('groups')
+    final_groups = ET.Element('groups')
+    for k, g_id in enumerate(GROUPS):
+        for root in (base_groups, final_groups):
+            ET.SubElement(root, 'group', id=g_id, name=f"{{20215,{k * 100 + 1}}}")
+    for k, dlc in enumerate(dlc_order):
+        group = ET.Element('group', id=f"synth_dlcgroup_{k}", name=f"{{20215,{(len(GROUPS) + k) * 100 + 1}}}")
+        diff = ET.Element('diff')
+        ET.SubElement(diff, 'add', sel="/groups").append(group)
+        _write(diff, os.path.join(src, "extensions", dlc, "libraries", "waregroups.xml"))
+        final_groups.append(group)
+    _write(base_groups, os.path.join(src, "libraries", "waregroups.xml"))
+    _write(final_groups, os.path.join(expected, "libraries", "waregroups_final.xml"))
+
+    # --- 结构宏: 每个宏一个文件，部分 Base 宏被 DLC 补丁追加属性 ---
+    final_macros = ET.Element('macros')
+    for m_owner, macro in sorted(macros, key=lambda item: item[1].get('name')):
+        name = macro.get('name')
+        root = src if m_owner is None else os.path.join(src, "extensions", m_owner)
+        wrapper = ET.Element('macros')
+        wrapper.append(macro)
+        _write(wrapper, os.path.join(root, "assets", "structures", macro.get('class'), "macros", f"{name}.xml"))
+        final_macros.append(macro)
+        if m_owner is None and dlc_order and rng.random() < 0.1:
+            dlc = rng.choice(dlc_order)
+            diff = ET.Element('diff')
+            ET.SubElement(diff, 'add', sel=f"/macros/macro[@name='{name}']/properties").append(
+                ET.Element('secrecy', level="2"))
+            _write(diff, os.path.join(src, "extensions", dlc, "assets", "structures", macro.get('class'), "macros", f"{name}.xml"))
+            ET.SubElement(macro.find('properties'), 'secrecy', level="2")
+    for k in range(counts["noise_macros"]):
+        wrapper = ET.Element('macros')
+        ET.SubElement(wrapper, 'macro', name=f"synth_prop_{k:06d}_macro", **{"class": "object"})
+        _write(wrapper, os.path.join(src, "assets", "structures", "props", f"set_{k % 50:02d}", "macros", f"synth_prop_{k:06d}_macro.xml"))
+    _write(final_macros, os.path.join(expected, "libraries", "macros_final.xml"))
+
+    # --- 语言文件 ---
+    texts = {}
+    name_keys = [w.get('name') for w in final_wares.iter('ware') if w.get('name')]
+    name_keys += [g.get('name') for g in final_groups.iter('group')] + list(MODULE_TYPE_KEYS.values()) + ["{20102,2011}"]
+    for key in name_keys:
+        page, t_id = key.strip('{}').split(',')
+        texts[(int(page), int(t_id))] = f"Synthetic {page}-{t_id}"
+    for lang_id in LANG_IDS:
+        root = _language_file(rng, lang_id, scale, texts)
+        for base in (src, expected):
+            _write(root, os.path.join(base, "t", f"0001-L{lang_id}.xml"))
+
+    stats = {"scale": scale, "seed": seed, "wares": len(final_wares), "modules": counts["modules"],
+             "macro_files": counts["modules"] + counts["noise_macros"], "languages": len(LANG_IDS),
+             "texts_per_language": len(texts) + counts["filler_pages"] * FILLER_TEXTS_PER_PAGE}
+    with open(os.path.join(out_dir, "dataset.json"), 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成按比例放大的合成 X4 数据集")
+    parser.add_argument('--out', required=True, help="输出目录")
+    parser.add_argument('--scale', type=int, default=1, help="相对真实数据的规模倍数")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    stats = generate(args.out, args.scale, seed=args.seed)
+    print(f"✅ 合成数据集已生成: {args.out} ({json.dumps(stats, ensure_ascii=False)})")
+
+
+if __name__ == "__main__":
+    main()
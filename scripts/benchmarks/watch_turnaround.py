@@ -0,0 +1,52 @@
+import os
+import sys
+import time
+import argparse
+import contextlib
+import io
+
+# =============================================================================
+# ⏱️ Watch 模式的重建耗时
+# 冷启动一次后，分别把单个语言文件 / 英文 / 单个宏文件 / wares.xml 视为已变化并增量重建，
+# 与冷启动耗时对比。不修改源文件 (内容未变化，输出不会被改写；*_final.xml 会被重新写出)。
+# 用法 (在项目根目录): python scripts/benchmarks/watch_turnaround.py [--repeat 5]
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+
+
+def main():
+    import x4_watch
+
+    parser = argparse.ArgumentParser(description="Watch 模式的冷启动与增量重建耗时")
+    parser.add_argument('--repeat', type=int, default=5, help="每个场景重建次数 (取最小值)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        watcher = x4_watch.PipelineWatcher(keep_final=True)
+    cold = time.perf_counter() - start
+
+    t_src = os.path.join(watcher.src, "t")
+    scenarios = {
+        "language (de)": os.path.join(t_src, "0001-L049.xml"),
+        "english": os.path.join(t_src, "0001-L044.xml"),
+        "macro": next((sources[k] for m, sources in sorted(watcher.macro_sources.items()) for k in sources), None),
+        "wares.xml": os.path.join(watcher.src, "libraries", "wares.xml"),
+    }
+    print(f"{'scenario':<14} | {'rebuild (s)':>11} | {'vs cold':>8}")
+    print(f"{'cold start':<14} | {cold:>11.3f} | {1:>7.0%}")
+    for name, path in scenarios.items():
+        if path is None or path not in watcher.owners: continue
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                watcher.rebuild([path])
+            timings.append(time.perf_counter() - start)
+        print(f"{name:<14} | {min(timings):>11.3f} | {min(timings) / cold:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
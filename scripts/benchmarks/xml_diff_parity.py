@@ -0,0 +1,79 @@
+import os
+import sys
+import glob
+import time
+import argparse
+
+# =============================================================================
+# 🩹 补丁引擎对照: 内置 x4_xml_diff vs X4 Customizer XML_Diff
+# 对 SOURCE 中的 libraries/*.xml 按 dlc_order 依次应用 DLC 补丁，比较两种引擎的合并结果 (逐字节) 与耗时。
+# 需要 x4-game.config.json 中的 SOURCE 与 CUSTOMIZER_PATH。
+# 用法 (在项目根目录): python scripts/benchmarks/xml_diff_parity.py
+# --capture-fixture: 用 Customizer 重新生成 scripts/tests 的对照输出 (fixtures/xml_diff/expected_wares.xml)
+# =============================================================================
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(SCRIPTS_DIR, "tests", "fixtures", "xml_diff")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from lxml import etree  # noqa: E402
+import x4_xml_diff  # noqa: E402
+from x4_asset_distiller import load_all_configs, setup_customizer  # noqa: E402
+
+
+def merge(engine, base_path, patch_paths):
+    parser = etree.XMLParser(remove_blank_text=True)
+    tree = etree.parse(base_path, parser)
+    patches = [etree.parse(p, parser).getroot() for p in patch_paths]
+    errors = []
+    start = time.perf_counter()
+    for patch in patches:
+        try:
+            engine.Apply_Patch(tree.getroot(), patch)
+        except Exception as e:
+            errors.append(str(e))
+    elapsed = time.perf_counter() - start
+    return etree.tostring(tree, encoding='utf-8', xml_declaration=True, pretty_print=True), elapsed, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比内置补丁引擎与 X4 Customizer 的合并结果")
+    parser.add_argument('--files', default="wares.xml,waregroups.xml", help="逗号分隔的 libraries 文件名")
+    parser.add_argument('--capture-fixture', action='store_true', help="用 Customizer 重新生成测试对照输出后退出")
+    args = parser.parse_args()
+
+    m_config, v_config = load_all_configs()
+    customizer = setup_customizer(m_config)
+    if args.capture_fixture:
+        patch_paths = sorted(glob.glob(os.path.join(FIXTURE_DIR, "0*.xml")))
+        expected, _, errors = merge(customizer, os.path.join(FIXTURE_DIR, "wares.xml"), patch_paths)
+        for e in errors:
+            print(f"   ⚠️ customizer: {e}")
+        with open(os.path.join(FIXTURE_DIR, "expected_wares.xml"), 'wb') as f:
+            f.write(expected)
+        print(f"✅ 已写入对照输出 ({len(patch_paths)} 个补丁)")
+        return
+    src = m_config['X4_PATHS']['SOURCE']
+    dlc_order = v_config.get('dlc_order', [])
+
+    failed = False
+    print(f"{'file':<18} | {'patches':>7} | {'customizer (ms)':>15} | {'native (ms)':>11} | result")
+    for lib_file in args.files.split(','):
+        base_path = os.path.join(src, "libraries", lib_file)
+        patch_paths = [p for p in (os.path.join(src, "extensions", d, "libraries", lib_file) for d in dlc_order) if os.path.exists(p)]
+        expected, c_time, c_errors = merge(customizer, base_path, patch_paths)
+        actual, n_time, n_errors = merge(x4_xml_diff, base_path, patch_paths)
+        same = expected == actual
+        failed = failed or not same
+        print(f"{lib_file:<18} | {len(patch_paths):>7} | {c_time * 1000:>15.1f} | {n_time * 1000:>11.1f} | "
+              f"{'✅ 一致' if same else '❌ 不一致'}")
+        for label, errors in (("customizer", c_errors), ("native", n_errors)):
+            for e in errors:
+                print(f"   ⚠️ {label}: {e}")
+    print(f"   ℹ️ 已编译的 sel 表达式: {x4_xml_diff.selector_cache_info()['compiled']}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
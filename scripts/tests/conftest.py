@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 脚本之间按同目录模块互相导入，测试同样从 scripts/ (及 benchmarks/) 导入
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, "benchmarks"))
@@ -0,0 +1,101 @@
+import os
+
+from x4_build_cache import BuildManifest, StageCache, write_text_if_changed
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+# ==========================================
+# BuildManifest
+# ==========================================
+
+def test_manifest_hit_miss_and_persistence(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = BuildManifest(path)
+    digest = BuildManifest.digest("wares.xml", "abc")
+    assert manifest.lookup("libraries/wares.xml", digest) is None
+    manifest.record("libraries/wares.xml", digest, size=3)
+    assert manifest.lookup("libraries/wares.xml", digest) == {"inputs": digest, "size": 3}
+    # 输入摘要变化即失效
+    assert manifest.lookup("libraries/wares.xml", BuildManifest.digest("wares.xml", "abd")) is None
+    manifest.save()
+    assert BuildManifest(path).lookup("libraries/wares.xml", digest) is not None
+    # --no-cache: 忽略已有清单
+    assert BuildManifest(path, enabled=False).lookup("libraries/wares.xml", digest) is None
+
+
+def test_file_digest_follows_content(tmp_path):
+    src = str(tmp_path / "a.xml")
+    write(src, "<a/>")
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    first = manifest.file_digest(src)
+    write(src, "<b/>")
+    os.utime(src, ns=(0, 1))  # 确保 mtime 变化
+    assert manifest.file_digest(src) != first
+    os.remove(src)
+    assert manifest.file_digest(src) is None
+
+
+def test_file_digest_reuses_hash_for_same_size_and_mtime(tmp_path):
+    src = str(tmp_path / "a.xml")
+    write(src, "<a/>")
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    first = manifest.file_digest(src)
+    st = os.stat(src)
+    write(src, "<b/>")
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert manifest.file_digest(src) == first
+
+
+def test_prune_drops_stale_outputs(tmp_path):
+    manifest = BuildManifest(str(tmp_path / "manifest.json"))
+    for key in ("macros/a", "macros/b", "libraries/c"):
+        manifest.record(key, "x")
+    manifest.prune("macros/", {"macros/a"})
+    assert set(manifest.outputs) == {"macros/a", "libraries/c"}
+
+
+# ==========================================
+# StageCache
+# ==========================================
+
+def test_stage_cache_hit_miss_and_salt(tmp_path):
+    cache = StageCache(str(tmp_path), salt="v1")
+    digest = cache.digest("modules", 1)
+    assert cache.load("database", digest) is None
+    cache.store("database", digest, {"modules": [1]})
+    assert cache.load("database", digest) == {"modules": [1]}
+    assert cache.load("database", cache.digest("modules", 2)) is None
+    # 处理脚本变化 (salt) 时所有阶段失效
+    assert StageCache(str(tmp_path), salt="v2").digest("modules", 1) != digest
+
+
+def test_stage_cache_keeps_recent_entries(tmp_path):
+    cache = StageCache(str(tmp_path), keep=2)
+    for i in range(3):
+        digest = cache.digest(i)
+        cache.store("database", digest, i)
+        os.utime(os.path.join(str(tmp_path), "database", digest + ".json"), ns=(i, i))
+    cache._prune("database")
+    assert cache.load("database", cache.digest(0)) is None
+    assert [cache.load("database", cache.digest(i)) for i in (1, 2)] == [1, 2]
+
+
+def test_stage_cache_lock(tmp_path):
+    cache = StageCache(str(tmp_path))
+    assert cache.acquire("database", "d")
+    assert not cache.acquire("database", "d")
+    cache.release("database", "d")
+    # 持有者结束但没有写入结果
+    assert cache.wait("database", "d") is None
+    assert cache.acquire("database", "d")
+
+
+def test_write_text_if_changed(tmp_path):
+    path = str(tmp_path / "out.json")
+    assert write_text_if_changed(path, "{}")
+    assert not write_text_if_changed(path, "{}")
+    assert write_text_if_changed(path, "[]")
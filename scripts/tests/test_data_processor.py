@@ -0,0 +1,12 @@
+import pytest
+
+from x4_data_processor import X4PrecisionLoader
+
+
+def test_missing_macros_raises_instead_of_exiting(tmp_path):
+    libraries = tmp_path / "raw" / "libraries"
+    libraries.mkdir(parents=True)
+    (libraries / "wares_final.xml").write_text("<wares/>", encoding="utf-8")
+    loader = X4PrecisionLoader(str(tmp_path / "raw"), str(tmp_path / "out"), {})
+    with pytest.raises(FileNotFoundError, match="macros_final.xml"):
+        loader.scan_assets()
@@ -0,0 +1,20 @@
+from pipeline_suite import find_regressions
+
+
+def entry(seconds, host="ci", scale=1, jobs=1):
+    return {"host": host, "scale": scale, "jobs": jobs,
+            "stages": {stage: {"seconds": s} for stage, s in seconds.items()}}
+
+
+def test_reports_slower_stages_against_same_setup():
+    history = [entry({"save": 1.0, "scan_assets": 1.0}), entry({"save": 9.0}, host="laptop")]
+    prev, regressions = find_regressions(entry({"save": 1.5, "scan_assets": 1.1}), history, threshold=0.2)
+    assert prev is history[0]
+    assert regressions == [("save", 1.0, 1.5)]
+
+
+def test_ignores_jitter_and_new_setups():
+    history = [entry({"save": 0.01})]
+    # 比例超过阈值但不到 50ms
+    assert find_regressions(entry({"save": 0.05}), history, threshold=0.2)[1] == []
+    assert find_regressions(entry({"save": 5.0}, scale=10), history, threshold=0.2) == (None, [])
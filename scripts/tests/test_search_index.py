@@ -0,0 +1,62 @@
+from x4_search_index import _CJK_TOKEN, _PREFIX, _GRAM, build_search_index, normalize, tokenize
+
+MODULES = [
+    {"id": "module_gen_prod_energycells_01", "name": "Solar Power Plant", "nameId": "{1,1}", "group": "energy"},
+    {"id": "module_arg_hab_m_01", "name": "Argon M Habitat", "nameId": "{1,2}", "group": "habitation"},
+    {"id": "module_ter_prod_computronicsubstrate_01", "name": "Computronic Substrate Factory", "nameId": "{1,3}", "group": "hightech"},
+]
+GROUPS = [
+    {"id": "energy", "name": "Energy", "type": "production"},
+    {"id": "habitation", "name": "Habitation", "type": "habitation"},
+    {"id": "hightech", "name": "High Tech", "type": "production"},
+]
+I18N = {
+    "de": {"{1,1}": "Solarkraftwerk", "{1,2}": "Argonisches Wohnmodul (M)", "{1,3}": "Computronik-Substrat-Fabrik"},
+    "zh-CN": {"{1,1}": "太阳能发电厂", "{1,2}": "阿尔贡中型居住舱", "{1,3}": "计算基质工厂"},
+}
+
+
+# ==========================================
+# 与 searchIndex.ts 的候选查询相同
+# ==========================================
+
+def query_keys(token):
+    if _CJK_TOKEN.match(token):
+        return [token] if len(token) == 1 else [token[i:i + 2] for i in range(len(token) - 1)]
+    return [token] if len(token) <= _PREFIX else [token[i:i + _GRAM] for i in range(len(token) - _GRAM + 1)]
+
+
+def can_use_index(tokens):
+    return bool(tokens) and (bool(_CJK_TOKEN.match(tokens[0])) or len(tokens[0]) > _PREFIX)
+
+
+def candidates(index, tokens):
+    docs = None
+    for key in (k for t in tokens for k in query_keys(t)):
+        posting = set(index["postings"]["m"].get(key, []))
+        docs = posting if docs is None else docs & posting
+    return {index["modules"][i] for i in docs or ()}
+
+
+def test_index_candidates_cover_every_substring_match():
+    # 索引可用时，候选必须包含所有按子串命中的模块 (前端只校验候选)
+    for iso, i18n in [("en", {})] + list(I18N.items()):
+        index = build_search_index(iso, MODULES, GROUPS, i18n)
+        for module in MODULES:
+            fields = [module["id"], module["name"]] + ([i18n[module["nameId"]]] if iso != "en" else [])
+            for text in fields:
+                text = normalize(text, iso)
+                for start in range(len(text)):
+                    for end in range(start + 1, len(text) + 1):
+                        tokens = tokenize(text[start:end], iso)
+                        if can_use_index(tokens):
+                            assert module["id"] in candidates(index, tokens), (iso, text[start:end])
+
+
+def test_short_mid_word_queries_fall_back_to_scan():
+    # "ll" 在 energycells 中间: 索引只有词首前缀，必须回退到逐个扫描
+    index = build_search_index("en", MODULES, GROUPS, {})
+    tokens = tokenize("ll", "en")
+    assert not can_use_index(tokens)
+    assert "module_gen_prod_energycells_01" not in candidates(index, tokens)
+    assert can_use_index(tokenize("太", "zh-CN"))
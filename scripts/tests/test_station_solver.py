@@ -0,0 +1,80 @@
+from itertools import product
+
+import pytest
+
+from x4_station_solver import build_station_ratios, solve_target
+
+# 小型生产链: a <- b <- ore (矿物外部输入)；工人每人每小时吃 1 份 food
+#   prod_a: 100 a/h，消耗 150 b，10 工人
+#   prod_b:  60 b/h，消耗 30 ore，20 工人
+#   prod_food: 36 food/h，无工人
+#   hab: 容纳 100 工人
+
+
+def module(mid, mtype, outputs=None, inputs=None, needed=0, capacity=0):
+    return {"id": mid, "type": mtype, "method": "default", "race": "argon", "isPlayerBlueprint": True,
+            "outputs": outputs or {}, "inputs": inputs or {},
+            "workforce": {"needed": needed, "capacity": capacity, "maxBonus": 0}}
+
+
+MODULES = [
+    module("prod_a", "production", {"a": 100}, {"b": 150}, needed=10),
+    module("prod_b", "production", {"b": 60}, {"ore": 30}, needed=20),
+    module("prod_food", "production", {"food": 36}),
+    module("hab", "habitation", capacity=100),
+]
+WARES = [{"id": "a", "transport": "container"}, {"id": "b", "transport": "container"},
+         {"id": "food", "transport": "container"}, {"id": "ore", "transport": "solid"}]
+CONSUMPTION = {"argon": {"food": 1 / 3600}}
+
+
+@pytest.fixture(scope="module")
+def entry():
+    ratios, failed = build_station_ratios(MODULES, WARES, CONSUMPTION, max_count=4)
+    assert failed == []
+    return ratios["stations"]["a"]["argon"]["default"]
+
+
+def feasible(count, a, b, food, hab):
+    workers = 10 * a + 20 * b
+    return 100 * a >= 100 * count and 60 * b >= 150 * a and 36 * food >= workers and 100 * hab >= workers
+
+
+def test_exact_ratio(entry):
+    assert entry["modules"] == ["prod_a", "prod_b", "prod_food", "hab"]
+    assert entry["ratio"] == pytest.approx([1, 2.5, 60 / 36, 0.6])
+    assert entry["workforce"] == pytest.approx(60)
+    assert entry["imports"] == {"ore": pytest.approx(75)}
+    # 分母的最小公倍数为 30，超出预展开范围
+    assert entry["period"] is None
+
+
+def test_mixes_are_optimal(entry):
+    assert entry["mixes"][:2] == [[1, 3, 2, 1], [2, 5, 4, 2]]
+    for count, mix in enumerate(entry["mixes"], start=1):
+        solutions = [x for x in product(range(12), repeat=4) if feasible(count, *x)]
+        assert feasible(count, *mix)
+        # 逐元素最小，因此也是模块总数最少的解
+        assert all(all(m <= v for m, v in zip(mix, x)) for x in solutions)
+        assert sum(mix) == min(map(sum, solutions))
+
+
+def test_memo_reuses_unchanged_entries():
+    memo = {}
+    first, _ = build_station_ratios(MODULES, WARES, CONSUMPTION, max_count=4, memo=memo)
+    assert memo
+    # 输入未变的条目直接取自 memo (同一对象)，不重新求解
+    again, _ = build_station_ratios(MODULES, WARES, CONSUMPTION, max_count=4, memo=memo)
+    assert again["stations"]["a"]["argon"]["default"] is first["stations"]["a"]["argon"]["default"]
+    changed = [dict(m, outputs={"b": 75}) if m["id"] == "prod_b" else m for m in MODULES]
+    updated, _ = build_station_ratios(changed, WARES, CONSUMPTION, max_count=4, memo=memo)
+    assert updated["stations"]["a"]["argon"]["default"]["ratio"][1] == pytest.approx(2)
+
+
+def test_solve_target_matches_table(entry):
+    for count, mix in enumerate(entry["mixes"], start=1):
+        expected = {m: n for m, n in zip(entry["modules"], mix) if n}
+        assert solve_target(MODULES, WARES, CONSUMPTION, "a", "argon", count=count) == expected
+    # 超出预展开范围时直接求解
+    assert feasible(25, *solve_target(MODULES, WARES, CONSUMPTION, "a", "argon", count=25).values())
+    assert solve_target(MODULES, WARES, CONSUMPTION, "ore", "argon") is None
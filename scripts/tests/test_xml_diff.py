@@ -0,0 +1,137 @@
+import glob
+import os
+
+import pytest
+from lxml import etree
+
+from x4_xml_diff import Apply_Patch, XMLDiffError
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "xml_diff")
+
+BASE = """<wares>
+  <ware id="a" price="1"><tag>x</tag></ware>
+  <ware id="b" price="2"/>
+</wares>"""
+
+
+def apply(patch, base=BASE):
+    root = etree.fromstring(base)
+    Apply_Patch(root, etree.fromstring(f"<diff>{patch}</diff>"))
+    return root
+
+
+def ids(root, path="ware"):
+    return [e.get("id") for e in root.findall(path)]
+
+
+# ==========================================
+# sel / pos
+# ==========================================
+
+def test_add_appends_by_default():
+    root = apply('<add sel="/wares"><ware id="c"/></add>')
+    assert ids(root) == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("pos, expected", [
+    ("before", ["c", "a", "b"]),
+    ("after", ["a", "c", "b"]),
+])
+def test_add_pos(pos, expected):
+    root = apply(f'<add sel="/wares/ware[@id=\'a\']" pos="{pos}"><ware id="c"/></add>')
+    assert ids(root) == expected
+
+
+def test_add_prepend_inserts_first_child():
+    root = apply('<add sel="/wares/ware[@id=\'a\']" pos="prepend"><size/></add>')
+    assert [e.tag for e in root.find("ware[@id='a']")] == ["size", "tag"]
+
+
+def test_add_keeps_content_order():
+    root = apply('<add sel="/wares/ware[@id=\'a\']" pos="after"><ware id="c"/><ware id="d"/></add>')
+    assert ids(root) == ["a", "c", "d", "b"]
+
+
+def test_consecutive_appends_to_same_sel_keep_order():
+    root = apply('<add sel="/wares"><ware id="c"/></add><add sel="/wares"><ware id="d"/></add>')
+    assert ids(root) == ["a", "b", "c", "d"]
+
+
+def test_add_attribute():
+    root = apply('<add sel="/wares/ware[@id=\'b\']" type="@tags">economy</add>')
+    assert root.find("ware[@id='b']").get("tags") == "economy"
+
+
+def test_replace_attribute_and_element():
+    root = apply('<replace sel="/wares/ware[@id=\'a\']/@price">5</replace>'
+                 '<replace sel="/wares/ware[@id=\'b\']"><ware id="b2"/></replace>')
+    assert root.find("ware[@id='a']").get("price") == "5"
+    assert ids(root) == ["a", "b2"]
+
+
+def test_remove_attribute_and_element():
+    root = apply('<remove sel="/wares/ware[@id=\'a\']/@price"/><remove sel="/wares/ware[@id=\'b\']"/>')
+    assert ids(root) == ["a"]
+    assert root.find("ware").get("price") is None
+
+
+def test_replace_missing_attribute_fails():
+    with pytest.raises(XMLDiffError, match="属性不存在"):
+        apply('<replace sel="/wares/ware[@id=\'b\']/@volume">5</replace>')
+
+
+def test_multiple_matches_need_msel():
+    with pytest.raises(XMLDiffError, match="2 个节点"):
+        apply('<remove sel="/wares/ware"/>')
+    assert ids(apply('<remove sel="/wares/ware" msel="true"/>')) == []
+
+
+def test_unmatched_sel_fails_unless_silent():
+    with pytest.raises(XMLDiffError, match="未匹配"):
+        apply('<remove sel="/wares/ware[@id=\'z\']"/>')
+    assert ids(apply('<remove sel="/wares/ware[@id=\'z\']" silent="true"/>')) == ["a", "b"]
+
+
+def test_failed_op_does_not_stop_the_rest():
+    root = etree.fromstring(BASE)
+    patch = etree.fromstring('<diff><remove sel="/wares/ware[@id=\'z\']"/><add sel="/wares"><ware id="c"/></add></diff>')
+    with pytest.raises(XMLDiffError) as error:
+        Apply_Patch(root, patch)
+    assert ids(root) == ["a", "b", "c"]
+    assert error.value.applied == 1
+
+
+# ==========================================
+# if
+# ==========================================
+
+def test_if_true_applies():
+    root = apply('<add sel="/wares" if="/wares/ware[@id=\'a\']"><ware id="c"/></add>')
+    assert ids(root) == ["a", "b", "c"]
+
+
+def test_if_false_skips_without_error():
+    root = apply('<add sel="/wares" if="not(/wares/ware[@id=\'a\'])"><ware id="c"/></add>'
+                 '<remove sel="/wares/ware[@id=\'z\']" if="/wares/ware[@id=\'z\']"/>')
+    assert ids(root) == ["a", "b"]
+
+
+def test_if_is_evaluated_after_earlier_ops():
+    root = apply('<add sel="/wares"><ware id="c"/></add>'
+                 '<add sel="/wares" if="/wares/ware[@id=\'c\']"><ware id="d"/></add>')
+    assert ids(root) == ["a", "b", "c", "d"]
+
+
+# ==========================================
+# 对照: 真实 wares.xml 片段 + DLC 补丁 (fixtures/xml_diff)
+# expected_wares.xml 可用 benchmarks/xml_diff_parity.py --capture-fixture 由 Customizer 重新生成
+# ==========================================
+
+def test_dlc_patches_match_reference_output():
+    parser = etree.XMLParser(remove_blank_text=True)
+    tree = etree.parse(os.path.join(FIXTURE_DIR, "wares.xml"), parser)
+    for patch_path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "0*.xml"))):
+        Apply_Patch(tree.getroot(), etree.parse(patch_path, parser).getroot())
+    with open(os.path.join(FIXTURE_DIR, "expected_wares.xml"), "rb") as f:
+        expected = f.read()
+    assert etree.tostring(tree, encoding="utf-8", xml_declaration=True, pretty_print=True) == expected
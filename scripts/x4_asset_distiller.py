@@ -1,9 +1,21 @@
 import os
 import shutil
-import glob
 import json
 import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from lxml import etree
+from x4_build_cache import BuildManifest, sync_directory
+from x4_structure_index import StructureIndex
+from x4_extensions import resolve_extensions, PatchConflicts
+from x4_projection import PROJECTIONS, project_library, projection_digest
+from x4_profiling import StageProfiler
+import x4_xml_diff
+
+MANIFEST_NAME = '.distill_manifest.json'
+STRUCTURE_INDEX_NAME = '.structure_index.json'
+EXTENSIONS_REPORT_NAME = '.extensions_report.json'
 
 def load_all_configs():
     config_file = 'x4-game.config.json'
@@ -29,10 +41,165 @@ def setup_customizer(m_config):
     except ImportError:
         raise ImportError("❌ 错误: 无法加载 Customizer 框架逻辑。")
 
-def main():
+def load_patch_engine(m_config, engine):
+    # native: 内置补丁引擎 (默认)；customizer: 外部 X4 Customizer 的 XML_Diff，用于对照验证
+    if engine == 'customizer':
+        return setup_customizer(m_config)
+    return x4_xml_diff
+
+def merge_macro(macro_id, sources, dlc_order, xml_diff):
+    # 合并单个宏: Base + 按 dlc_order 应用 DLC，返回序列化后的 <macro> 片段 (无结果时返回 None)
+    parser = etree.XMLParser(remove_blank_text=True)
+    # 加载 Base (如果存在)
+    current_tree = None
+    if 'base' in sources:
+        try:
+            current_tree = etree.parse(sources['base'], parser)
+        except: pass
+    
+    # 按顺序应用 DLC
+    for dlc_id in dlc_order:
+        if dlc_id in sources:
+            f_path = sources[dlc_id]
+            try:
+                # 🚨 安全熔断检查 🚨
+                # 读取并解析以检查非法 patch
+                dlc_tree = etree.parse(f_path, parser)
+                dlc_root = dlc_tree.getroot()
+                
+                # 检查所有 add, replace, remove 节点
+                for node in dlc_root.xpath("//*[self::add or self::replace or self::remove]"):
+                    sel = node.get('sel', '')
+                    # 检查 sel 是否指向 /wares (即修改全局配方)
+                    if sel and (sel.strip().startswith('/wares') or '/wares/' in sel):
+                        print(f"\n❌ 严重违规: DLC ({dlc_id}) 文件试图修改全局 wares 配方!")
+                        print(f"   文件: {f_path}")
+                        print(f"   节点: <{node.tag} sel='{sel}'>")
+                        raise RuntimeError("🛡️ 安全熔断触发: 检测到非法的全局配方修改操作。")
+
+                # 合并逻辑
+                if dlc_root.tag == 'diff':
+                    if current_tree:
+                        # Apply patch
+                        xml_diff.Apply_Patch(current_tree.getroot(), dlc_root)
+                    else:
+                        # 只有 diff 没有 base? 跳过
+                        pass
+                else:
+                    # Full replacement (macro definition)
+                    current_tree = dlc_tree
+            
+            except Exception as e:
+                if "安全熔断" in str(e): raise # 抛出熔断
+                print(f"      ⚠️ 处理出错 {macro_id} ({dlc_id}): {e}")
+
+    # 添加到聚合根
+    if current_tree:
+        root_node = current_tree.getroot()
+        # 找到 macro 节点 (可能是 root，也可能在里面)
+        macro_node = root_node if root_node.tag == 'macro' else root_node.find(f".//macro[@name='{macro_id}']")
+        
+        if macro_node is not None:
+            # 先挂到空的聚合根下再序列化，避免带出原文件中未使用的命名空间声明
+            holder = etree.Element('macros')
+            holder.append(macro_node)
+            return etree.tostring(macro_node, encoding='utf-8')
+    return None
+
+_worker_xml_diff = None
+
+def _init_macro_worker(m_config, engine):
+    global _worker_xml_diff
+    _worker_xml_diff = load_patch_engine(m_config, engine)
+
+def _merge_macro_batch(batch, dlc_order):
+    return [(macro_id, merge_macro(macro_id, sources, dlc_order, _worker_xml_diff)) for macro_id, sources in batch]
+
+def aggregate_macros(macro_ids, macro_index, dlc_order, xml_diff, m_config, jobs, engine='native'):
+    # 返回 macro_id -> <macro> 片段；jobs > 1 时分批交给进程池，任一批次触发熔断即取消其余任务
+    if jobs <= 1 or len(macro_ids) < 2:
+        return {macro_id: merge_macro(macro_id, macro_index[macro_id], dlc_order, xml_diff) for macro_id in macro_ids}
+
+    batch_size = max(1, -(-len(macro_ids) // (jobs * 4)))
+    batches = [[(m, macro_index[m]) for m in macro_ids[i:i + batch_size]] for i in range(0, len(macro_ids), batch_size)]
+    fragments = {}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_macro_worker, initargs=(m_config, engine)) as pool:
+        futures = [pool.submit(_merge_macro_batch, batch, dlc_order) for batch in batches]
+        try:
+            for future in as_completed(futures):
+                fragments.update(future.result())
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    return fragments
+
+def customizer_version(xml_diff, manifest):
+    # Customizer 版本号 + XML_Diff 源文件哈希，任一变化都会使合并缓存失效
+    version = None
+    try:
+        from Framework import Get_Version # type: ignore
+        version = Get_Version()
+    except Exception:
+        pass
+    module_file = getattr(xml_diff, '__file__', None)
+    return [version, manifest.file_digest(module_file) if module_file else None]
+
+def report_extensions(dest_root, extensions, order, problems, stats, patch_conflicts, macro_overlaps):
+    # 耗时最长的扩展 + 完整报告 (加载顺序 / 问题 / 逐个扩展耗时 / 冲突) 写入 .extensions_report.json
+    slowest = sorted(order, key=lambda k: -(stats[k]["library_time"] + stats[k]["structure_time"]))[:10]
+    if slowest:
+        print(f"   ⏱️ {'extension':<28} | {'patches':>7} | {'libraries (ms)':>14} | {'structures (ms)':>15}")
+        for dlc_id in slowest:
+            st = stats[dlc_id]
+            print(f"   ⏱️ {dlc_id:<28} | {st['patches']:>7} | {st['library_time'] * 1000:>14.1f} | {st['structure_time'] * 1000:>15.1f}")
+    report = {
+        "order": [{"id": k, "folder": extensions[k].folder, "name": extensions[k].name, "version": extensions[k].version,
+                   "dependencies": [dep for dep, _ in extensions[k].dependencies], **stats[k]} for k in order],
+        "problems": problems,
+        "patchConflicts": [{"library": lib_file, "sel": sel, "ops": [[dlc_id, op] for dlc_id, op in ops]}
+                           for lib_file, sel, ops in patch_conflicts],
+        "macroOverlaps": macro_overlaps,
+    }
+    with open(os.path.join(dest_root, EXTENSIONS_REPORT_NAME), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="X4 资产蒸馏: 合并 DLC 补丁并聚合空间站宏定义")
+    parser.add_argument('--force', action='store_true', help="忽略构建清单，清空输出目录后全量重建")
+    parser.add_argument('--jobs', type=int, default=1, help="宏聚合的并行进程数 (0 = CPU 核心数，默认串行)")
+    parser.add_argument('--diff-engine', choices=['native', 'customizer'], default='native',
+                        help="补丁引擎: 内置实现 (默认) 或 X4 Customizer (需要 CUSTOMIZER_PATH)")
+    parser.add_argument('--projection', action='store_true',
+                        help="投影模式: wares_final.xml 只保留处理器读取的元素与属性 (字段清单见 x4_projection.py)")
+    parser.add_argument('--profile', nargs='?', const='.profile', metavar='DIR', help="按步骤输出 cProfile 统计 (默认目录 .profile)")
+    parser.add_argument('--trace', metavar='FILE', help="输出 Chrome Trace JSON (chrome://tracing / Perfetto)")
+    return parser.parse_args(argv)
+
+def hand_off_cached(handoff, path, digest, parser):
+    # 复用磁盘上的 _final.xml 时也解析一次交给处理器，保证每次运行都走内存交接
+    if handoff is None: return
+    handoff[os.path.basename(path)] = (etree.parse(path, parser).getroot(), digest)
+
+def finish_profile(profiler, args, owns_profiler):
+    # 结束最后一个步骤；外部传入的 profiler 由调用方负责汇总输出
+    profiler.stop()
+    if not owns_profiler: return
+    profiler.report()
+    if args.trace: profiler.write_trace(args.trace)
+
+def main(argv=None, profiler=None, handoff=None, write_final=True):
+    """handoff: 传入字典时，本次合并 (或复用) 的结果以 {文件名: (lxml 根节点, 输入摘要)} 交给同进程的处理器，
+    此时 write_final=False 可跳过写出 *_final.xml (仅作调试产物)。"""
+    args = parse_args(argv)
+    # 步骤计时: 每个步骤的墙钟/CPU 时间、峰值内存与条目数，结束时汇总输出
+    owns_profiler = profiler is None
+    profiler = profiler or StageProfiler("distiller", profile_dir=args.profile)
+    if handoff is None: write_final = True
+    final_digests = {}
     # 1. 加载配置与初始化
+    profiler.start("setup")
     m_config, v_config = load_all_configs()
-    xml_diff = setup_customizer(m_config)
+    xml_diff = load_patch_engine(m_config, args.diff_engine)
     
     paths = m_config['X4_PATHS']
     src = paths['SOURCE']
@@ -40,31 +207,58 @@ def main():
 
     print(f"🧪 开始资产蒸馏流: {v_config['folder_name']}")
     
-    if os.path.exists(dest_root):
+    if args.force and os.path.exists(dest_root):
         shutil.rmtree(dest_root)
     os.makedirs(dest_root, exist_ok=True)
 
+    # 构建清单: 记录输入内容哈希，未变化的合并直接复用上次输出
+    manifest = BuildManifest(os.path.join(dest_root, MANIFEST_NAME), enabled=not args.force)
+    cust_version = customizer_version(xml_diff, manifest)
+
     # --- 步骤 1: 拷贝语言包 (t/) ---
+    counts = profiler.start("sync_text")
     if os.path.exists(os.path.join(src, "t")):
-        shutil.copytree(os.path.join(src, "t"), os.path.join(dest_root, "t"))
-        print("✅ [1/4] 语言包已拷贝。")
+        copied = sync_directory(os.path.join(src, "t"), os.path.join(dest_root, "t"))
+        counts["files_copied"] = copied
+        print(f"✅ [1/4] 语言包已同步 ({copied} 个文件更新)。")
 
     # --- 步骤 2: 处理核心库文件 (wares & waregroups) ---
     print("📂 [2/4] 正在处理核心库文件 (Wares & Waregroups)...")
+    counts = profiler.start("merge_libraries")
+    counts.update(libraries_merged=0, libraries_reused=0, patches_applied=0, patches_partial=0)
     lib_dest_dir = os.path.join(dest_root, "libraries")
     os.makedirs(lib_dest_dir, exist_ok=True)
 
     lib_files = ['wares.xml', 'waregroups.xml']
     parser = etree.XMLParser(remove_blank_text=True)
-    dlc_order = v_config.get('dlc_order', [])
+    # 扩展: 扫描 SOURCE/extensions 并按依赖排序 (dlc_order 只决定无依赖约束时的先后)
+    extensions, dlc_order, ext_problems = resolve_extensions(src, v_config)
+    print(f"   🧩 {len(extensions)} 个扩展，{len(dlc_order)} 个参与合并: {', '.join(dlc_order[:10])}{' ...' if len(dlc_order) > 10 else ''}")
+    for problem in ext_problems:
+        print(f"      ⚠️ {problem}")
+    counts["extensions"] = len(dlc_order)
+    ext_stats = {dlc_id: {"patches": 0, "library_time": 0.0, "structure_time": 0.0} for dlc_id in dlc_order}
+    conflicts = PatchConflicts()
 
     for lib_file in lib_files:
         print(f"   🔨 处理 {lib_file} ...")
         # 1. 拷贝 Base
         base_src = os.path.join(src, "libraries", lib_file)
         target_path = os.path.join(lib_dest_dir, lib_file)
+        final_name = lib_file.replace('.xml', '_final.xml')
+        projection = PROJECTIONS.get(lib_file) if args.projection else None
         
         if os.path.exists(base_src):
+            patch_digests = [(dlc_id, manifest.file_digest(extensions[dlc_id].libraries[lib_file])) for dlc_id in dlc_order if lib_file in extensions[dlc_id].libraries]
+            digest_parts = [lib_file, dlc_order, cust_version, manifest.file_digest(base_src), patch_digests]
+            if projection: digest_parts.append(projection_digest(projection))
+            lib_digest = manifest.digest(*digest_parts)
+            final_digests[final_name] = lib_digest
+            if manifest.lookup(final_name, lib_digest) and os.path.exists(os.path.join(lib_dest_dir, final_name)) and os.path.exists(target_path):
+                print(f"      ♻️ 输入未变化，复用 {final_name}")
+                counts["libraries_reused"] += 1
+                hand_off_cached(handoff, os.path.join(lib_dest_dir, final_name), lib_digest, parser)
+                continue
             shutil.copy2(base_src, target_path)
         else:
             print(f"      ⚠️ Base 文件不存在: {base_src}")
@@ -73,121 +267,185 @@ def main():
         # 2. 合并 DLC Patch
         base_tree = etree.parse(target_path, parser)
         for dlc_id in dlc_order:
-            # Patch 位于 SOURCE 目录的 extensions 中
-            patch_path = os.path.join(src, "extensions", dlc_id, "libraries", lib_file)
-            if os.path.exists(patch_path):
+            # Patch 位于扩展目录的 libraries 中 (扫描扩展时已记录)
+            patch_path = extensions[dlc_id].libraries.get(lib_file)
+            if patch_path:
                 print(f"      [+] 注入补丁 ({dlc_id})")
+                patch_start = time.perf_counter()
                 try:
                     patch_tree = etree.parse(patch_path, parser)
-                    xml_diff.Apply_Patch(base_tree.getroot(), patch_tree.getroot())
+                    conflicts.record(lib_file, dlc_id, patch_tree.getroot())
+                    try:
+                        xml_diff.Apply_Patch(base_tree.getroot(), patch_tree.getroot())
+                    except x4_xml_diff.XMLDiffError as e:
+                        # 内置引擎在汇总报错前已执行其余操作: 补丁已部分生效，单独计数
+                        if not e.applied: raise
+                        counts["patches_partial"] += 1
+                        print(f"      ⚠️ 警告: 补丁部分失败 {dlc_id} (已执行 {e.applied} 个操作): {e}")
+                    counts["patches_applied"] += 1
+                    ext_stats[dlc_id]["patches"] += 1
                 except Exception as e:
                     print(f"      ⚠️ 警告: 补丁失败 {dlc_id}: {e}")
+                ext_stats[dlc_id]["library_time"] += time.perf_counter() - patch_start
         
         # 3. 写入 Final
+        final_tree = base_tree
+        if projection:
+            final_tree = etree.ElementTree(project_library(base_tree.getroot(), projection))
+            print(f"      ✂️ 投影: 保留 {len(final_tree.getroot())} / {len(base_tree.getroot())} 个元素")
         final_output_path = os.path.join(lib_dest_dir, lib_file.replace('.xml', '_final.xml'))
-        base_tree.write(final_output_path, encoding='utf-8', xml_declaration=True, pretty_print=True)
+        if handoff is not None: handoff[final_name] = (final_tree.getroot(), lib_digest)
+        counts["libraries_merged"] += 1
+        if not write_final:
+            # 删除旧的产物，避免单独运行处理器时读到过期数据
+            if os.path.exists(final_output_path): os.remove(final_output_path)
+            print(f"      ✨ 已合并: {final_name} (内存交接，未写出)")
+            continue
+        # 投影结果只供处理器读取，不缩进
+        final_tree.write(final_output_path, encoding='utf-8', xml_declaration=True, pretty_print=not projection)
+        manifest.record(final_name, lib_digest)
         print(f"      ✨ 生成: {os.path.basename(final_output_path)}")
+    manifest.save()
+    patch_conflicts = conflicts.conflicts()
+    for lib_file, sel, ops in patch_conflicts[:10]:
+        print(f"      ⚔️ 补丁冲突 {lib_file} {sel}: {' -> '.join(f'{dlc_id}({op})' for dlc_id, op in ops)}")
+    if len(patch_conflicts) > 10:
+        print(f"      ⚔️ ... 共 {len(patch_conflicts)} 处补丁冲突 (详见 {EXTENSIONS_REPORT_NAME})")
 
     # --- 步骤 3: 聚合宏定义 (Macros) ---
     print("∑ [3/4] 正在聚合空间站宏定义 (macros_final.xml)...")
+    counts = profiler.start("index_structures")
     
     # 3.1 解析引用 (Needed Macros)
     needed_macros = set()
     wares_final_path = os.path.join(lib_dest_dir, "wares_final.xml")
-    if os.path.exists(wares_final_path):
-        w_tree = etree.parse(wares_final_path)
-        for ware in w_tree.findall(".//ware"):
-            tags = ware.get('tags', '')
-            if 'module' in tags:
-                comp = ware.find('component')
-                if comp is not None and comp.get('ref'):
-                    needed_macros.add(comp.get('ref'))
+    wares_root = handoff['wares_final.xml'][0] if handoff and 'wares_final.xml' in handoff else None
+    if wares_root is not None or os.path.exists(wares_final_path):
+        wares_digest = final_digests.get('wares_final.xml') or manifest.file_digest(wares_final_path)
+        cached_refs = manifest.lookup('needed_macros', wares_digest)
+        if cached_refs:
+            needed_macros.update(cached_refs['macros'])
+        else:
+            w_tree = wares_root if wares_root is not None else etree.parse(wares_final_path)
+            for ware in w_tree.findall(".//ware"):
+                tags = ware.get('tags', '')
+                if 'module' in tags:
+                    comp = ware.find('component')
+                    if comp is not None and comp.get('ref'):
+                        needed_macros.add(comp.get('ref'))
+            manifest.record('needed_macros', wares_digest, macros=sorted(needed_macros))
     print(f"   🎯 识别到 {len(needed_macros)} 个空间站相关宏引用。")
+    counts["needed_macros"] = len(needed_macros)
 
     # 3.2 建立索引 (Find files)
     # macro_id -> { 'base': path, 'dlc_id': path, ... }
     macro_index = {}
+    structure_index = StructureIndex(os.path.join(v_config['raw_assets_dir'], STRUCTURE_INDEX_NAME))
     
     def scan_to_index(root_path, source_key):
-        pattern = os.path.join(root_path, "assets", "structures", "**", "*.xml")
-        for f in glob.glob(pattern, recursive=True):
-            fname = os.path.splitext(os.path.basename(f))[0]
+        for fname, f in structure_index.lookup(source_key, root_path).items():
             if fname not in macro_index: macro_index[fname] = {}
             macro_index[fname][source_key] = f
+        for fname, dup_paths in structure_index.duplicates(source_key).items():
+            if fname in needed_macros:
+                print(f"      ⚠️ 重复的结构文件名 {fname} ({source_key}): 使用 {dup_paths[0]}，忽略 {', '.join(dup_paths[1:])}")
 
     # 扫描
     scan_to_index(src, 'base')
     for dlc_id in dlc_order:
-        p = os.path.join(src, "extensions", dlc_id)
-        if os.path.exists(p): scan_to_index(p, dlc_id)
+        scan_start = time.perf_counter()
+        scan_to_index(extensions[dlc_id].path, dlc_id)
+        ext_stats[dlc_id]["structure_time"] += time.perf_counter() - scan_start
+    structure_index.save()
+    dup_total = sum(len(structure_index.duplicates(k)) for k in ['base'] + dlc_order)
+    print(f"   🗂️ 结构文件索引: 重新扫描 {len(structure_index.refreshed)} 个来源，{dup_total} 个重复文件名。")
+    counts.update(indexed_macros=len(macro_index), rescanned_sources=len(structure_index.refreshed))
+    # 被多个扩展修改的宏 (按加载顺序依次合并，整体替换的定义会覆盖之前的补丁)
+    macro_overlaps = {m: [k for k in dlc_order if k in macro_index[m]] for m in sorted(needed_macros) if m in macro_index}
+    macro_overlaps = {m: keys for m, keys in macro_overlaps.items() if len(keys) > 1}
+    if macro_overlaps:
+        print(f"   ⚔️ {len(macro_overlaps)} 个宏被多个扩展修改: " + ", ".join(f"{m} ({' -> '.join(keys)})" for m, keys in list(macro_overlaps.items())[:5]))
+    report_extensions(dest_root, extensions, dlc_order, ext_problems, ext_stats, patch_conflicts, macro_overlaps)
+
+    counts = profiler.start("aggregate_macros")
 
     # 3.3 聚合与熔断检查
     macros_root = etree.Element('macros')
     processed_count = 0
+    macros_final_path = os.path.join(lib_dest_dir, "macros_final.xml")
 
-    for macro_id in needed_macros:
+    # 每个宏的输入摘要 (Base + 各 DLC 文件哈希)，按名称排序保证输出顺序稳定
+    macro_digests = {}
+    for macro_id in sorted(needed_macros):
         if macro_id not in macro_index: continue
         sources = macro_index[macro_id]
-        
-        # 加载 Base (如果存在)
-        current_tree = None
-        if 'base' in sources:
-            try:
-                current_tree = etree.parse(sources['base'], parser)
-            except: pass
-        
-        # 按顺序应用 DLC
-        for dlc_id in dlc_order:
-            if dlc_id in sources:
-                f_path = sources[dlc_id]
-                try:
-                    # 🚨 安全熔断检查 🚨
-                    # 读取并解析以检查非法 patch
-                    dlc_tree = etree.parse(f_path, parser)
-                    dlc_root = dlc_tree.getroot()
-                    
-                    # 检查所有 add, replace, remove 节点
-                    for node in dlc_root.xpath("//*[self::add or self::replace or self::remove]"):
-                        sel = node.get('sel', '')
-                        # 检查 sel 是否指向 /wares (即修改全局配方)
-                        if sel and (sel.strip().startswith('/wares') or '/wares/' in sel):
-                            print(f"\n❌ 严重违规: DLC ({dlc_id}) 文件试图修改全局 wares 配方!")
-                            print(f"   文件: {f_path}")
-                            print(f"   节点: <{node.tag} sel='{sel}'>")
-                            raise RuntimeError("🛡️ 安全熔断触发: 检测到非法的全局配方修改操作。")
-
-                    # 合并逻辑
-                    if dlc_root.tag == 'diff':
-                        if current_tree:
-                            # Apply patch
-                            xml_diff.Apply_Patch(current_tree.getroot(), dlc_root)
-                        else:
-                            # 只有 diff 没有 base? 跳过
-                            pass
-                    else:
-                        # Full replacement (macro definition)
-                        current_tree = dlc_tree
-                
-                except Exception as e:
-                    if "安全熔断" in str(e): raise # 抛出熔断
-                    print(f"      ⚠️ 处理出错 {macro_id} ({dlc_id}): {e}")
-
-        # 添加到聚合根
-        if current_tree:
-            root_node = current_tree.getroot()
-            # 找到 macro 节点 (可能是 root，也可能在里面)
-            macro_node = root_node if root_node.tag == 'macro' else root_node.find(f".//macro[@name='{macro_id}']")
-            
-            if macro_node is not None:
-                macros_root.append(macro_node)
-                processed_count += 1
+        source_digests = [(k, manifest.file_digest(sources[k])) for k in ['base'] + dlc_order if k in sources]
+        macro_digests[macro_id] = manifest.digest(dlc_order, cust_version, source_digests)
+    manifest.prune('macros/', {f"macros/{m}" for m in macro_digests})
+
+    aggregate_digest = manifest.digest(macro_digests)
+    if manifest.lookup('macros_final.xml', aggregate_digest) and os.path.exists(macros_final_path):
+        manifest.save()
+        print(f"♻️ 宏定义输入未变化，复用 macros_final.xml ({len(macro_digests)} 个宏)")
+        hand_off_cached(handoff, macros_final_path, aggregate_digest, parser)
+        print(f"✨ 全流程结束！资产已蒸馏至 {dest_root}")
+        counts.update(macros_merged=0, macros_reused=len(macro_digests))
+        finish_profile(profiler, args, owns_profiler)
+        return
+
+    # 上次聚合结果中的宏节点，供未变化的宏直接复用
+    previous_macros = {}
+    if os.path.exists(macros_final_path):
+        try:
+            for node in etree.parse(macros_final_path, parser).getroot().findall('macro'):
+                previous_macros[node.get('name')] = node
+        except etree.XMLSyntaxError:
+            previous_macros = {}
+    reused_count = 0
+
+    pending = []
+    for macro_id, m_digest in macro_digests.items():
+        cached = manifest.lookup(f"macros/{macro_id}", m_digest)
+        if cached and (not cached['emitted'] or macro_id in previous_macros):
+            reused_count += 1
+            continue
+        pending.append(macro_id)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    if jobs > 1 and len(pending) > 1:
+        print(f"   ⚙️ 使用 {jobs} 个进程并行合并 {len(pending)} 个宏...")
+    fragments = aggregate_macros(pending, macro_index, dlc_order, xml_diff, m_config, jobs, args.diff_engine)
+
+    # 按名称顺序组装，串行与并行结果一致
+    for macro_id, m_digest in macro_digests.items():
+        if macro_id in fragments:
+            fragment = fragments[macro_id]
+            manifest.record(f"macros/{macro_id}", m_digest, emitted=fragment is not None)
+            if fragment is None: continue
+            macro_node = etree.fromstring(fragment, parser)
+        elif manifest.outputs[f"macros/{macro_id}"]['emitted']:
+            macro_node = previous_macros[macro_id]
+        else:
+            continue
+        macros_root.append(macro_node)
+        processed_count += 1
 
     # 3.4 保存
-    macros_final_path = os.path.join(lib_dest_dir, "macros_final.xml")
-    etree.ElementTree(macros_root).write(macros_final_path, encoding='utf-8', xml_declaration=True, pretty_print=True)
-    print(f"✅ 聚合完成: 写入 {processed_count} 个宏定义到 macros_final.xml")
+    if handoff is not None: handoff['macros_final.xml'] = (macros_root, aggregate_digest)
+    if write_final:
+        etree.ElementTree(macros_root).write(macros_final_path, encoding='utf-8', xml_declaration=True, pretty_print=True)
+        manifest.record('macros_final.xml', aggregate_digest)
+    elif os.path.exists(macros_final_path):
+        os.remove(macros_final_path)
+    manifest.save()
+    if write_final:
+        print(f"✅ 聚合完成: 写入 {processed_count} 个宏定义到 macros_final.xml (复用 {reused_count} 个)")
+    else:
+        print(f"✅ 聚合完成: {processed_count} 个宏定义已在内存中交接，未写出 macros_final.xml (复用 {reused_count} 个)")
+    counts.update(macros_merged=len(pending), macros_reused=reused_count, macros_written=processed_count)
 
     print(f"✨ 全流程结束！资产已蒸馏至 {dest_root}")
+    finish_profile(profiler, args, owns_profiler)
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,221 @@
+import os
+import json
+import glob
+import time
+import shutil
+import hashlib
+
+# =============================================================================
+# 🧾 构建清单 (Build Manifest)
+# 记录每个输出所依赖输入的内容哈希，输入不变时跳过对应的合并步骤。
+# =============================================================================
+
+MANIFEST_VERSION = 1
+_CHUNK_SIZE = 1 << 20
+
+
+class BuildManifest:
+    def __init__(self, path, enabled=True):
+        self.path = path
+        self.files = {}    # 绝对路径 -> {size, mtime_ns, sha1}
+        self.outputs = {}  # 输出 Key -> {inputs: 摘要, ...附加信息}
+        if enabled and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.files = data.get('files', {})
+                    self.outputs = data.get('outputs', {})
+            except (OSError, ValueError):
+                pass
+
+    def file_digest(self, path):
+        """返回文件内容哈希；size 与 mtime 未变时直接复用上次记录的哈希。"""
+        key = os.path.abspath(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            self.files.pop(key, None)
+            return None
+        cached = self.files.get(key)
+        if cached and cached['size'] == st.st_size and cached['mtime_ns'] == st.st_mtime_ns:
+            return cached['sha1']
+        h = hashlib.sha1()
+        with open(key, 'rb') as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                h.update(chunk)
+        self.files[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": h.hexdigest()}
+        return h.hexdigest()
+
+    @staticmethod
+    def digest(*parts):
+        """将任意可 JSON 序列化的输入组合为一个摘要。"""
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def lookup(self, key, inputs_digest):
+        entry = self.outputs.get(key)
+        if entry is not None and entry.get('inputs') == inputs_digest:
+            return entry
+        return None
+
+    def record(self, key, inputs_digest, **extra):
+        self.outputs[key] = {"inputs": inputs_digest, **extra}
+
+    def prune(self, prefix, keep_keys):
+        for key in [k for k in self.outputs if k.startswith(prefix) and k not in keep_keys]:
+            del self.outputs[key]
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.files, "outputs": self.outputs}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def sync_directory(src_dir, dst_dir):
+    """增量镜像目录：只拷贝 size/mtime 发生变化的文件，并删除源中已不存在的文件。"""
+    copied = 0
+    seen = set()
+    for root, _, files in os.walk(src_dir):
+        rel_root = os.path.relpath(root, src_dir)
+        out_root = os.path.normpath(os.path.join(dst_dir, rel_root))
+        os.makedirs(out_root, exist_ok=True)
+        for name in files:
+            s_path = os.path.join(root, name)
+            d_path = os.path.join(out_root, name)
+            seen.add(os.path.normpath(d_path))
+            s_st = os.stat(s_path)
+            try:
+                d_st = os.stat(d_path)
+                if d_st.st_size == s_st.st_size and d_st.st_mtime_ns == s_st.st_mtime_ns:
+                    continue
+            except OSError:
+                pass
+            shutil.copy2(s_path, d_path)
+            copied += 1
+    for root, _, files in os.walk(dst_dir):
+        for name in files:
+            d_path = os.path.normpath(os.path.join(root, name))
+            if d_path not in seen:
+                os.remove(d_path)
+    return copied
+
+
+class StageCache:
+    """处理阶段缓存：按输入摘要保存每个阶段的输出 (JSON)，输入不变时直接读取。
+
+    条目按 <stage>/<输入摘要>.json 内容寻址存储，多个游戏版本 (包括并发处理的进程) 可共用同一目录:
+    输入相同的阶段只解析一次，其余版本直接复用。
+    """
+
+    LOCK_TIMEOUT = 600  # 秒；超过该时间仍未完成的占位视为失效 (进程崩溃)
+
+    def __init__(self, cache_dir, salt=None, keep=8):
+        self.dir = cache_dir
+        # manifest 只记录源文件哈希 (size/mtime 未变时复用)
+        self.manifest = BuildManifest(os.path.join(cache_dir, "manifest.json"))
+        # salt: 例如处理脚本自身的哈希，代码变化时所有阶段缓存失效
+        self.salt = salt
+        self.keep = keep  # 每个阶段保留最近使用的条目数
+
+    def file_digest(self, path):
+        return self.manifest.file_digest(path)
+
+    def digest(self, *parts):
+        return BuildManifest.digest(self.salt, *parts)
+
+    def _entry_path(self, stage, inputs_digest, suffix=".json"):
+        return os.path.join(self.dir, stage, inputs_digest + suffix)
+
+    def load(self, stage, inputs_digest):
+        path = self._entry_path(stage, inputs_digest)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            os.utime(path)  # 标记为最近使用
+            return payload
+        except (OSError, ValueError):
+            return None
+
+    def store(self, stage, inputs_digest, payload):
+        path = self._entry_path(stage, inputs_digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        self._prune(stage)
+        self.manifest.save()
+
+    def _prune(self, stage):
+        entries = glob.glob(os.path.join(self.dir, stage, "*.json"))
+        if len(entries) <= self.keep:
+            return
+        entries.sort(key=lambda p: os.stat(p).st_mtime_ns, reverse=True)
+        for path in entries[self.keep:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def acquire(self, stage, inputs_digest):
+        """并发进程之间的占位: 返回 True 表示由当前进程计算该阶段 (完成后调用 release)。"""
+        lock = self._entry_path(stage, inputs_digest, ".lock")
+        os.makedirs(os.path.dirname(lock), exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    if time.time() - os.stat(lock).st_mtime < self.LOCK_TIMEOUT:
+                        return False
+                    os.remove(lock)
+                except OSError:
+                    pass
+        return False
+
+    def release(self, stage, inputs_digest):
+        try:
+            os.remove(self._entry_path(stage, inputs_digest, ".lock"))
+        except OSError:
+            pass
+
+    def wait(self, stage, inputs_digest, poll=0.2):
+        """等待持有占位的进程写入结果；对方失败 (占位消失但没有结果) 时返回 None。"""
+        lock = self._entry_path(stage, inputs_digest, ".lock")
+        while True:
+            try:
+                if time.time() - os.stat(lock).st_mtime >= self.LOCK_TIMEOUT:
+                    break
+            except OSError:
+                break
+            time.sleep(poll)
+        return self.load(stage, inputs_digest)
+
+
+def write_text_if_changed(path, text):
+    """内容相同时不重写文件 (保留 mtime，避免触发 Vite 重新加载)，返回是否写入。"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == text:
+                return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return True
+
+
+def write_bytes_if_changed(path, payload):
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == payload:
+                return False
+    except OSError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(payload)
+    return True
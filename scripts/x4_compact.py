@@ -0,0 +1,94 @@
+import os
+import json
+from x4_build_cache import write_bytes_if_changed
+
+# =============================================================================
+# 🗜️ 紧凑数据包 (game_data.compact.json)
+# 列式布局: 物品 id 统一编号，低基数字段字典编码，
+# buildCost / inputs / outputs 展平为 [物品序号, 数量, ...] 数组。
+# 前端解码见 src/store/logic/compactGameData.ts
+# 数据包由 Vite 打包进 JS，传输压缩交给托管服务 (GitHub Pages 自动 gzip)，这里不生成预压缩副本。
+# =============================================================================
+
+COMPACT_VERSION = 1
+COMPACT_FILE_NAME = "game_data.compact.json"
+
+MODULE_ENUM_FIELDS = ["type", "group", "method", "race"]
+MODULE_PLAIN_FIELDS = ["id", "wareId", "nameId", "name", "buildTime", "cycleTime"]
+MODULE_WARE_MAPS = ["buildCost", "inputs", "outputs"]
+WARE_ENUM_FIELDS = ["group", "transport"]
+WARE_PLAIN_FIELDS = ["nameId", "name", "price", "volume", "minPrice", "maxPrice"]
+
+
+def _enum_table(values):
+    table = sorted(set(values))
+    index = {v: i for i, v in enumerate(table)}
+    return table, [index[v] for v in values]
+
+
+def encode_compact_bundle(modules, wares):
+    ware_ids = set(w['id'] for w in wares)
+    for m in modules:
+        for field in MODULE_WARE_MAPS:
+            ware_ids.update(m[field])
+    ware_table = sorted(ware_ids)
+    ware_index = {w_id: i for i, w_id in enumerate(ware_table)}
+
+    enums = {}
+    module_cols = {field: [m[field] for m in modules] for field in MODULE_PLAIN_FIELDS}
+    for field in MODULE_ENUM_FIELDS:
+        enums[f"module.{field}"], module_cols[field] = _enum_table([m[field] for m in modules])
+    module_cols["isPlayerBlueprint"] = [1 if m["isPlayerBlueprint"] else 0 for m in modules]
+    module_cols["workforce"] = [[m["workforce"]["capacity"], m["workforce"]["needed"], m["workforce"]["maxBonus"]] for m in modules]
+    module_cols["capacity"] = [m.get("capacity") for m in modules]
+    for field in MODULE_WARE_MAPS:
+        module_cols[field] = [[x for w_id, amount in m[field].items() for x in (ware_index[w_id], amount)] for m in modules]
+
+    ware_cols = {"id": [ware_index[w['id']] for w in wares]}
+    for field in WARE_PLAIN_FIELDS:
+        ware_cols[field] = [w[field] for w in wares]
+    for field in WARE_ENUM_FIELDS:
+        enums[f"ware.{field}"], ware_cols[field] = _enum_table([w[field] for w in wares])
+
+    return {"version": COMPACT_VERSION, "wareIds": ware_table, "enums": enums, "modules": module_cols, "wares": ware_cols}
+
+
+def decode_compact_bundle(bundle):
+    # 与前端解码逻辑一致，用于校验往返结果
+    ware_table = bundle["wareIds"]
+    enums = bundle["enums"]
+    mc = bundle["modules"]
+    modules = []
+    for i in range(len(mc["id"])):
+        m = {field: mc[field][i] for field in MODULE_PLAIN_FIELDS}
+        for field in MODULE_ENUM_FIELDS:
+            m[field] = enums[f"module.{field}"][mc[field][i]]
+        m["isPlayerBlueprint"] = bool(mc["isPlayerBlueprint"][i])
+        capacity, needed, max_bonus = mc["workforce"][i]
+        m["workforce"] = {"capacity": capacity, "needed": needed, "maxBonus": max_bonus}
+        for field in MODULE_WARE_MAPS:
+            flat = mc[field][i]
+            m[field] = {ware_table[flat[k]]: flat[k + 1] for k in range(0, len(flat), 2)}
+        if mc["capacity"][i] is not None:
+            m["capacity"] = mc["capacity"][i]
+        modules.append(m)
+
+    wc = bundle["wares"]
+    wares = []
+    for i in range(len(wc["id"])):
+        w = {"id": ware_table[wc["id"][i]]}
+        w.update({field: wc[field][i] for field in WARE_PLAIN_FIELDS})
+        for field in WARE_ENUM_FIELDS:
+            w[field] = enums[f"ware.{field}"][wc[field][i]]
+        wares.append(w)
+    return modules, wares
+
+
+def write_compact_bundle(data_dir, modules, wares):
+    """写入紧凑数据包。
+
+    返回 [(路径, 是否实际写入)]；内容未变化的文件保持不动。
+    """
+    payload = json.dumps(encode_compact_bundle(modules, wares), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    path = os.path.join(data_dir, COMPACT_FILE_NAME)
+    return [(path, write_bytes_if_changed(path, payload))]
@@ -4,24 +4,57 @@ import json
 import glob
 import sys
 import re
+import argparse
+import functools
 from collections import defaultdict
+from contextlib import nullcontext
+from itertools import repeat
+from x4_language import resolve_language
+from x4_compact import write_compact_bundle
+from x4_build_cache import StageCache, write_text_if_changed
+from x4_profiling import StageProfiler, profiled_stage
+from x4_production_graph import build_production_chains
+from x4_version_delta import write_version_delta
+from x4_locale_shards import categorize_keys, write_locale_shards
+from x4_search_index import write_search_indexes
+from x4_projection import WARES_PROJECTION, COMMODITY_TRANSPORTS, MODULE_TAG, WORKUNIT_WARE, check_projection
+import x4_projection
+import x4_language
 
 # =============================================================================
 # ⚙️ 项目配置
 # =============================================================================
-config_file = 'x4-station-calculator.config.json'
-if not os.path.exists(config_file):
-    print("" + "!" * 60)
-    print(f"❌ 错误: 找不到配置文件 '{config_file}'")
-    print("!" * 60 + "")
-    sys.exit(1)
-
-with open(config_file, 'r', encoding='utf-8') as f:
-    _config = json.load(f)
-
-# 考虑 distiller 生成的版本号子目录
-X4_UNPACKED_DATA_PATH = os.path.join(_config['raw_assets_dir'], _config['folder_name'])
-OUTPUT_VERSION_DIR = os.path.join(_config['processed_assets_dir'], _config['folder_name'])
+# 导入时不读取任何文件: 配置在首次使用时加载 (load_project_config / X4PrecisionLoader.from_project)
+CONFIG_FILE = 'x4-station-calculator.config.json'
+
+
+def load_project_config(path=CONFIG_FILE):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def __getattr__(name):
+    # 兼容旧的模块级常量 (_config / X4_UNPACKED_DATA_PATH / OUTPUT_VERSION_DIR / SHARED_CACHE_DIR)，首次访问时计算
+    if name == '_config':
+        value = load_project_config()
+    elif name == 'X4_UNPACKED_DATA_PATH':
+        # 考虑 distiller 生成的版本号子目录
+        config = __getattr__('_config')
+        value = os.path.join(config['raw_assets_dir'], config['folder_name'])
+    elif name == 'OUTPUT_VERSION_DIR':
+        config = __getattr__('_config')
+        value = os.path.join(config['processed_assets_dir'], config['folder_name'])
+    elif name == 'SHARED_CACHE_DIR':
+        value = shared_cache_dir(__getattr__('_config'))
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def shared_cache_dir(config):
+    # 阶段缓存由所有版本共用
+    return os.path.join(config['raw_assets_dir'], ".processor_cache")
 
 X4_LANG_CONFIG = {
     '044': {'iso': 'en',    'name': 'English'},
@@ -43,13 +76,101 @@ SPECIAL_TYPE_MAPPING = {
     'moduletypes_venture': 'ventureplatform'
 }
 
+# =============================================================================
+# ♻️ 阶段缓存
+# 每个阶段按输入摘要 (源文件哈希 + 相关配置 + 上游阶段摘要) 缓存结果，
+# 输入不变时直接恢复阶段产出的属性，跳过解析。
+# =============================================================================
+
+def cached_stage(name, inputs, owns=(), extends=(), restore=None):
+    """owns: 阶段独占的属性，整体保存；extends: 多个阶段共同追加的集合，只保存本阶段新增的部分；
+    restore: 恢复后重建派生索引的回调。"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.stage_cache is None:
+                return method(self, *args, **kwargs)
+            digest = self.stage_cache.digest(name, inputs(self))
+            self.stage_digests[name] = digest
+            payload = self.stage_cache.load(name, digest)
+            # 其他进程 (并发处理的另一个版本) 正在计算相同输入时等待其结果
+            owner = payload is None and self.stage_cache.acquire(name, digest)
+            if payload is None and not owner:
+                payload = self.stage_cache.wait(name, digest)
+            if payload is not None:
+                for attr in owns:
+                    setattr(self, attr, payload[attr])
+                for attr in extends:
+                    getattr(self, attr).update(payload[attr])
+                if restore: restore(self)
+                print(f"♻️  [{name}] 输入未变化，使用缓存结果。")
+                return None
+            before = {attr: set(getattr(self, attr)) for attr in extends}
+            try:
+                result = method(self, *args, **kwargs)
+                payload = {attr: getattr(self, attr) for attr in owns}
+                payload.update({attr: sorted(getattr(self, attr) - before[attr]) for attr in extends})
+                self.stage_cache.store(name, digest, payload)
+            finally:
+                if owner: self.stage_cache.release(name, digest)
+            return result
+        return wrapper
+    return decorator
+
+
+def _library_input(file_name):
+    # 阶段输入: libraries/ 下的聚合文件 (内存交接时使用 Distiller 的输入摘要) + 模块类型配置
+    def inputs(self):
+        if file_name in self.handoff:
+            return [self.handoff[file_name][1], self.config.get('module_types', {})]
+        return [self.stage_cache.file_digest(os.path.join(self.raw_path, "libraries", file_name)),
+                self.config.get('module_types', {})]
+    return inputs
+
+
+def _index_wares(self):
+    self.wares_by_id = {w['id']: w for w in self.wares_data}
+
+# =============================================================================
+# 🧩 阶段依赖 (按需计算)
+# 调用某个阶段 (或访问 loader.modules 等属性) 时先补齐尚未完成的上游阶段，
+# 已完成的阶段不会重复执行；按 __main__ 中的顺序显式调用时行为不变。
+# =============================================================================
+
+def requires(*deps, once=True):
+    """deps: 上游阶段的方法名；once=False 时允许重复执行 (如 save)。"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if once and method.__name__ in self.completed_stages:
+                return None
+            self.require(*deps)
+            result = method(self, *args, **kwargs)
+            self.completed_stages.add(method.__name__)
+            return result
+        return wrapper
+    return decorator
+
 # =============================================================================
 
 class X4PrecisionLoader:
-    def __init__(self, raw_data_path, output_root, config):
+    def __init__(self, raw_data_path, output_root, config, streaming=True, cache_dir=None, profiler=None, handoff=None):
         self.raw_path = raw_data_path
         self.output_root = output_root
         self.config = config
+        self.streaming = streaming  # iterparse 逐个处理 <ware>/<macro>，内存占用不随文件增长
+        # cache_dir 为空时不使用阶段缓存；处理脚本本身变化时缓存整体失效
+        self.stage_cache = None
+        if cache_dir:
+            code_files = [os.path.abspath(__file__), os.path.abspath(x4_language.__file__), os.path.abspath(x4_projection.__file__)]
+            self.stage_cache = StageCache(cache_dir)
+            self.stage_cache.salt = [self.stage_cache.file_digest(p) for p in code_files]
+        self.stage_digests = {}
+        self.profiler = profiler  # StageProfiler，为空时不记录阶段耗时
+        # 同进程 Distiller 交接的合并结果: 文件名 -> (根节点, 输入摘要)，存在时不再读取对应的 _final.xml
+        self.handoff = handoff or {}
+        # 单个语言的解析函数 (t 目录, X4 语言 ID, 所需 Key) -> 结果；watch 模式替换为常驻内存的语言库
+        self.resolve_language = resolve_language
         
         self.valid_macros = {}       
         self.all_modules = []        
@@ -59,17 +180,119 @@ class X4PrecisionLoader:
         self.race_consumption = {}  # 种群消耗速率 (每人每秒)
         self.module_groups_result = []  # 模块分组结果 (合并 types 和 waregroups)
         self.all_methods = set()
+        self.wares_by_id = {}        # ware id -> wares_data 条目
+        self.ware_producers = {}     # ware id -> 产出该物品的模块 id 列表
+        self.ware_consumers = {}     # ware id -> 消耗该物品的模块 id 列表
+        self.completed_stages = set()
+        self.resolved_languages = set()  # 已解析的语言 (X4 语言 ID)
+        self.production_chains = None  # 生产链依赖图 (build_production_chains 生成)
         
         # 收集需要翻译的原始名称 (Raw Key)
         self.needed_raw_names = set()
 
         if not os.path.exists(self.raw_path):
-            print(f"❌ 错误: 找不到解包目录: {self.raw_path}")
-            sys.exit(1)
+            raise FileNotFoundError(f"找不到解包目录: {self.raw_path}")
+
+    @classmethod
+    def from_project(cls, folder_name=None, config_path=CONFIG_FILE, **kwargs):
+        """按项目配置创建 (默认使用配置中的 folder_name)。"""
+        config = load_project_config(config_path)
+        folder_name = folder_name or config['folder_name']
+        return cls(os.path.join(config['raw_assets_dir'], folder_name),
+                   os.path.join(config['processed_assets_dir'], folder_name), config, **kwargs)
+
+    def require(self, *stages):
+        for stage in stages:
+            if stage not in self.completed_stages:
+                getattr(self, stage)()
+
+    # =======================================================
+    # 按需访问: 只计算所需的阶段，结果保留在实例上
+    # =======================================================
+    @property
+    def wares(self):
+        self.require("build_database")
+        return self.wares_data
+
+    @property
+    def consumption(self):
+        self.require("build_database")
+        return self.race_consumption
+
+    @property
+    def module_groups(self):
+        self.require("process_module_groups")
+        return self.module_groups_result
+
+    @property
+    def modules(self):
+        self.require("scan_assets")
+        return self.all_modules
+
+    @property
+    def ware_modules(self):
+        self.require("scan_assets")
+        return self.build_ware_adjacency()
+
+    @property
+    def chains(self):
+        self.require("build_production_chains")
+        return self.production_chains
+
+    def locale(self, iso):
+        """单个语言包 (只解析该语言文件)。"""
+        x4_id = next((x4_id for x4_id, conf in X4_LANG_CONFIG.items() if conf['iso'] == iso), None)
+        if x4_id is None:
+            raise KeyError(f"未知语言: {iso}")
+        self._resolve_languages([x4_id])
+        return self.i18n_data[iso]
+
+    def _library_root(self, path):
+        handed = self.handoff.get(os.path.basename(path))
+        return handed[0] if handed is not None else ET.parse(path).getroot()
+
+    def _has_library(self, path):
+        return os.path.basename(path) in self.handoff or os.path.exists(path)
+
+    def _library_attrib(self, path):
+        # 只读取根节点的属性 (流式解析到第一个 start 事件即停止)
+        if os.path.basename(path) in self.handoff or not self.streaming:
+            return dict(self._library_root(path).attrib)
+        for _, elem in ET.iterparse(path, events=('start',)):
+            return dict(elem.attrib)
+        return {}
+
+    def _iter_elements(self, path, tag):
+        # 逐个产出根节点下的 <tag> 子元素
+        if os.path.basename(path) in self.handoff:
+            yield from self._library_root(path).findall(tag)
+            return
+        if not self.streaming:
+            yield from ET.parse(path).getroot().findall(tag)
+            return
+        # 流式模式: 子元素闭合时立即处理，随后清空根节点释放内存
+        root = None
+        depth = 0
+        for event, elem in ET.iterparse(path, events=('start', 'end')):
+            if event == 'start':
+                if root is None: root = elem
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1:
+                if elem.tag == tag:
+                    yield elem
+                root.clear()
 
     # =======================================================
     # 1. 构建数据库 (Wares)
     # =======================================================
+    @requires()
+    @profiled_stage("build_database", lambda self, _: {"wares": len(self.wares_data), "module_wares": len(self.valid_macros),
+                                                       "recipes": len(self.recipes), "raw_keys": len(self.needed_raw_names)})
+    @cached_stage("build_database", _library_input("wares_final.xml"),
+                  owns=("wares_data", "recipes", "race_consumption", "valid_macros"),
+                  extends=("all_methods", "needed_raw_names"), restore=_index_wares)
     def build_database(self):
         print(f"📖 [1/5] 解析 wares.xml...")
         # 从配置中提取模块类型原始 Key
@@ -77,11 +300,12 @@ class X4PrecisionLoader:
             self.needed_raw_names.add(raw_key)
         wares_path = os.path.join(self.raw_path, "libraries", "wares_final.xml")
         try:
-            tree = ET.parse(wares_path)
-            root = tree.getroot()
             count = 0
+            # Distiller --projection 写出的投影库文件: 核对字段清单
+            warning = check_projection(self._library_attrib(wares_path), WARES_PROJECTION)
+            if warning: print(f"   ⚠️ {warning}")
             
-            for ware in root.findall('ware'):
+            for ware in self._iter_elements(wares_path, 'ware'):
                 w_id = ware.get('id')
                 tags = ware.get('tags', '')
                 transport = ware.get('transport')
@@ -109,7 +333,7 @@ class X4PrecisionLoader:
                 is_valid = False
                 
                 # C. 工人消耗 (Food/Medical)
-                if transport == 'workunit' and w_id == 'workunit_busy':
+                if transport == 'workunit' and w_id == WORKUNIT_WARE:
                     for prod in ware.findall('production'):
                         method = prod.get('method', 'default')
                         p_time = float(prod.get('time', 600))
@@ -123,7 +347,7 @@ class X4PrecisionLoader:
                         self.race_consumption[method] = consumables
 
                 # A. 商品
-                if transport in {'container', 'solid', 'liquid'} and 'module' not in tags:
+                if transport in COMMODITY_TRANSPORTS and MODULE_TAG not in tags:
                     p_node = ware.find('price')
                     volume = int(ware.get('volume') or 0)
                     if p_node is not None:
@@ -139,9 +363,10 @@ class X4PrecisionLoader:
                             "minPrice": int(p_node.get('min') or 0),
                             "maxPrice": int(p_node.get('max') or 0)
                         })
+                        self.wares_by_id[w_id] = self.wares_data[-1]
 
                 # B. 模块
-                if 'module' in tags:
+                if MODULE_TAG in tags:
                     comp = ware.find('component')
                     if comp is not None and comp.get('ref'):
                         ref = comp.get('ref')
@@ -167,15 +392,18 @@ class X4PrecisionLoader:
     # =======================================================
     # 1.5 处理模块分组 (Module Groups - 合并 Waregroups 和 ModuleTypes)
     # =======================================================
+    @requires()
+    @profiled_stage("process_module_groups", lambda self, _: {"groups": len(self.module_groups_result)})
+    @cached_stage("process_module_groups", _library_input("waregroups_final.xml"),
+                  owns=("module_groups_result",), extends=("needed_raw_names",))
     def process_module_groups(self):
         print(f"📦 [1.5/5] 解析 waregroups_final.xml 并合并配置...")
         wg_path = os.path.join(self.raw_path, "libraries", "waregroups_final.xml")
         
         # 1. 解析 XML 中的 Waregroups
-        if os.path.exists(wg_path):
+        if self._has_library(wg_path):
             try:
-                tree = ET.parse(wg_path)
-                root = tree.getroot()
+                root = self._library_root(wg_path)
                 count = 0
                 for group in root.findall('group'):
                     g_id = group.get('id')
@@ -211,6 +439,11 @@ class X4PrecisionLoader:
     # =======================================================
     # 2. 扫描资产 (Assets) -> 改为读取聚合库
     # =======================================================
+    @requires("build_database")
+    @profiled_stage("scan_assets", lambda self, _: {"modules": len(self.all_modules)})
+    @cached_stage("scan_assets", lambda self: [_library_input("macros_final.xml")(self),
+                                                self.stage_digests.get("build_database")],
+                  owns=("all_modules", "ware_producers", "ware_consumers"))
     def scan_assets(self):
         print(f"🔍 [2/5] 从 macros_final.xml 读取宏定义...")
         macro_race_set = set()
@@ -218,20 +451,16 @@ class X4PrecisionLoader:
         unmapped_types = defaultdict(list)
         macros_path = os.path.join(self.raw_path, "libraries", "macros_final.xml")
         
-        if not os.path.exists(macros_path):
-            print(f"❌ 错误: 找不到宏定义文件: {macros_path}")
-            sys.exit(1)
+        if not self._has_library(macros_path):
+            raise FileNotFoundError(f"找不到宏定义文件: {macros_path}")
 
         try:
-            tree = ET.parse(macros_path)
-            root = tree.getroot()
-            
             # Distiller 生成的 macros_final.xml 根节点为 <macros>，子节点为 <macro>
             # 不再需要 glob 扫描文件，直接遍历 XML 树
             
             count = 0
             # 遍历所有 macro 节点
-            for macro in root.findall('macro'):
+            for macro in self._iter_elements(macros_path, 'macro'):
                 fname = macro.get('name')
                 
                 # 过滤：只处理我们在 wares.xml 中识别到的模块
@@ -313,7 +542,7 @@ class X4PrecisionLoader:
                             module_data['method'] = p_method
                             # Update Group info based on first valid ware
                             if 'group' not in module_data or module_data['group'] == module_data['type']:
-                                target_ware = next((w for w in self.wares_data if w['id'] == p_id), None)
+                                target_ware = self.wares_by_id.get(p_id)
                                 if target_ware and target_ware.get('group'):
                                     module_data["group"] = target_ware['group']
                             
@@ -335,6 +564,10 @@ class X4PrecisionLoader:
                         # 这里简单取 max 属性
                         module_data['capacity'] = int(cargo.get('max', 0))
 
+                for w_id in module_data["outputs"]:
+                    self.ware_producers.setdefault(w_id, []).append(fname)
+                for w_id in module_data["inputs"]:
+                    self.ware_consumers.setdefault(w_id, []).append(fname)
                 self.all_modules.append(module_data)
                 count += 1
             
@@ -355,63 +588,90 @@ class X4PrecisionLoader:
     # =======================================================
     # 3. 语言提取 (Backend Translation)
     # =======================================================
-    def extract_and_resolve_languages(self):
+    @requires("build_database", "process_module_groups", "scan_assets")
+    def extract_and_resolve_languages(self, jobs=1):
+        self._resolve_languages(list(X4_LANG_CONFIG), jobs=jobs)
+
+    def _resolve_languages(self, lang_ids, jobs=1):
+        # 所需的 Key 由前三个阶段收集；已解析的语言不再重复解析
+        self.require("build_database", "process_module_groups", "scan_assets")
+        pending = [x4_id for x4_id in lang_ids if x4_id not in self.resolved_languages]
+        if pending:
+            self._parse_languages(pending, jobs=jobs)
+
+    def _english_language(self):
+        self._resolve_languages(['044'])
+
+    @profiled_stage("extract_and_resolve_languages",
+                    lambda self, _: {"languages": sum(1 for v in self.i18n_data.values() if v),
+                                     "keys_resolved": sum(len(v) for v in self.i18n_data.values()),
+                                     "keys": {iso: len(v) for iso, v in self.i18n_data.items()}})
+    def _parse_languages(self, lang_ids, jobs=1):
         print(f"\n🌍 [3/5] 构建翻译数据库...")
         t_path = os.path.join(self.raw_path, "t")
-        
-        for x4_id, conf in X4_LANG_CONFIG.items():
-            iso = conf['iso']
-            self.i18n_data[iso] = {}
-            target_name = f"0001-L{x4_id}.xml" 
-            t_file = os.path.join(t_path, target_name)
-            
-            # A. 加载查找表
-            current_lang_db = {}
-            def load_xml(path):
-                if os.path.exists(path):
-                    try:
-                        tree = ET.parse(path)
-                        root = tree.getroot()
-                        for page in root.findall('page'):
-                            p_id = page.get('id')
-                            if not p_id: continue
-                            if p_id not in current_lang_db: current_lang_db[p_id] = {}
-                            for t in page.findall('t'):
-                                current_lang_db[p_id][t.get('id')] = "".join(t.itertext())
-                        return True
-                    except: return False
-                return False
-
-            has_file = load_xml(t_file)
-            if not has_file and x4_id == '044':
-                load_xml(os.path.join(t_path, "0001.xml"))
-
-            if not current_lang_db: continue
-
-            # B. 递归清洗
-            resolved_count = 0
-            for raw_name in self.needed_raw_names:
-                final_text = self._resolve_name(raw_name, current_lang_db)
-                if final_text:
-                    self.i18n_data[iso][raw_name] = final_text
-                    resolved_count += 1
-            
-            print(f"  ✅ [Done]  {iso:6} ({x4_id}) -> {resolved_count} 条")
-
-    def _resolve_name(self, raw_name, lang_db, depth=0):
-        if not raw_name or depth > 5: return raw_name
-        text = re.sub(r"\([^)]*\)", "", raw_name)
-        def replace_callback(match):
-            page, tid = match.group(1), match.group(2)
-            if page in lang_db and tid in lang_db[page]:
-                return self._resolve_name(lang_db[page][tid], lang_db, depth + 1)
-            return match.group(0)
-        text = re.sub(r"\{\s*(\d+)\s*,\s*(\d+)\s*\}", replace_callback, text)
-        return re.sub(r"\s+", " ", text).strip()
+        # 只把需要的 Key 发给各语言任务，子进程仅返回 {raw_key: text}
+        needed = sorted(self.needed_raw_names)
+
+        # 按语言缓存: 语言文件 (含作为回退的 0001.xml) + 所需 Key 不变时直接复用
+        cached, digests = {}, {}
+        if self.stage_cache is not None:
+            needed_digest = self.stage_cache.digest(needed)
+            fallback = self.stage_cache.file_digest(os.path.join(t_path, "0001.xml"))
+            for x4_id in lang_ids:
+                t_digest = self.stage_cache.file_digest(os.path.join(t_path, f"0001-L{x4_id}.xml"))
+                digests[x4_id] = self.stage_cache.digest(t_digest, fallback if x4_id == '044' else None, needed_digest)
+                payload = self.stage_cache.load(f"language_{x4_id}", digests[x4_id])
+                if payload is not None:
+                    cached[x4_id] = payload['result']
+            if cached:
+                print(f"  ♻️  {len(cached)} 个语言输入未变化，使用缓存结果。")
+        pending = [x4_id for x4_id in lang_ids if x4_id not in cached]
+        # 相同的语言输入正由其他进程 (并发处理的另一个版本) 解析时，先解析其余语言，最后等待其结果
+        waiting = []
+        if self.stage_cache is not None:
+            waiting = [x4_id for x4_id in pending if not self.stage_cache.acquire(f"language_{x4_id}", digests[x4_id])]
+            pending = [x4_id for x4_id in pending if x4_id not in waiting]
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(pending)))
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor  # 仅并行时导入，缩短库的导入时间
+
+        with (ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else nullcontext()) as pool:
+            if pool:
+                print(f"  ⚙️ 使用 {jobs} 个进程并行解析语言文件...")
+            map_fn = pool.map if pool else map
+            try:
+                fresh = dict(zip(pending, map_fn(self.resolve_language, repeat(t_path), pending, repeat(needed))))
+                if self.stage_cache is not None:
+                    for x4_id, result in fresh.items():
+                        self.stage_cache.store(f"language_{x4_id}", digests[x4_id], {"result": result})
+            finally:
+                for x4_id in pending if self.stage_cache is not None else ():
+                    self.stage_cache.release(f"language_{x4_id}", digests[x4_id])
+            for x4_id in waiting:
+                payload = self.stage_cache.wait(f"language_{x4_id}", digests[x4_id])
+                fresh[x4_id] = payload['result'] if payload is not None else self.resolve_language(t_path, x4_id, needed)
+            if waiting:
+                print(f"  ♻️  {len(waiting)} 个语言由其他版本解析，已复用结果。")
+            results = [cached[x4_id] if x4_id in cached else fresh[x4_id] for x4_id in lang_ids]
+
+            for x4_id, result in zip(lang_ids, results):
+                iso = X4_LANG_CONFIG[x4_id]['iso']
+                self.resolved_languages.add(x4_id)
+                self.i18n_data[iso] = {}
+                if result is None: continue
+
+                resolved, cycles = result
+                self.i18n_data[iso] = resolved
+                print(f"  ✅ [Done]  {iso:6} ({x4_id}) -> {len(resolved)} 条")
+                if cycles:
+                    sample = ", ".join(f"{{{p},{t}}}" for p, t in cycles[:5])
+                    print(f"  ⚠️  {iso}: 检测到 {len(cycles)} 个循环引用 ({sample})")
 
     # =======================================================
     # 🆕 4. 注入英文名称到数据对象
     # =======================================================
+    @requires("build_database", "process_module_groups", "scan_assets", "_english_language")
+    @profiled_stage("inject_english_names")
     def inject_english_names(self):
         print(f"\n💉 [4/5] 将英文结果注入 name 字段...")
         
@@ -451,6 +711,8 @@ class X4PrecisionLoader:
     # =======================================================
     # 🆕 4.1. 模块类型分析
     # =======================================================
+    @requires("scan_assets")
+    @profiled_stage("analyze_module_types")
     def analyze_module_types(self):
         print(f"📊 [4.1/5] 分析模块类型配置...")
         config_types = self.config.get('module_types', {})
@@ -492,10 +754,41 @@ class X4PrecisionLoader:
         else:
             print(f"   ✅ 所有模块类型均已配置。")
 
+    # =======================================================
+    # 🆕 4.2. 物品 -> 模块邻接表 (供前端直接查表)
+    # =======================================================
+    def build_ware_adjacency(self):
+        adjacency = {}
+        for w_id in sorted(set(self.ware_producers) | set(self.ware_consumers)):
+            adjacency[w_id] = {
+                "producers": self.ware_producers.get(w_id, []),
+                "consumers": self.ware_consumers.get(w_id, [])
+            }
+        return adjacency
+
+    # =======================================================
+    # 🆕 4.3. 生产链依赖图 (拓扑顺序 / 循环 / 基础资源需求)
+    # =======================================================
+    @requires("scan_assets")
+    @profiled_stage("production_chains", lambda self, chains: {
+        "methods": len(chains["methods"]), "wares": len(chains["methods"]["default"]["order"]),
+        "cycles": sum(len(c["cycles"]) for c in chains["methods"].values())})
+    def build_production_chains(self):
+        print(f"\n🕸️ 构建生产链依赖图...")
+        chains = build_production_chains(self.recipes, [w['id'] for w in self.wares_data], self.all_modules)
+        for method, chain in chains["methods"].items():
+            for cycle in chain["cycles"]:
+                print(f"   ⚠️ 生产链存在循环依赖 ({method}): {' -> '.join(cycle)}")
+        self.production_chains = chains
+        return chains
+
     # =======================================================
     # 5. 保存结果
     # =======================================================
-    def save(self):
+    @requires("extract_and_resolve_languages", "inject_english_names", "build_production_chains", once=False)
+    @profiled_stage("save", lambda self, written: {"files_written": written})
+    def save(self, write_data=True, locales=None):
+        """write_data=False 时不写出 data/ 下的数据文件；locales: 只写出这些语言 (iso)，None 表示全部。"""
         print(f"\n💾 [5/5] 保存结果...")
         data_dir = os.path.join(self.output_root, "data")
         locales_dir = os.path.join(self.output_root, "locales")
@@ -504,34 +797,141 @@ class X4PrecisionLoader:
         if not os.path.exists(locales_dir): os.makedirs(locales_dir)
 
         # 保存数据 (此时 data 对象里已经有了正确的 name 字段)
-        with open(os.path.join(data_dir, "modules.json"), 'w', encoding='utf-8') as f:
-            json.dump(self.all_modules, f, indent=2, ensure_ascii=False)
-        with open(os.path.join(data_dir, "wares.json"), 'w', encoding='utf-8') as f:
-            json.dump(self.wares_data, f, indent=2, ensure_ascii=False)
-        with open(os.path.join(data_dir, "module_groups.json"), 'w', encoding='utf-8') as f:
-            json.dump(self.module_groups_result, f, indent=2, ensure_ascii=False)
-        with open(os.path.join(data_dir, "consumption.json"), 'w', encoding='utf-8') as f:
-            json.dump(self.race_consumption, f, indent=2, ensure_ascii=False)
+        # 内容未变化的文件不重写，保持 mtime 不变
+        written = []
+        def wanted(path):
+            # watch 模式只写出受影响的输出
+            if os.path.dirname(path) == locales_dir:
+                return locales is None or os.path.basename(path)[:-len(".json")] in locales
+            return write_data or os.path.basename(path) == "languages.json"
+        def dump(path, data):
+            if not wanted(path): return
+            written.append(write_text_if_changed(path, json.dumps(data, indent=2, ensure_ascii=False)))
+        dump(os.path.join(data_dir, "modules.json"), self.all_modules)
+        dump(os.path.join(data_dir, "wares.json"), self.wares_data)
+        dump(os.path.join(data_dir, "module_groups.json"), self.module_groups_result)
+        dump(os.path.join(data_dir, "consumption.json"), self.race_consumption)
+        dump(os.path.join(data_dir, "ware_modules.json"), self.build_ware_adjacency())
+        if write_data and self.production_chains is not None:
+            # 紧凑格式，前端按需查表
+            chains_json = json.dumps(self.production_chains, ensure_ascii=False, separators=(',', ':'))
+            written.append(write_text_if_changed(os.path.join(data_dir, "production_chains.json"), chains_json))
+        # 紧凑数据包 (前端启动时加载)
+        compact_files = write_compact_bundle(data_dir, self.all_modules, self.wares_data) if write_data else []
+        written.extend(changed for _, changed in compact_files)
+        if compact_files: print("   🗜️ 紧凑数据包: " + ", ".join(f"{os.path.basename(p)} ({os.path.getsize(p) / 1024:.1f} KB)" for p, _ in compact_files))
 
         # 保存语言包
         available_languages = []
         for x4_id, conf in X4_LANG_CONFIG.items():
             iso = conf['iso']
             if iso in self.i18n_data and len(self.i18n_data[iso]) > 0:
-                with open(os.path.join(locales_dir, f"{iso}.json"), 'w', encoding='utf-8') as f:
-                    json.dump(dict(sorted(self.i18n_data[iso].items())), f, indent=2, ensure_ascii=False)
+                dump(os.path.join(locales_dir, f"{iso}.json"), dict(sorted(self.i18n_data[iso].items())))
                 available_languages.append({"code": iso, "name": conf['name'], "x4_id": x4_id})
 
-        with open(os.path.join(data_dir, "languages.json"), 'w', encoding='utf-8') as f:
-            json.dump(available_languages, f, indent=2, ensure_ascii=False)   
+        dump(os.path.join(data_dir, "languages.json"), available_languages)
+        # 按类别分片的语言包 + 跨语言共享字符串表 (前端按需加载)
+        if write_data or locales is None or locales:
+            categories = categorize_keys(self.all_modules, self.wares_data, self.module_groups_result)
+            i18n_in_order = {conf['iso']: self.i18n_data.get(conf['iso'], {}) for conf in X4_LANG_CONFIG.values()}
+            written.extend(changed for _, changed in write_locale_shards(locales_dir, i18n_in_order, categories))
+            # 每种语言的模块搜索索引 (依赖模块数据，数据变化时全部重写)
+            search_files = write_search_indexes(locales_dir, self.all_modules, self.module_groups_result, i18n_in_order,
+                                                locales=None if write_data else locales)
+            written.extend(changed for _, changed in search_files)
+        print(f"   ✅ 写入 {sum(written)} 个文件，{len(written) - sum(written)} 个文件内容未变化。")
         print("🎉 全部完成！")
+        return sum(written)
 
-if __name__ == "__main__":
-    loader = X4PrecisionLoader(X4_UNPACKED_DATA_PATH, OUTPUT_VERSION_DIR, _config)
+# =============================================================================
+# 🗂️ 多版本处理
+# 各版本共用 raw_assets_dir/.processor_cache: 输入未变化的阶段 (如两个版本间相同的 wares.xml) 只解析一次。
+# =============================================================================
+
+def process_version(folder_name, config, cache_dir=None, jobs=1, profile_dir=None, trace=None, tool="processor"):
+    """处理单个版本: raw_assets_dir/<folder_name> -> processed_assets_dir/<folder_name>。"""
+    raw_path = os.path.join(config['raw_assets_dir'], folder_name)
+    output_dir = os.path.join(config['processed_assets_dir'], folder_name)
+    profiler = StageProfiler(tool, profile_dir=profile_dir)
+    loader = X4PrecisionLoader(raw_path, output_dir, config, cache_dir=cache_dir, profiler=profiler)
     loader.build_database()
     loader.process_module_groups()
     loader.scan_assets()
-    loader.extract_and_resolve_languages()
+    loader.extract_and_resolve_languages(jobs=jobs)
     loader.inject_english_names() # 新增步骤
     loader.analyze_module_types()
-    loader.save()
\ No newline at end of file
+    loader.build_production_chains()
+    loader.save()
+    profiler.report()
+    if trace: profiler.write_trace(trace)
+    return folder_name
+
+
+def process_versions(versions, config, cache_dir=None, jobs=1, profile_dir=None, trace=None):
+    """并发处理多个版本；jobs 个进程按版本分配，每个版本剩余的并行度用于语言解析。"""
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(versions)))
+    lang_jobs = max(1, (jobs or os.cpu_count() or 1) // workers)
+    traces = [f"{os.path.splitext(trace)[0]}.{v}.json" if trace else None for v in versions]
+    tools = [f"processor.{v}" for v in versions]
+    if workers == 1:
+        for args in zip(versions, repeat(config), repeat(cache_dir), repeat(lang_jobs), repeat(profile_dir), traces, tools):
+            process_version(*args)
+        return
+    print(f"⚙️ 使用 {workers} 个进程并发处理 {len(versions)} 个版本: {', '.join(versions)}")
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_version, *args) for args in
+                   zip(versions, repeat(config), repeat(cache_dir), repeat(lang_jobs), repeat(profile_dir), traces, tools)]
+        for future in futures:
+            print(f"✅ 版本 {future.result()} 处理完成。")
+
+
+def write_deltas(versions, base, config):
+    processed_dir = config['processed_assets_dir']
+    if not os.path.isdir(os.path.join(processed_dir, base, "data")):
+        print(f"⚠️ 基准版本 {base} 尚未处理，跳过增量输出。")
+        return
+    print(f"\n🔀 生成相对 {base} 的版本增量...")
+    for version in versions:
+        if version == base: continue
+        path, changed, size, full_size = write_version_delta(processed_dir, base, version)
+        state = "已写入" if changed else "未变化"
+        print(f"   {version}: {path} ({size / 1024:.1f} KB / 全量 {full_size / 1024:.1f} KB，{state})")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="X4 数据处理: 生成前端使用的 JSON 数据与语言包")
+    arg_parser.add_argument('--jobs', type=int, default=1, help="并行进程数: 多个版本时按版本并发，其余用于语言解析 (0 = CPU 核心数，默认串行)")
+    arg_parser.add_argument('--no-cache', action='store_true', help="忽略阶段缓存，全部重新解析")
+    arg_parser.add_argument('--profile', nargs='?', const='.profile', metavar='DIR', help="按阶段输出 cProfile 统计 (默认目录 .profile)")
+    arg_parser.add_argument('--trace', metavar='FILE', help="输出 Chrome Trace JSON (chrome://tracing / Perfetto)")
+    arg_parser.add_argument('--versions', help="逗号分隔的版本目录名 (默认使用配置中的 versions 或 folder_name)")
+    arg_parser.add_argument('--delta-base', help="生成增量所对照的基准版本 (默认配置中的 delta_base 或 folder_name)")
+    args = arg_parser.parse_args()
+
+    if not os.path.exists(CONFIG_FILE):
+        print("" + "!" * 60)
+        print(f"❌ 错误: 找不到配置文件 '{CONFIG_FILE}'")
+        print("!" * 60 + "")
+        sys.exit(1)
+    project_config = load_project_config()
+
+    cache_dir = None if args.no_cache else shared_cache_dir(project_config)
+    versions = args.versions.split(',') if args.versions else project_config.get('versions', [project_config['folder_name']])
+    missing = [v for v in versions if not os.path.isdir(os.path.join(project_config['raw_assets_dir'], v))]
+    if missing:
+        print(f"❌ 错误: 找不到解包目录: {', '.join(os.path.join(project_config['raw_assets_dir'], v) for v in missing)}")
+        sys.exit(1)
+
+    try:
+        if len(versions) == 1:
+            process_version(versions[0], project_config, cache_dir=cache_dir, jobs=args.jobs, profile_dir=args.profile, trace=args.trace)
+        else:
+            process_versions(versions, project_config, cache_dir=cache_dir, jobs=args.jobs, profile_dir=args.profile, trace=args.trace)
+    except FileNotFoundError as e:
+        print(f"❌ 错误: {e}")
+        sys.exit(1)
+
+    delta_base = args.delta_base or project_config.get('delta_base')
+    if delta_base or len(versions) > 1:
+        write_deltas(versions, delta_base or project_config['folder_name'], project_config)
@@ -0,0 +1,155 @@
+import os
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
+
+# =============================================================================
+# 🧩 扩展 (DLC / 创意工坊模组) 的发现与加载顺序
+# 一次扫描 SOURCE/extensions 下的全部扩展目录 (线程池并行):
+#   - content.xml: id / 名称 / 版本 / enabled 与 <dependency id="..." optional="..."/>
+#   - libraries/: 记录实际存在的库补丁，合并时只处理这些文件 (耗时与补丁总量成正比，而不是 扩展数 × 文件数)
+# 加载顺序为依赖在前的拓扑排序；没有依赖约束的扩展按 dlc_order 中的位置排列，其余按 id 排序。
+# 已禁用、缺少必需依赖 (含间接缺失) 或处于循环依赖中的扩展会被跳过并报告。
+# 配置 "discover_extensions": false 时只使用 dlc_order 中列出的扩展 (旧行为)。
+# =============================================================================
+
+EXTENSIONS_DIR = "extensions"
+CONTENT_FILE = "content.xml"
+PATCH_OPS = ('add', 'replace', 'remove')
+
+
+class Extension:
+    def __init__(self, path):
+        self.path = path
+        self.folder = os.path.basename(path)
+        self.id = self.folder
+        self.name = None
+        self.version = None
+        self.enabled = True
+        self.dependencies = []  # [(扩展 id, 是否可选)]
+        self.libraries = {}     # 库文件名 -> 补丁路径
+        self.error = None
+
+
+def read_extension(path):
+    ext = Extension(path)
+    content_path = os.path.join(path, CONTENT_FILE)
+    if os.path.exists(content_path):
+        try:
+            root = etree.parse(content_path).getroot()
+            ext.id = root.get('id') or ext.folder
+            ext.name = root.get('name')
+            ext.version = root.get('version')
+            ext.enabled = root.get('enabled', '1').strip().lower() not in ('0', 'false')
+            for dep in root.iter('dependency'):
+                # 没有 id 的 <dependency version="..."/> 是对游戏版本的要求
+                if dep.get('id'):
+                    ext.dependencies.append((dep.get('id'), dep.get('optional', 'false').strip().lower() in ('1', 'true')))
+        except etree.XMLSyntaxError as e:
+            ext.error = str(e)
+    lib_dir = os.path.join(path, "libraries")
+    if os.path.isdir(lib_dir):
+        with os.scandir(lib_dir) as entries:
+            ext.libraries = {e.name: e.path for e in entries if e.is_file() and e.name.endswith('.xml')}
+    return ext
+
+
+def discover_extensions(src, only=None, jobs=None):
+    """并行读取 SOURCE/extensions 下的扩展，返回 ({id: Extension}, [问题])；only: 只读取这些目录。"""
+    root = os.path.join(src, EXTENSIONS_DIR)
+    if not os.path.isdir(root):
+        return {}, []
+    if only is None:
+        with os.scandir(root) as entries:
+            folders = sorted(e.path for e in entries if e.is_dir())
+    else:
+        folders = [p for p in (os.path.join(root, f) for f in only) if os.path.isdir(p)]
+    with ThreadPoolExecutor(max_workers=jobs or min(32, (os.cpu_count() or 1) + 4)) as pool:
+        found = list(pool.map(read_extension, folders))
+    extensions, problems = {}, []
+    for ext in found:
+        if ext.error:
+            problems.append(f"{ext.folder}: content.xml 解析失败 ({ext.error})，按目录名处理")
+        if ext.id in extensions:
+            problems.append(f"重复的扩展 id {ext.id}: 使用 {extensions[ext.id].folder}，忽略 {ext.folder}")
+            continue
+        extensions[ext.id] = ext
+    return extensions, problems
+
+
+def load_order(extensions, preferred=()):
+    """依赖在前的拓扑排序，返回 (扩展 id 列表, [问题])；preferred 可以是目录名或 content.xml 中的 id。"""
+    folder_ids = {ext.folder: ext_id for ext_id, ext in extensions.items()}
+    rank = {}
+    for i, name in enumerate(preferred):
+        rank.setdefault(folder_ids.get(name, name), i)
+    key = lambda ext_id: (rank.get(ext_id, len(rank)), ext_id)
+    problems = [f"{ext_id}: 已禁用 (enabled=0)" for ext_id in sorted(extensions) if not extensions[ext_id].enabled]
+    active = {ext_id for ext_id, ext in extensions.items() if ext.enabled}
+
+    # 缺少必需依赖的扩展被跳过，依赖它的扩展随之跳过
+    dependents = {ext_id: [] for ext_id in active}
+    for ext_id in active:
+        for dep, optional in extensions[ext_id].dependencies:
+            if dep in dependents and dep != ext_id:
+                dependents[dep].append((ext_id, optional))
+    missing = [ext_id for ext_id in sorted(active)
+               if any(not optional and dep not in active for dep, optional in extensions[ext_id].dependencies)]
+    for ext_id in missing:
+        deps = [dep for dep, optional in extensions[ext_id].dependencies if not optional and dep not in active]
+        problems.append(f"{ext_id}: 缺少依赖 {', '.join(deps)}，已跳过")
+    skipped = set(missing)
+    while missing:
+        ext_id = missing.pop()
+        for dependent, optional in dependents[ext_id]:
+            if not optional and dependent not in skipped:
+                skipped.add(dependent)
+                missing.append(dependent)
+                problems.append(f"{dependent}: 依赖的 {ext_id} 已跳过，一并跳过")
+    active -= skipped
+
+    indegree = {ext_id: 0 for ext_id in active}
+    for ext_id in active:
+        for dependent, _ in dependents[ext_id]:
+            if dependent in active:
+                indegree[dependent] += 1
+    heap = [key(ext_id) + (ext_id,) for ext_id in active if indegree[ext_id] == 0]
+    heapq.heapify(heap)
+    order = []
+    while heap:
+        ext_id = heapq.heappop(heap)[-1]
+        order.append(ext_id)
+        for dependent, _ in dependents[ext_id]:
+            if dependent in active:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    heapq.heappush(heap, key(dependent) + (dependent,))
+    cyclic = sorted(active - set(order), key=key)
+    if cyclic:
+        problems.append(f"循环依赖: {', '.join(cyclic)}，已跳过")
+    return order, problems
+
+
+def resolve_extensions(src, config, jobs=None):
+    """按项目配置发现扩展并排序，返回 ({id: Extension}, 加载顺序, [问题])。"""
+    preferred = config.get('dlc_order', [])
+    only = None if config.get('discover_extensions', True) else preferred
+    extensions, problems = discover_extensions(src, only=only, jobs=jobs)
+    order, order_problems = load_order(extensions, preferred)
+    return extensions, order, problems + order_problems
+
+
+class PatchConflicts:
+    """记录各扩展补丁的 sel 目标: 多个扩展修改同一目标且其中有 replace / remove 时视为冲突 (后加载的生效)。"""
+
+    def __init__(self):
+        self.targets = {}  # (库文件名, sel) -> [(扩展 id, 操作)]
+
+    def record(self, lib_file, ext_id, patch_root):
+        for node in patch_root:
+            if node.tag in PATCH_OPS and node.get('sel'):
+                self.targets.setdefault((lib_file, node.get('sel')), []).append((ext_id, node.tag))
+
+    def conflicts(self):
+        return [(lib_file, sel, ops) for (lib_file, sel), ops in sorted(self.targets.items())
+                if len({ext_id for ext_id, _ in ops}) > 1 and any(op != 'add' for _, op in ops)]
@@ -0,0 +1,132 @@
+import os
+import re
+import xml.etree.ElementTree as ET
+
+# =============================================================================
+# 🌍 X4 文本引用解析 ({page,id} 展开)
+# =============================================================================
+
+_COMMENT_RE = re.compile(r"\([^)]*\)")
+_REF_RE = re.compile(r"\{\s*(\d+)\s*,\s*(\d+)\s*\}")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class X4TextResolver:
+    """单个语言的解析器：预编译正则，{page,id} 引用每种语言只展开一次，并检测循环引用。"""
+
+    def __init__(self, lang_db):
+        self.lang_db = lang_db
+        self._cache = {}         # (page, id) -> 已展开文本
+        self._resolving = set()  # 当前递归链上的引用
+        self.cycles = set()      # 检测到的循环引用 (page, id)
+
+    def resolve(self, raw_name):
+        if not raw_name: return raw_name
+        # 去掉 (注释)，展开引用，合并空白
+        text = _COMMENT_RE.sub("", raw_name)
+        text = _REF_RE.sub(self._replace_ref, text)
+        return _SPACE_RE.sub(" ", text).strip()
+
+    def _replace_ref(self, match):
+        key = (match.group(1), match.group(2))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        page = self.lang_db.get(key[0])
+        if page is None or key[1] not in page:
+            return match.group(0)
+        if key in self._resolving:
+            # 循环引用: 保留原始引用文本，避免无限展开
+            self.cycles.add(key)
+            return match.group(0)
+        self._resolving.add(key)
+        try:
+            resolved = self.resolve(page[key[1]])
+        finally:
+            self._resolving.discard(key)
+        self._cache[key] = resolved
+        return resolved
+
+
+def _load_pages(path, lang_db, wanted):
+    # 单次流式遍历: 只保留 wanted 中的页面，并把其文本中引用到的页面加入 wanted
+    # 返回遍历时被跳过的页面 id (可能在之后才变为需要)
+    skipped = set()
+    for _, elem in ET.iterparse(path):
+        if elem.tag != 'page': continue
+        p_id = elem.get('id')
+        if p_id in wanted:
+            if p_id not in lang_db: lang_db[p_id] = {}
+            for t in elem.findall('t'):
+                text = "".join(t.itertext())
+                lang_db[p_id][t.get('id')] = text
+                wanted.update(ref_page for ref_page, _ in _REF_RE.findall(text))
+        elif p_id:
+            skipped.add(p_id)
+        # 页面处理完立即清空，未命中的页面不会留在内存中
+        elem.clear()
+    return skipped
+
+
+def load_language_db(path, lang_db, needed_pages=None):
+    """将语言文件载入 lang_db，成功返回 True。
+
+    needed_pages 为 None 时载入全部页面；否则流式解析，只保留这些页面及其传递引用到的页面。
+    引用指向已跳过的页面时，再补扫一遍文件。
+    """
+    if os.path.exists(path):
+        try:
+            if needed_pages is not None:
+                complete = set()
+                seed = set(needed_pages)
+                while seed:
+                    wanted = set(seed)
+                    skipped = _load_pages(path, lang_db, wanted)
+                    complete |= seed | (wanted - skipped)
+                    seed = (wanted & skipped) - complete
+                return True
+            tree = ET.parse(path)
+            root = tree.getroot()
+            for page in root.findall('page'):
+                p_id = page.get('id')
+                if not p_id: continue
+                if p_id not in lang_db: lang_db[p_id] = {}
+                for t in page.findall('t'):
+                    lang_db[p_id][t.get('id')] = "".join(t.itertext())
+            return True
+        except: return False
+    return False
+
+
+def needed_pages_of(raw_names):
+    return {page for raw_name in raw_names for page, _ in _REF_RE.findall(raw_name)}
+
+
+def resolve_language(t_path, x4_id, needed_raw_names):
+    """加载并解析单个语言，返回 ({raw_key: text}, 循环引用列表)；语言文件缺失时返回 None。
+
+    各语言互不依赖，可直接作为进程池任务运行。
+    """
+    return resolve_keys(load_language(t_path, x4_id, needed_pages_of(needed_raw_names)), needed_raw_names)
+
+
+def load_language(t_path, x4_id, needed_pages=None):
+    """载入单个语言的页面 (英文缺少 0001-L044.xml 时回退到 0001.xml)。"""
+    lang_db = {}
+    has_file = load_language_db(os.path.join(t_path, f"0001-L{x4_id}.xml"), lang_db, needed_pages)
+    if not has_file and x4_id == '044':
+        load_language_db(os.path.join(t_path, "0001.xml"), lang_db, needed_pages)
+    return lang_db
+
+
+def resolve_keys(lang_db, needed_raw_names):
+    """在已载入的语言库中展开所需的 Key；语言库为空时返回 None。"""
+    if not lang_db: return None
+
+    resolver = X4TextResolver(lang_db)
+    resolved = {}
+    for raw_name in needed_raw_names:
+        final_text = resolver.resolve(raw_name)
+        if final_text:
+            resolved[raw_name] = final_text
+    return resolved, sorted(resolver.cycles)
@@ -0,0 +1,78 @@
+import os
+import glob
+import json
+import hashlib
+from collections import Counter
+from x4_build_cache import write_text_if_changed
+
+# =============================================================================
+# 🈯 语言包分片
+# 按类别 (modules / wares / groups / misc) 拆分每种语言的翻译，并提取跨语言共享的字符串表:
+#   - shared.<类别>: 至少两种语言译文相同的 Key 取最常见的译文 (专有名词、编号后缀等)
+#   - <语言>.<类别>: 只保留与共享表不同的译文；共享表中有而该语言缺失的 Key 记为 null
+# 文件名带内容哈希，可永久缓存；locales/shards/manifest.json 记录各分片的文件名，前端只加载需要的分片。
+# =============================================================================
+
+SHARDS_VERSION = 1
+LOCALE_CATEGORIES = ("modules", "wares", "groups", "misc")
+SHARDS_DIR = "shards"
+MANIFEST_NAME = "manifest.json"
+_HASH_LENGTH = 10
+
+
+def categorize_keys(modules, wares, module_groups):
+    """raw key -> 类别；同一 Key 被多类对象引用时按 LOCALE_CATEGORIES 的顺序归类。"""
+    categories = {}
+    for category, items in (("modules", modules), ("wares", wares), ("groups", module_groups)):
+        for item in items:
+            categories.setdefault(item.get('nameId'), category)
+    return categories
+
+
+def build_shards(i18n_by_iso, categories):
+    """返回 {分片名: {key: text}}，分片名为 shared.<类别> 或 <iso>.<类别>。"""
+    languages = [iso for iso, entries in i18n_by_iso.items() if entries]
+    keys = sorted(set().union(*(i18n_by_iso[iso] for iso in languages))) if languages else []
+
+    shared = {}
+    for key in keys:
+        text, count = Counter(i18n_by_iso[iso][key] for iso in languages if key in i18n_by_iso[iso]).most_common(1)[0]
+        if count >= 2:
+            shared[key] = text
+
+    shards = {f"{owner}.{category}": {} for owner in ["shared"] + languages for category in LOCALE_CATEGORIES}
+    for key in keys:
+        category = categories.get(key, "misc")
+        if key in shared:
+            shards[f"shared.{category}"][key] = shared[key]
+        for iso in languages:
+            text = i18n_by_iso[iso].get(key)
+            if key not in shared or text != shared[key]:
+                shards[f"{iso}.{category}"][key] = text
+    return shards
+
+
+def write_locale_shards(locales_dir, i18n_by_iso, categories):
+    """写入分片与 manifest.json，删除不再引用的旧分片；返回 [(路径, 是否写入)]。"""
+    shard_dir = os.path.join(locales_dir, SHARDS_DIR)
+    os.makedirs(shard_dir, exist_ok=True)
+    manifest = {"version": SHARDS_VERSION, "categories": list(LOCALE_CATEGORIES), "shared": {}, "languages": {}}
+    results, keep = [], set()
+    for name, entries in build_shards(i18n_by_iso, categories).items():
+        text = json.dumps(entries, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        digest = hashlib.sha1(text.encode('utf-8')).hexdigest()[:_HASH_LENGTH]
+        file_name = f"{name}.{digest}.json"
+        owner, category = name.split('.')
+        if owner == "shared":
+            manifest["shared"][category] = file_name
+        else:
+            manifest["languages"].setdefault(owner, {})[category] = file_name
+        path = os.path.join(shard_dir, file_name)
+        keep.add(path)
+        results.append((path, write_text_if_changed(path, text)))
+    manifest_path = os.path.join(shard_dir, MANIFEST_NAME)
+    for path in glob.glob(os.path.join(shard_dir, "*.json")):
+        if path not in keep and path != manifest_path:
+            os.remove(path)
+    results.append((manifest_path, write_text_if_changed(manifest_path, json.dumps(manifest, indent=2, ensure_ascii=False))))
+    return results
@@ -0,0 +1,56 @@
+import os
+import sys
+import argparse
+from x4_profiling import StageProfiler
+
+# =============================================================================
+# 🔗 单进程流水线: Distiller -> Processor
+# Distiller 合并得到的 lxml 树直接交给 X4PrecisionLoader，省去写出 *_final.xml 再重新解析的往返；
+# *_final.xml 默认仍写出: 构建清单依赖它们在下次运行时复用未变化的库文件与宏；--no-final 时只做内存交接 (每次全量合并)。
+# 用法 (在项目根目录): python scripts/x4_pipeline.py --jobs 0
+# =============================================================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="X4 资产蒸馏 + 数据处理 (单进程，内存交接)")
+    parser.add_argument('--force', action='store_true', help="忽略 Distiller 构建清单，全量重建")
+    parser.add_argument('--jobs', type=int, default=1, help="宏聚合与语言解析的并行进程数 (0 = CPU 核心数，默认串行)")
+    parser.add_argument('--no-final', action='store_true', help="不写出 *_final.xml (下次运行无法增量复用)")
+    parser.add_argument('--keep-final', action='store_true', help=argparse.SUPPRESS)  # 旧参数，现为默认行为
+    parser.add_argument('--projection', action='store_true', help="wares_final.xml 只保留处理器读取的字段 (见 x4_projection.py)")
+    parser.add_argument('--no-cache', action='store_true', help="忽略处理器阶段缓存")
+    parser.add_argument('--profile', nargs='?', const='.profile', metavar='DIR', help="按阶段输出 cProfile 统计 (默认目录 .profile)")
+    parser.add_argument('--trace', metavar='FILE', help="输出 Chrome Trace JSON (chrome://tracing / Perfetto)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    import x4_asset_distiller as distiller
+
+    profiler = StageProfiler("pipeline", profile_dir=args.profile)
+    handoff = {}
+    distiller_argv = ['--jobs', str(args.jobs)] + (['--force'] if args.force else []) + (['--projection'] if args.projection else [])
+    distiller.main(distiller_argv, profiler=profiler, handoff=handoff, write_final=not args.no_final)
+    print(f"🔗 内存交接: {', '.join(sorted(handoff)) or '无'}\n")
+
+    # 导入处理器不读取文件，项目配置在首次访问 _config 等属性时加载
+    import x4_data_processor as processor
+    cache_dir = None if args.no_cache else processor.SHARED_CACHE_DIR
+    loader = processor.X4PrecisionLoader(processor.X4_UNPACKED_DATA_PATH, processor.OUTPUT_VERSION_DIR, processor._config,
+                                         cache_dir=cache_dir, profiler=profiler, handoff=handoff)
+    loader.build_database()
+    loader.process_module_groups()
+    loader.scan_assets()
+    loader.extract_and_resolve_languages(jobs=args.jobs)
+    loader.inject_english_names()
+    loader.analyze_module_types()
+    loader.build_production_chains()
+    loader.save()
+    profiler.report()
+    if args.trace: profiler.write_trace(args.trace)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"\n程序终止: {e}")
+        sys.exit(1)
@@ -0,0 +1,335 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np  # pip install numpy
+
+# =============================================================================
+# 🧮 批量空间站方案评估
+# 读取处理器输出的 modules.json / wares.json / consumption.json，构建:
+#   模块 × 物品 的产出 / 投入矩阵，以及劳动力需求 / 容量 / 建造成本向量
+# 一批方案 (模块 -> 数量，即 parseXmlBlueprint 的输出) 组成 方案 × 模块 的稀疏数量矩阵，
+# 净物资流、劳动力平衡、建造成本与每小时利润都由 (稀疏) 矩阵乘法对整批方案一次算出。
+# 计算规则与前端 productionCalculator / workforceCalculator 相同。
+# 用法 (在项目根目录): python scripts/x4_plan_evaluator.py plans.jsonl -o results.jsonl
+# =============================================================================
+
+HQ_WORKFORCE = 200       # 玩家总部额外的劳动力需求 (与 workforceCalculator 相同)
+NET_EPSILON = 0.001      # 净流量绝对值小于该值视为平衡
+
+
+class PlanSettings:
+    """对应前端 StationSettings 中参与计算的字段 (默认值与 useStationStore 相同)。"""
+
+    def __init__(self, sunlight=100, use_hq=False, workforce_auto=True, manual_workforce=0,
+                 buy_multiplier=0.5, sell_multiplier=0.5, miners_enabled=False, internal_supply=False):
+        self.sunlight = sunlight
+        self.use_hq = use_hq
+        self.workforce_auto = workforce_auto
+        self.manual_workforce = manual_workforce
+        self.buy_multiplier = buy_multiplier
+        self.sell_multiplier = sell_multiplier
+        self.miners_enabled = miners_enabled
+        self.internal_supply = internal_supply
+
+
+class PlanBatch:
+    """一批方案的稀疏数量矩阵 (COO): 第 k 个非零项表示 方案 rows[k] 含 counts[k] 个模块 cols[k]。
+
+    非零项按方案、再按模块在方案中出现的顺序排列；劳动力按该顺序入住居住模块
+    (与 calculateWorkforceCensus 相同)。
+    """
+
+    def __init__(self, size, rows, cols, counts, unknown):
+        self.size = size
+        self.rows = rows
+        self.cols = cols
+        self.counts = counts
+        self.unknown = unknown  # 每个方案中无法识别的模块 id
+
+
+class PlanEvaluator:
+    def __init__(self, modules, wares, consumption, settings=None):
+        self.settings = settings or PlanSettings()
+        self.module_ids = [m['id'] for m in modules]
+        self.module_index = {m_id: i for i, m_id in enumerate(self.module_ids)}
+
+        # 物品列: wares.json 中的商品 + 模块/消耗表中出现的其他物品
+        ware_ids = [w['id'] for w in wares]
+        known = set(ware_ids)
+        for m in modules:
+            for table in (m.get('outputs', {}), m.get('inputs', {}), m.get('buildCost', {})):
+                for w_id in table:
+                    if w_id not in known:
+                        known.add(w_id)
+                        ware_ids.append(w_id)
+        for race_wares in consumption.values():
+            for w_id in race_wares:
+                if w_id not in known:
+                    known.add(w_id)
+                    ware_ids.append(w_id)
+        self.ware_ids = ware_ids
+        ware_index = {w_id: i for i, w_id in enumerate(ware_ids)}
+        n_wares = len(ware_ids)
+
+        # 价格向量
+        self.base_price, self.min_price, self.max_price = (np.zeros(n_wares) for _ in range(3))
+        self.mined = np.zeros(n_wares, dtype=bool)
+        for w in wares:
+            i = ware_index[w['id']]
+            self.base_price[i] = w.get('price', 0)
+            self.min_price[i] = w.get('minPrice', 0)
+            self.max_price[i] = w.get('maxPrice', 0)
+            self.mined[i] = w.get('transport') in ('solid', 'liquid')
+
+        # 模块 × 物品 的产出 / 投入矩阵按行压缩存储 (CSR): 模块 i 的条目为 flow_*[flow_start[i]:flow_start[i + 1]]
+        flow_ware, flow_out, flow_in, flow_start = [], [], [], [0]
+        n_modules = len(modules)
+        self.wf_needed = np.zeros(n_modules)
+        self.wf_capacity = np.zeros(n_modules)
+        self.module_build_cost = np.zeros(n_modules)
+        max_bonus = np.zeros(n_modules)
+        for i, m in enumerate(modules):
+            outputs, inputs = m.get('outputs', {}), m.get('inputs', {})
+            for w_id in list(outputs) + [w for w in inputs if w not in outputs]:
+                flow_ware.append(ware_index[w_id])
+                flow_out.append(outputs.get(w_id, 0.0))
+                flow_in.append(inputs.get(w_id, 0.0))
+            flow_start.append(len(flow_ware))
+            workforce = m.get('workforce') or {}
+            self.wf_needed[i] = workforce.get('needed', 0)
+            self.wf_capacity[i] = workforce.get('capacity', 0)
+            max_bonus[i] = workforce.get('maxBonus', 0)
+            self.module_build_cost[i] = sum(amount * self.base_price[ware_index[w_id]]
+                                            for w_id, amount in m.get('buildCost', {}).items())
+        self.flow_ware = np.array(flow_ware, dtype=np.intp)
+        self.flow_out = np.array(flow_out)
+        self.flow_in = np.array(flow_in)
+        self.flow_start = np.array(flow_start, dtype=np.intp)
+        self.flow_len = np.diff(self.flow_start)
+        self.flow_bonus = self.flow_out * np.repeat(max_bonus, self.flow_len)
+        self.energycells = ware_index.get('energycells')
+
+        # 居住模块: 按种族查消耗表 (每人每秒)，找不到时使用 default
+        race_ids = sorted(consumption)
+        race_index = {r: i for i, r in enumerate(race_ids)}
+        self.race_consumption = np.zeros((len(race_ids), n_wares))
+        for race, race_wares in consumption.items():
+            for w_id, per_second in race_wares.items():
+                self.race_consumption[race_index[race], ware_index[w_id]] = per_second
+        default_race = race_index.get('default', 0)
+        self.is_habitat = self.wf_capacity > 0
+        self.module_race = np.array([race_index.get(m.get('race') or 'default', default_race) for m in modules], dtype=np.intp)
+
+    @classmethod
+    def from_data_dir(cls, data_dir, settings=None):
+        def load(name):
+            with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return cls(load("modules.json"), load("wares.json"), load("consumption.json"), settings)
+
+    # =======================================================
+    # 方案 -> 稀疏矩阵
+    # =======================================================
+    def plan_batch(self, plans):
+        """plans: 模块 -> 数量 的字典列表。"""
+        rows, cols, counts, unknown = [], [], [], []
+        index = self.module_index
+        for p, plan in enumerate(plans):
+            missing = []
+            for m_id, count in plan.items():
+                i = index.get(m_id)
+                if i is None:
+                    missing.append(m_id)
+                    continue
+                rows.append(p)
+                cols.append(i)
+                counts.append(count)
+            unknown.append(missing)
+        return PlanBatch(len(plans), np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp),
+                         np.array(counts, dtype=float), unknown)
+
+    def dynamic_prices(self, multiplier):
+        if multiplier <= 0.5:
+            return self.min_price + (self.base_price - self.min_price) * (multiplier * 2)
+        return self.base_price + (self.max_price - self.base_price) * ((multiplier - 0.5) * 2)
+
+    # =======================================================
+    # 批量评估
+    # =======================================================
+    def evaluate(self, batch):
+        s = self.settings
+        n, rows, cols, counts = batch.size, batch.rows, batch.cols, batch.counts
+        n_wares = len(self.ware_ids)
+
+        # 数量矩阵 × 模块向量
+        needed = np.bincount(rows, counts * self.wf_needed[cols], minlength=n) + (HQ_WORKFORCE if s.use_hq else 0)
+        capacity = np.bincount(rows, counts * self.wf_capacity[cols], minlength=n)
+        build_cost = np.bincount(rows, counts * self.module_build_cost[cols], minlength=n)
+        if s.workforce_auto:
+            actual = np.minimum(needed, capacity)
+        else:
+            actual = np.clip(s.manual_workforce, 0, capacity)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            saturation = np.where(needed == 0, 1.0, np.minimum(1.0, actual / needed))
+
+        # 数量矩阵 × 模块物品矩阵: 把每个非零项展开为该模块的全部物品条目后按 (方案, 物品) 累加
+        lens = self.flow_len[cols]
+        item = np.repeat(np.arange(len(cols)), lens)
+        entry = np.repeat(self.flow_start[cols] - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+        plan = rows[item]
+        out = self.flow_out[entry] + saturation[plan] * self.flow_bonus[entry]
+        if self.energycells is not None:
+            out[self.flow_ware[entry] == self.energycells] *= s.sunlight / 100.0
+        net = np.bincount(plan * n_wares + self.flow_ware[entry], counts[item] * (out - self.flow_in[entry]),
+                          minlength=n * n_wares).reshape(n, n_wares)
+
+        # 工人消耗: 劳动力按顺序填满居住模块，溢出部分进入下一个
+        habitat = self.is_habitat[cols]
+        if habitat.any():
+            h_rows, h_cols = rows[habitat], cols[habitat]
+            h_capacity = counts[habitat] * self.wf_capacity[h_cols]
+            filled = np.cumsum(h_capacity) - h_capacity
+            first = np.r_[True, h_rows[1:] != h_rows[:-1]]
+            filled -= np.maximum.accumulate(np.where(first, filled, -np.inf))
+            residents = np.clip(actual[h_rows] - filled, 0, h_capacity)
+            by_race = np.bincount(h_rows * len(self.race_consumption) + self.module_race[h_cols], residents,
+                                  minlength=n * len(self.race_consumption)).reshape(n, -1)
+            net -= by_race @ self.race_consumption * 3600
+
+        net[np.abs(net) < NET_EPSILON] = 0.0
+        sell = self.dynamic_prices(s.sell_multiplier)
+        buy = self.dynamic_prices(s.buy_multiplier)
+        if s.internal_supply:
+            buy = np.zeros_like(buy)
+        elif s.miners_enabled:
+            buy = np.where(self.mined, 0.0, buy)
+        revenue = np.maximum(net, 0) @ sell
+        expense = np.maximum(-net, 0) @ buy
+        return {
+            "net": net,
+            "workforce_needed": needed,
+            "workforce_capacity": capacity,
+            "workforce_actual": actual,
+            "saturation": saturation,
+            "build_cost": build_cost,
+            "revenue": revenue,
+            "expense": expense,
+            "profit": revenue - expense,
+        }
+
+    def evaluate_plans(self, plans):
+        batch = self.plan_batch(plans)
+        return self.evaluate(batch), batch.unknown
+
+
+# =============================================================================
+# CLI: 从 JSONL 流式读取方案，分批评估
+# =============================================================================
+
+def read_plans(stream):
+    """每行一个方案: 模块 -> 数量 的对象，或 {"id": ..., "modules": {...}}。"""
+    for line_no, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if isinstance(record.get('modules'), dict):
+            yield record.get('id', line_no), record['modules']
+        else:
+            yield line_no, record
+
+
+def iter_batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def format_results(evaluator, ids, result, unknown, with_net):
+    for p, plan_id in enumerate(ids):
+        row = {
+            "id": plan_id,
+            "profit": round(float(result["profit"][p]), 2),
+            "revenue": round(float(result["revenue"][p]), 2),
+            "expense": round(float(result["expense"][p]), 2),
+            "buildCost": round(float(result["build_cost"][p]), 2),
+            "workforce": {
+                "needed": float(result["workforce_needed"][p]),
+                "capacity": float(result["workforce_capacity"][p]),
+                "actual": float(result["workforce_actual"][p]),
+                "saturation": round(float(result["saturation"][p]), 6),
+            },
+        }
+        if with_net:
+            net = result["net"][p]
+            row["net"] = {evaluator.ware_ids[i]: round(float(net[i]), 3) for i in np.flatnonzero(net)}
+        if unknown[p]:
+            row["unknownModules"] = unknown[p]
+        yield json.dumps(row, ensure_ascii=False)
+
+
+def default_data_dir():
+    with open('x4-station-calculator.config.json', 'r', encoding='utf-8') as f:
+        v_config = json.load(f)
+    return os.path.join(v_config['processed_assets_dir'], v_config['folder_name'], "data")
+
+
+def add_settings_arguments(parser):
+    parser.add_argument('--sunlight', type=float, default=100, help="光照百分比")
+    parser.add_argument('--hq', action='store_true', help="包含玩家总部的劳动力需求")
+    parser.add_argument('--workforce', type=float, help="手动指定劳动力 (默认自动: min(需求, 容量))")
+    parser.add_argument('--buy', type=float, default=0.5, help="买入价格系数 (0 = 最低价, 0.5 = 均价, 1 = 最高价)")
+    parser.add_argument('--sell', type=float, default=0.5, help="卖出价格系数")
+    parser.add_argument('--miners', action='store_true', help="矿物/气体由自有矿船供应 (不计成本)")
+    parser.add_argument('--internal-supply', action='store_true', help="全部原料内部供应 (不计成本)")
+
+
+def settings_from_args(args):
+    return PlanSettings(sunlight=args.sunlight, use_hq=args.hq, workforce_auto=args.workforce is None,
+                        manual_workforce=args.workforce or 0, buy_multiplier=args.buy, sell_multiplier=args.sell,
+                        miners_enabled=args.miners, internal_supply=args.internal_supply)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量评估空间站方案 (净物资流 / 劳动力 / 建造成本 / 每小时利润)")
+    parser.add_argument('plans', help="方案 JSONL 文件 (- 表示标准输入)")
+    parser.add_argument('-o', '--output', help="结果 JSONL 文件 (默认标准输出)")
+    parser.add_argument('--data', help="处理器输出的 data 目录 (默认按项目配置)")
+    parser.add_argument('--batch-size', type=int, default=8192, help="每批评估的方案数")
+    parser.add_argument('--net', action='store_true', help="输出每个方案的净物资流")
+    add_settings_arguments(parser)
+    args = parser.parse_args(argv)
+
+    evaluator = PlanEvaluator.from_data_dir(args.data or default_data_dir(), settings_from_args(args))
+
+    source = sys.stdin if args.plans == '-' else open(args.plans, 'r', encoding='utf-8')
+    sink = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    total, eval_time = 0, 0.0
+    start = time.perf_counter()
+    try:
+        for batch in iter_batches(read_plans(source), args.batch_size):
+            ids = [plan_id for plan_id, _ in batch]
+            plan_batch = evaluator.plan_batch([plan for _, plan in batch])
+            t0 = time.perf_counter()
+            result = evaluator.evaluate(plan_batch)
+            eval_time += time.perf_counter() - t0
+            for line in format_results(evaluator, ids, result, plan_batch.unknown, args.net):
+                sink.write(line + "\n")
+            total += len(batch)
+    finally:
+        if source is not sys.stdin: source.close()
+        if sink is not sys.stdout: sink.close()
+    elapsed = time.perf_counter() - start
+    rate = total / eval_time if eval_time > 0 else float('inf')
+    print(f"✅ 评估 {total} 个方案: 总耗时 {elapsed:.2f}s，矩阵计算 {eval_time:.3f}s ({rate:,.0f} 方案/秒)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
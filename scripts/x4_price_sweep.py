@@ -0,0 +1,211 @@
+import sys
+import json
+import time
+import argparse
+import numpy as np  # pip install numpy
+from x4_plan_evaluator import (PlanEvaluator, read_plans, iter_batches, default_data_dir,
+                               add_settings_arguments, settings_from_args)
+
+# =============================================================================
+# 📈 价格敏感性扫描
+# 方案的净物资流与价格无关，每小时利润是各物品价格的线性函数:
+#   profit = Σ c_w * price_w，c_w 为净流量 (盈余按卖价计入收入，缺口按买价计入支出；免费供应的缺口为 0)
+# 每种物品的价格由其滑块位置 t ∈ [0, 1] 决定 (0 = 最低价, 0.5 = 均价, 1 = 最高价，与 getDynamicPrice 相同)。
+# 扫描对方案的全部买卖物品同时取点:
+#   - 蒙特卡洛 (--samples): 各物品位置独立均匀分布；一批方案共用同一组样本，价格矩阵 × 系数矩阵一次算出
+#   - 网格 (--grid G): 各物品取 G 个等距位置的全组合；组合数超过 --max-points 时改为从网格点中随机抽样
+# 输出利润分位数、亏损概率、单一物品的盈亏平衡价格 (其余物品保持滑块设置) 与对利润影响最大的物品。
+# 用法 (在项目根目录): python scripts/x4_price_sweep.py plans.jsonl --samples 1000000 -o sweep.jsonl
+# =============================================================================
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+_CHUNK_ELEMENTS = 1 << 22   # 每块价格矩阵的元素数上限
+_PROFIT_ELEMENTS = 1 << 24  # 同时保留的利润样本数上限 (分位数需要全部样本)
+
+
+class PriceSweep:
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        s = evaluator.settings
+        # 缺口不计成本的物品 (与 evaluate 中的买价置零相同)
+        if s.internal_supply:
+            self.free = np.ones(len(evaluator.ware_ids), dtype=bool)
+        elif s.miners_enabled:
+            self.free = evaluator.mined.copy()
+        else:
+            self.free = np.zeros(len(evaluator.ware_ids), dtype=bool)
+
+    def coefficients(self, net):
+        """净物资流 (方案 × 物品) -> 利润对各物品价格的系数。"""
+        return np.where((net < 0) & self.free, 0.0, net)
+
+    def prices(self, positions, wares):
+        e = self.evaluator
+        lo, mid, hi = e.min_price[wares], e.base_price[wares], e.max_price[wares]
+        return np.where(positions <= 0.5, lo + (mid - lo) * (positions * 2), mid + (hi - mid) * ((positions - 0.5) * 2))
+
+    def baseline_positions(self, coeffs):
+        s = self.evaluator.settings
+        return np.where(coeffs > 0, s.sell_multiplier, s.buy_multiplier)
+
+    # =======================================================
+    # 取点
+    # =======================================================
+    def slopes(self, coeffs, wares):
+        """c_w * price_w(t) = c_w * 均价 + (t - 0.5) * 斜率，t 低于 / 高于 0.5 时分别使用两段斜率。"""
+        e = self.evaluator
+        lo, mid, hi = e.min_price[wares], e.base_price[wares], e.max_price[wares]
+        return coeffs @ mid, coeffs * (2 * (mid - lo)), coeffs * (2 * (hi - mid))
+
+    def sample(self, coeffs, points, rng):
+        """蒙特卡洛: 一批方案共用 points 组价格，返回 利润 (方案 × points)。"""
+        wares = np.flatnonzero(np.any(coeffs != 0, axis=0))
+        at_mid, down, up = self.slopes(coeffs[:, wares], wares)
+        profits = np.empty((len(coeffs), points))
+        chunk = max(1, _CHUNK_ELEMENTS // max(1, len(wares)))
+        for start in range(0, points, chunk):
+            stop = min(points, start + chunk)
+            offset = rng.random((stop - start, len(wares)))
+            offset -= 0.5
+            profits[:, start:stop] = (np.minimum(offset, 0) @ down.T + np.maximum(offset, 0) @ up.T).T
+        profits += at_mid[:, None]
+        return profits
+
+    def grid(self, coeff, levels, max_points, rng):
+        """单个方案的网格扫描，返回 (利润, 是否穷举)。"""
+        wares = np.flatnonzero(coeff)
+        k = len(wares)
+        # 每种物品在各网格位置上对利润的贡献 (物品 × 位置)
+        values = coeff[wares, None] * self.prices(np.broadcast_to(np.linspace(0, 1, levels), (k, levels)), wares[:, None])
+        if levels ** k <= max_points:
+            # 全组合: 逐个物品做外和，结果即为 levels^k 个网格点的利润
+            profits = np.zeros(1)
+            for row in values:
+                profits = np.add.outer(profits, row).ravel()
+            return profits, True
+        profits = np.empty(max_points)
+        chunk = max(1, _CHUNK_ELEMENTS // k)
+        for start in range(0, max_points, chunk):
+            stop = min(max_points, start + chunk)
+            digits = rng.integers(0, levels, (stop - start, k))
+            profits[start:stop] = values[np.arange(k), digits].sum(axis=1)
+        return profits, False
+
+    # =======================================================
+    # 统计
+    # =======================================================
+    def break_even(self, coeff, baseline_profit):
+        """其余物品保持滑块设置时，使利润为 0 的单一物品价格 (价格区间之外的物品不列出)。"""
+        e = self.evaluator
+        wares = np.flatnonzero(coeff)
+        lo, mid, hi = e.min_price[wares], e.base_price[wares], e.max_price[wares]
+        current = self.prices(self.baseline_positions(coeff[wares]), wares)
+        price = current - baseline_profit / coeff[wares]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position = np.where(price <= mid, np.where(mid > lo, (price - lo) / (mid - lo), 1.0) * 0.5,
+                                0.5 + np.where(hi > mid, (price - mid) / (hi - mid), 0.0) * 0.5)
+        inside = (price >= lo) & (price <= hi)
+        return {e.ware_ids[w]: {"price": round(float(p), 2), "position": round(float(t), 6)}
+                for w, p, t in zip(wares[inside], price[inside], position[inside])}
+
+    def sensitivity(self, coeff, top):
+        """各物品在整个价格区间内引起的利润变化幅度 (其余物品不变)，按幅度降序。"""
+        e = self.evaluator
+        wares = np.flatnonzero(coeff)
+        swing = np.abs(coeff[wares]) * (e.max_price[wares] - e.min_price[wares])
+        total = swing.sum()
+        order = np.argsort(-swing, kind='stable')[:top]
+        return [{"ware": e.ware_ids[wares[i]], "swing": round(float(swing[i]), 2),
+                 "share": round(float(swing[i] / total), 4) if total > 0 else 0.0} for i in order]
+
+    def summarize(self, coeffs, profits, quantiles, top):
+        """coeffs: 方案 × 物品；profits: 方案 × 样本。"""
+        baseline = (self.prices(self.baseline_positions(coeffs), np.arange(coeffs.shape[1])) * coeffs).sum(axis=1)
+        q = np.quantile(profits, quantiles, axis=1)
+        mean = profits.mean(axis=1)
+        loss = (profits < 0).mean(axis=1)
+        for p in range(len(coeffs)):
+            yield {
+                "baseline": round(float(baseline[p]), 2),
+                "mean": round(float(mean[p]), 2),
+                "min": round(float(profits[p].min()), 2),
+                "max": round(float(profits[p].max()), 2),
+                "quantiles": {f"p{round(x * 100):02d}": round(float(v), 2) for x, v in zip(quantiles, q[:, p])},
+                "lossProbability": round(float(loss[p]), 6),
+                "breakEven": self.break_even(coeffs[p], baseline[p]),
+                "sensitivity": self.sensitivity(coeffs[p], top),
+            }
+
+
+# =============================================================================
+# CLI: 从 JSONL 流式读取方案，分批评估后扫描价格
+# =============================================================================
+
+def sweep_batch(sweep, ids, net, args, rng):
+    coeffs = sweep.coefficients(net)
+    if args.grid:
+        for p, plan_id in enumerate(ids):
+            profits, exhaustive = sweep.grid(coeffs[p], args.grid, args.max_points, rng)
+            summary = next(sweep.summarize(coeffs[p:p + 1], profits[None], args.quantiles, args.top))
+            yield {"id": plan_id, "points": len(profits), "exhaustive": exhaustive, **summary}
+        return
+    block = max(1, _PROFIT_ELEMENTS // args.samples)
+    for start in range(0, len(ids), block):
+        profits = sweep.sample(coeffs[start:start + block], args.samples, rng)
+        for plan_id, summary in zip(ids[start:start + block],
+                                    sweep.summarize(coeffs[start:start + block], profits, args.quantiles, args.top)):
+            yield {"id": plan_id, "points": args.samples, **summary}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="空间站方案的价格敏感性扫描 (利润分位数 / 盈亏平衡价格 / 敏感物品)")
+    parser.add_argument('plans', help="方案 JSONL 文件 (- 表示标准输入)")
+    parser.add_argument('-o', '--output', help="结果 JSONL 文件 (默认标准输出)")
+    parser.add_argument('--data', help="处理器输出的 data 目录 (默认按项目配置)")
+    parser.add_argument('--batch-size', type=int, default=1024, help="每批评估的方案数")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--samples', type=int, default=100000, help="蒙特卡洛样本数")
+    mode.add_argument('--grid', type=int, help="网格模式: 每种物品的价格位置数")
+    parser.add_argument('--max-points', type=int, default=1000000, help="网格模式穷举的最大组合数")
+    parser.add_argument('--quantiles', type=lambda v: [float(x) for x in v.split(',')], default=list(DEFAULT_QUANTILES),
+                        help="利润分位数 (逗号分隔)")
+    parser.add_argument('--top', type=int, default=5, help="输出的敏感物品数")
+    parser.add_argument('--seed', type=int, default=0, help="随机数种子")
+    add_settings_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.grid is not None and args.grid < 2:
+        parser.error("--grid 至少为 2")
+
+    evaluator = PlanEvaluator.from_data_dir(args.data or default_data_dir(), settings_from_args(args))
+    sweep = PriceSweep(evaluator)
+    rng = np.random.default_rng(args.seed)
+
+    source = sys.stdin if args.plans == '-' else open(args.plans, 'r', encoding='utf-8')
+    sink = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    total = points = 0
+    sweep_time = 0.0
+    start = time.perf_counter()
+    try:
+        for batch in iter_batches(read_plans(source), args.batch_size):
+            ids = [plan_id for plan_id, _ in batch]
+            result, unknown = evaluator.evaluate_plans([plan for _, plan in batch])
+            t0 = time.perf_counter()
+            rows = list(sweep_batch(sweep, ids, result["net"], args, rng))
+            sweep_time += time.perf_counter() - t0
+            for row, missing in zip(rows, unknown):
+                if missing:
+                    row["unknownModules"] = missing
+                sink.write(json.dumps(row, ensure_ascii=False) + "\n")
+                points += row["points"]
+            total += len(batch)
+    finally:
+        if source is not sys.stdin: source.close()
+        if sink is not sys.stdout: sink.close()
+    elapsed = time.perf_counter() - start
+    rate = points / sweep_time if sweep_time > 0 else float('inf')
+    print(f"✅ 扫描 {total} 个方案 ({points:,} 个价格点): 总耗时 {elapsed:.2f}s，扫描 {sweep_time:.3f}s ({rate:,.0f} 点/秒)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
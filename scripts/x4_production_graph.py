@@ -0,0 +1,129 @@
+# =============================================================================
+# 🕸️ 生产链依赖图
+# 由 wares.xml 配方构建 物品 -> 原料 的依赖图 (每种生产方式一张)，计算:
+#   - 拓扑顺序 (原料在前)
+#   - 循环依赖 (强连通分量)
+#   - 每单位物品的直接原料与递归展开后的基础资源需求
+# 结果写入 data/production_chains.json，前端查表即可，无需在浏览器中递归计算。
+# =============================================================================
+
+CHAINS_VERSION = 1
+_PRECISION = 6
+
+
+def resolve_recipe(recipes, ware_id, method):
+    # 与 scan_assets 相同的回退规则: 指定方式不存在时使用 default
+    ware_recipes = recipes.get(ware_id, {})
+    return ware_recipes.get(method) or ware_recipes.get('default')
+
+
+def strongly_connected_components(nodes, edges):
+    """迭代版 Tarjan 算法；按 "被依赖者在前" 的顺序返回强连通分量 (每个分量内部已排序)。"""
+    index, low, on_stack, stack, result = {}, {}, set(), [], []
+    counter = 0
+    for start in nodes:
+        if start in index:
+            continue
+        work = [(start, iter(edges.get(start, ())))]
+        index[start] = low[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                result.append(sorted(component))
+    return result
+
+
+def build_method_chain(recipes, ware_ids, method):
+    # 依赖边: 物品 -> 其配方中的原料
+    unit_inputs = {}
+    for w_id in ware_ids:
+        recipe = resolve_recipe(recipes, w_id, method)
+        if recipe and recipe['inputs']:
+            unit_inputs[w_id] = {k: v / recipe['amount'] for k, v in sorted(recipe['inputs'].items())}
+    nodes = sorted(set(ware_ids) | {i for inputs in unit_inputs.values() for i in inputs})
+    components = strongly_connected_components(nodes, {w: list(inputs) for w, inputs in unit_inputs.items()})
+
+    cycles = [c for c in components if len(c) > 1 or c[0] in unit_inputs.get(c[0], {})]
+    in_cycle = {w for c in cycles for w in c}
+
+    # 按拓扑顺序展开基础资源需求；依赖链上有循环的物品无法展开
+    raw = {}
+    for component in components:
+        for w_id in component:
+            if w_id in in_cycle:
+                continue
+            inputs = unit_inputs.get(w_id)
+            if not inputs:
+                raw[w_id] = {w_id: 1.0}
+                continue
+            if any(i not in raw for i in inputs):
+                continue
+            total = {}
+            for i, per_unit in inputs.items():
+                for r_id, r_amount in raw[i].items():
+                    total[r_id] = total.get(r_id, 0.0) + per_unit * r_amount
+            raw[w_id] = total
+
+    return {
+        "order": [w for c in components for w in c],
+        "cycles": cycles,
+        "inputs": {w: {k: round(v, _PRECISION) for k, v in inputs.items()} for w, inputs in unit_inputs.items()},
+        "raw": {w: {k: round(v, _PRECISION) for k, v in sorted(total.items())}
+                for w, total in raw.items() if w in unit_inputs},
+    }
+
+
+def build_production_chains(recipes, ware_ids, modules):
+    """ware_ids: 需要导出的物品 (商品列表)；modules: 模块列表，用于统计各种族实际使用的生产方式。"""
+    methods = sorted({m for w_id in ware_ids for m in recipes.get(w_id, {})})
+    chains = {"default": build_method_chain(recipes, ware_ids, 'default')}
+    for method in methods:
+        if method == 'default':
+            continue
+        chain = build_method_chain(recipes, ware_ids, method)
+        # 非默认方式只保留与 default 不同的条目，前端查不到时回退到 default
+        base = chains["default"]
+        chains[method] = {
+            "order": chain["order"] if chain["order"] != base["order"] else None,
+            "cycles": chain["cycles"],
+            "inputs": {w: v for w, v in chain["inputs"].items() if base["inputs"].get(w) != v},
+            "raw": {w: v for w, v in chain["raw"].items() if base["raw"].get(w) != v},
+        }
+
+    race_methods = {}
+    for m in modules:
+        if m.get('type') == 'production' and m.get('method') not in (None, 'none'):
+            race_methods.setdefault(m['race'], set()).add(m['method'])
+    return {
+        "version": CHAINS_VERSION,
+        "methods": chains,
+        "raceMethods": {race: sorted(ms) for race, ms in sorted(race_methods.items())},
+    }
@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import functools
+from contextlib import contextmanager
+
+try:
+    import resource  # Windows 下不可用，峰值内存记为 None
+except ImportError:
+    resource = None
+
+# =============================================================================
+# ⏱️ 阶段性能记录
+# 每个阶段记录墙钟时间、CPU 时间、峰值 RSS 与处理条目数；
+# 可选地按阶段导出 cProfile 统计 (.prof) 和 Chrome Trace (chrome://tracing / Perfetto)。
+# =============================================================================
+
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 返回字节，Linux 返回 KB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class StageProfiler:
+    def __init__(self, tool, profile_dir=None):
+        self.tool = tool
+        self.profile_dir = profile_dir  # 非空时每个阶段单独输出 cProfile 统计
+        self.records = []                # [{stage, wall_s, cpu_s, peak_rss_kb, counts, ts_us}]
+        self._origin = time.perf_counter()
+        self._active = None
+
+    def start(self, stage):
+        """开始一个阶段 (自动结束上一个)，返回可写入条目数的 counts 字典。"""
+        self.stop()
+        profile = None
+        if self.profile_dir:
+            profile = cProfile.Profile()
+            profile.enable()
+        self._active = {"stage": stage, "counts": {}, "profile": profile,
+                        "wall": time.perf_counter(), "cpu": time.process_time()}
+        return self._active["counts"]
+
+    def stop(self):
+        active, self._active = self._active, None
+        if active is None:
+            return
+        wall, cpu = time.perf_counter(), time.process_time()
+        if active["profile"] is not None:
+            active["profile"].disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            active["profile"].dump_stats(os.path.join(self.profile_dir, f"{self.tool}.{active['stage']}.prof"))
+        self.records.append({
+            "stage": active["stage"],
+            "wall_s": round(wall - active["wall"], 4),
+            "cpu_s": round(cpu - active["cpu"], 4),
+            "peak_rss_kb": peak_rss_kb(),
+            "counts": active["counts"],
+            "ts_us": int((active["wall"] - self._origin) * 1e6),
+        })
+
+    @contextmanager
+    def stage(self, stage):
+        counts = self.start(stage)
+        try:
+            yield counts
+        finally:
+            self.stop()
+
+    def report(self):
+        self.stop()
+        if not self.records:
+            return
+        print(f"\n⏱️  阶段耗时 ({self.tool})")
+        print(f"{'stage':<32} | {'wall (s)':>9} | {'cpu (s)':>8} | {'peak RSS (MB)':>13} | counts")
+        for r in self.records:
+            rss = f"{r['peak_rss_kb'] / 1024:.1f}" if r['peak_rss_kb'] is not None else "n/a"
+            counts = ", ".join(f"{k}={v}" for k, v in r['counts'].items() if not isinstance(v, dict))
+            print(f"{r['stage']:<32} | {r['wall_s']:>9.3f} | {r['cpu_s']:>8.3f} | {rss:>13} | {counts}")
+        if self.profile_dir:
+            print(f"   📈 cProfile 统计已写入 {self.profile_dir} (python -m pstats <file>)")
+
+    def write_trace(self, path):
+        # Chrome Trace Event 格式: 每个阶段一个完整事件 (ph = "X")，counts 放入 args
+        self.stop()
+        events = [{"name": r["stage"], "cat": self.tool, "ph": "X", "ts": r["ts_us"], "dur": int(r["wall_s"] * 1e6),
+                   "pid": os.getpid(), "tid": 1, "args": {**r["counts"], "cpu_s": r["cpu_s"], "peak_rss_kb": r["peak_rss_kb"]}}
+                  for r in self.records]
+        events.insert(0, {"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": self.tool}})
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        print(f"   🧭 Trace 已写入 {path}")
+
+
+def profiled_stage(name, counts=None):
+    """方法装饰器: self.profiler 存在时记录该阶段；counts(self, 返回值) 给出阶段结束后的条目数。"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.profiler is None:
+                return method(self, *args, **kwargs)
+            with self.profiler.stage(name) as stage_counts:
+                result = method(self, *args, **kwargs)
+                if counts: stage_counts.update(counts(self, result))
+            return result
+        return wrapper
+    return decorator
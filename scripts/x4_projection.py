@@ -0,0 +1,90 @@
+import json
+import hashlib
+
+# =============================================================================
+# ✂️ 库文件投影 (Distiller --projection 与处理器共用的字段清单)
+# 合并后的 wares.xml 包含舰船、武器、装备、任务物品等，处理器只读取其中一小部分:
+#   - 商品: transport 为 container / solid / liquid 且带 <price> 的物品
+#   - 模块: tags 含 module 且带 <component> 的物品 (建造成本来自默认生产方式的 <production>)
+#   - 工人消耗: workunit_busy
+# 投影只保留清单中列出的元素与属性，根节点记录清单摘要 (projection="...")；
+# 处理器读取时核对摘要，清单变化后提示重新运行 Distiller。
+# =============================================================================
+
+COMMODITY_TRANSPORTS = ('container', 'solid', 'liquid')
+MODULE_TAG = 'module'
+WORKUNIT_WARE = 'workunit_busy'
+PROJECTION_ATTR = 'projection'
+
+# rules: 按顺序匹配，第一条命中的规则决定保留哪些字段；都不命中的元素被丢弃
+#   match: transport / id 为取值之一，tags 包含该子串，child 为存在该子元素
+#   fields: "@" 为保留的属性，"@where" 为该元素需满足的属性值，其余键为保留的子元素 (递归使用同样的格式)
+_RECIPE_FIELDS = {
+    "@": ("method", "time", "amount"),
+    "primary": {"ware": {"@": ("ware", "amount")}},
+    "effects": {"effect": {"@": ("type", "product")}},
+}
+
+WARES_PROJECTION = {
+    "element": "ware",
+    "rules": (
+        # 模块: 名称、宏引用与建造成本 (默认生产方式)
+        {"match": {"tags": MODULE_TAG, "child": "component"},
+         "fields": {"@": ("id", "name", "tags"), "component": {"@": ("ref",)},
+                    "production": {"@where": {"method": "default"}, "@": ("method", "time"),
+                                   "primary": {"ware": {"@": ("ware", "amount")}}}}},
+        # 商品: 价格、体积与全部生产方式的配方
+        {"match": {"transport": COMMODITY_TRANSPORTS, "child": "price"},
+         "fields": {"@": ("id", "name", "group", "transport", "tags", "volume"),
+                    "price": {"@": ("min", "average", "max")}, "production": _RECIPE_FIELDS}},
+        # 工人消耗: 各种族的食物 / 药品配方
+        {"match": {"id": (WORKUNIT_WARE,)},
+         "fields": {"@": ("id", "transport"), "production": _RECIPE_FIELDS}},
+    ),
+}
+
+PROJECTIONS = {"wares.xml": WARES_PROJECTION}
+
+
+def projection_digest(manifest):
+    payload = json.dumps(manifest, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def _matches(elem, rule):
+    if 'transport' in rule and elem.get('transport') not in rule['transport']: return False
+    if 'tags' in rule and rule['tags'] not in elem.get('tags', ''): return False
+    if 'id' in rule and elem.get('id') not in rule['id']: return False
+    if 'child' in rule and elem.find(rule['child']) is None: return False
+    return True
+
+
+def _project(elem, fields, parent=None):
+    attrib = {k: elem.get(k) for k in fields.get('@', ()) if elem.get(k) is not None}
+    node = elem.makeelement(elem.tag, attrib)
+    if parent is not None:
+        parent.append(node)
+    for child in elem:
+        child_fields = fields.get(child.tag)
+        if child_fields is not None and all(child.get(k) == v for k, v in child_fields.get('@where', {}).items()):
+            _project(child, child_fields, node)
+    return node
+
+
+def project_library(root, manifest):
+    """返回只含清单字段的新根节点 (lxml / ElementTree 均可，原节点不变)。"""
+    projected = root.makeelement(root.tag, {**root.attrib, PROJECTION_ATTR: projection_digest(manifest)})
+    for elem in root:
+        if elem.tag != manifest['element']: continue
+        rule = next((rule for rule in manifest['rules'] if _matches(elem, rule['match'])), None)
+        if rule is not None:
+            projected.append(_project(elem, rule['fields']))
+    return projected
+
+
+def check_projection(root_attrib, manifest):
+    """完整库文件或清单一致时返回 None，否则返回提示。"""
+    found = root_attrib.get(PROJECTION_ATTR)
+    if found is None or found == projection_digest(manifest):
+        return None
+    return f"库文件按旧的字段清单投影 ({found})，可能缺少字段，请重新运行 Distiller"
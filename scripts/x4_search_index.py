@@ -0,0 +1,114 @@
+import os
+import re
+import json
+import unicodedata
+from functools import lru_cache
+from x4_build_cache import write_text_if_changed
+
+# =============================================================================
+# 🔎 模块搜索索引
+# 每种语言一个倒排索引 (locales/search/<语言>.json)，前端搜索时求交集，不再逐个扫描全部模块名称:
+#   - 索引字段与 searchModule.ts 相同: 英文只用 id / 英文名，其他语言再加本地化名称
+#   - 规范化: NFKC + 小写；拉丁字母语言另外去掉重音 (é -> e, ß -> ss, ł -> l)
+#   - 分词: 连续的字母/数字为一个词，中日韩文字与其他文字之间断开 (中日韩文不一定用空格分词)
+#   - 键: 普通词取长度 1-2 的前缀与全部 3-gram；中日韩文词取全部单字与双字
+# 前端始终按整个查询的子串匹配，索引只用来缩小候选: 对查询词的 n-gram (短词取前缀) 求交集后逐个校验。
+# 只有第一个查询词可能落在名称中某个词的中间，它是 1-2 个字符的普通词时索引无法覆盖，前端回退到逐个扫描。
+# 分组按 类型优先级 / 分组优先级 / id 预先排序，模块保持 modules.json 中的顺序。
+# =============================================================================
+
+SEARCH_VERSION = 1
+SEARCH_DIR = "search"
+
+# 与 searchModule.ts 相同
+TYPE_PRIORITY = {"production": 1, "processingmodule": 2, "habitation": 3, "storage": 4}
+GROUP_PRIORITY = {"shiptech": 1, "hightech": 2, "refined": 3, "energy": 4}
+
+FOLD_LOCALES = ("en", "de", "fr", "it", "es", "pl", "pt-BR")
+_FOLD_MAP = str.maketrans({"ß": "ss", "ł": "l", "ø": "o", "æ": "ae", "œ": "oe", "đ": "d", "ı": "i"})
+_CJK = "\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN = re.compile(f"[{_CJK}]+|[^\\W_{_CJK}]+")
+_CJK_TOKEN = re.compile(f"[{_CJK}]")
+_PREFIX = 2
+_GRAM = 3
+
+
+def normalize(text, iso):
+    return _normalize(text or "", iso in FOLD_LOCALES)
+
+
+def _normalize(text, fold):
+    text = unicodedata.normalize("NFKC", text).lower()
+    if fold:
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c)).translate(_FOLD_MAP)
+    return text
+
+
+def tokenize(text, iso):
+    return _TOKEN.findall(normalize(text, iso))
+
+
+def token_keys(token):
+    if _CJK_TOKEN.match(token):
+        return {token[i:i + n] for n in (1, 2) for i in range(len(token) - n + 1)}
+    keys = {token[:n] for n in range(1, min(_PREFIX, len(token)) + 1)}
+    keys.update(token[i:i + _GRAM] for i in range(len(token) - _GRAM + 1))
+    return keys
+
+
+@lru_cache(maxsize=None)
+def _text_keys(text, fold):
+    # id / 英文名在各语言的索引中重复出现，按 (文本, 是否去重音) 缓存
+    keys = set()
+    for token in _TOKEN.findall(_normalize(text, fold)):
+        keys |= token_keys(token)
+    return frozenset(keys)
+
+
+def group_order(module_groups):
+    """与 searchModule.ts 的分组排序相同: 类型优先级 -> 分组优先级 -> id。"""
+    return [g['id'] for g in sorted(module_groups, key=lambda g: (
+        TYPE_PRIORITY.get(g.get('type'), 99), GROUP_PRIORITY.get(g['id'], 99), g['id']))]
+
+
+def build_search_index(iso, modules, module_groups, i18n):
+    """modules: 玩家可建造的模块；i18n: 该语言的 {raw_key: text}。"""
+    groups = group_order(module_groups)
+    group_index = {g_id: i for i, g_id in enumerate(groups)}
+
+    def postings(items):
+        table = {}
+        for doc, item in enumerate(items):
+            fields = [item.get('id'), item.get('name')]
+            if iso != "en":
+                fields.append(i18n.get(item.get('nameId')))
+            keys = set().union(*(_text_keys(field or "", iso in FOLD_LOCALES) for field in fields))
+            for key in keys:
+                table.setdefault(key, []).append(doc)
+        return dict(sorted(table.items()))
+
+    by_id = {g['id']: g for g in module_groups}
+    return {
+        "version": SEARCH_VERSION,
+        "locale": iso,
+        "fold": iso in FOLD_LOCALES,
+        "modules": [m['id'] for m in modules],
+        "groups": groups,
+        "moduleGroups": [group_index.get(m.get('group'), -1) for m in modules],
+        "postings": {"m": postings(modules), "g": postings([by_id[g_id] for g_id in groups])},
+    }
+
+
+def write_search_indexes(locales_dir, modules, module_groups, i18n_by_iso, locales=None):
+    """写入 locales/search/<iso>.json；locales: 只写出这些语言，None 表示全部。返回 [(路径, 是否写入)]。"""
+    search_dir = os.path.join(locales_dir, SEARCH_DIR)
+    os.makedirs(search_dir, exist_ok=True)
+    modules = [m for m in modules if m.get('isPlayerBlueprint')]
+    results = []
+    for iso, i18n in i18n_by_iso.items():
+        if not i18n or (locales is not None and iso not in locales):
+            continue
+        index = build_search_index(iso, modules, module_groups, i18n)
+        path = os.path.join(search_dir, f"{iso}.json")
+        results.append((path, write_text_if_changed(path, json.dumps(index, ensure_ascii=False, separators=(',', ':')))))
+    return results
@@ -0,0 +1,296 @@
+import os
+import json
+import argparse
+from fractions import Fraction
+from functools import lru_cache
+from math import ceil, lcm
+
+# =============================================================================
+# ⚖️ 自给自足空间站的模块配比 (离线求解)
+# 对每个 目标物品 x 工人种族 x 生产方式，求 "N 个目标模块 + 自给自足所需的其余模块" 的最小整数组合:
+#   - 中间产品全部自产 (矿物/气体与无人生产的物品从外部输入)
+#   - 所有模块满员 (产出按 1 + maxBonus 计算)，居住舱容纳全部工人，工人的食物与药品同样自产
+# 每种物品只选一个生产模块 (与前端 findBestProducer 相同: 同种族优先、单体产出最高)，
+# 约束 "产出 - 消耗 >= 需求" 的每一行只有本物品的生产模块系数为正 (Leontief 结构)，
+# 因此可行整数解对逐元素取 min 封闭: 存在逐元素最小的整数解，同时是任意单调目标 (模块总数、工人数...) 的最优解。
+# 求解全程使用有理数 (Fraction):
+#   1. 线性松弛: 解 (P - U) x = d 得到每个目标模块对应的精确配比
+#   2. 整数解: 从松弛解向上取整出发做单调不动点迭代，收敛到最小整数解
+# 松弛解各分量分母的最小公倍数 q 为周期: N = k*q + r 时最小整数解 = k * mix(q) + mix(r)。
+# 命令行: python scripts/x4_station_solver.py <物品> -n N --race R  (读取处理器输出的 data 目录)
+# =============================================================================
+
+RATIOS_VERSION = 1
+MINED_TRANSPORTS = ('solid', 'liquid')  # 与 findBestProducer 相同: 矿物/气体不由空间站生产
+WORKFORCE = '@workforce'                # 居住舱 "生产" 的工位，生产模块按 workforce.needed 消耗
+SECONDS_PER_HOUR = 3600
+_MAX_DENOMINATOR = 10 ** 6
+_MAX_ITERATIONS = 10000
+_PRECISION = 6
+
+
+@lru_cache(maxsize=None)
+def exact(value):
+    # JSON 中的小数 (如 0.00031666666666666665) 还原为有理数 (19/60000)
+    return Fraction(value).limit_denominator(_MAX_DENOMINATOR)
+
+
+def pick_module(candidates, race, amount):
+    # 与前端 selectBestModule 相同: 同种族优先 (没有时使用全部候选)，按 amount 降序；同值时按 id 保证结果稳定
+    matches = [m for m in candidates if m.get('race') == race] or candidates
+    return min(matches, key=lambda m: (-amount(m), m['id'])) if matches else None
+
+
+def solve_linear(matrix, rhs):
+    """有理数线性方程组: 每行化为整数系数后做无除法余数的 Gauss-Jordan 消元 (Bareiss)，矩阵奇异时返回 None。"""
+    n = len(rhs)
+    rows = []
+    for row, value in zip(matrix, rhs):
+        coeffs = list(row) + [value]
+        scale = lcm(*(Fraction(c).denominator for c in coeffs))
+        rows.append([int(c * scale) for c in coeffs])
+    previous = 1
+    for col in range(n):
+        pivot = next((r for r in range(col, n) if rows[r][col] != 0), None)
+        if pivot is None:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        head = rows[col]
+        for r in range(n):
+            if r == col: continue
+            row, factor = rows[r], rows[r][col]
+            # 中间结果均为原矩阵的子式，除以上一个主元总能整除
+            rows[r] = [(head[col] * a - factor * b) // previous for a, b in zip(row, head)]
+        previous = head[col]
+    return [Fraction(row[n], row[i]) for i, row in enumerate(rows)]
+
+
+class StationModel:
+    """单个 目标物品 / 种族 / 生产方式 的线性模型: 变量为每种自产物品的模块数 (及居住舱数)。"""
+
+    def __init__(self, target, chosen, habitat, worker_rates):
+        self.target = target
+        # 目标物品在前，其余自产物品按 id 排序，居住舱在最后
+        self.items = [target] + sorted(w for w in chosen if w != target) + ([WORKFORCE] if habitat is not None else [])
+        self.modules = [habitat if item == WORKFORCE else chosen[item] for item in self.items]
+        index = {item: k for k, item in enumerate(self.items)}
+        n = len(self.items)
+        # produce[k]: 变量 k 的单模块产出 (每小时)；uses[k][j]: 变量 j 的单模块对物品 k 的消耗；imports: 外部输入
+        self.produce = []
+        self.uses = [[Fraction(0)] * n for _ in range(n)]
+        self.imports = [{} for _ in range(n)]
+        for j, (item, module) in enumerate(zip(self.items, self.modules)):
+            workforce = module.get('workforce') or {}
+            if item == WORKFORCE:
+                self.produce.append(exact(workforce.get('capacity', 0)))
+                continue
+            self.produce.append(exact(module['outputs'][item]) * (1 + exact(workforce.get('maxBonus', 0))))
+            needed = exact(workforce.get('needed', 0))
+            consumed = {w: exact(v) for w, v in module['inputs'].items()}
+            if habitat is not None and needed:
+                consumed[WORKFORCE] = needed
+                for w, rate in worker_rates.items():
+                    consumed[w] = consumed.get(w, 0) + rate * needed
+            for w, amount in consumed.items():
+                if w in index:
+                    self.uses[index[w]][j] += amount
+                else:
+                    self.imports[j][w] = amount
+        self.net = [self.produce[k] - self.uses[k][k] for k in range(n)]
+        # 整数迭代用: 每行乘以其系数分母的最小公倍数，化为整数系数 (净产出, 目标需求, [(变量, 消耗)])
+        self.int_rows = []
+        for k in range(n):
+            coeffs = [self.net[k], self.produce[0] if k == 0 else Fraction(0)] + [u for j, u in enumerate(self.uses[k]) if u and j != k]
+            scale = lcm(*(c.denominator for c in coeffs))
+            self.int_rows.append((int(self.net[k] * scale), int(coeffs[1] * scale),
+                                  [(j, int(u * scale)) for j, u in enumerate(self.uses[k]) if u and j != k]))
+
+    def demand(self, count):
+        # 目标物品的需求: N 个目标模块的满员产出 (链内部对目标物品的消耗由额外的目标模块满足)
+        d = [Fraction(0)] * len(self.items)
+        d[0] = self.produce[0] * count
+        return d
+
+    def relaxation(self, count=1):
+        n = len(self.items)
+        if any(net <= 0 for net in self.net):
+            return None
+        matrix = [[(self.produce[k] if k == j else 0) - self.uses[k][j] for j in range(n)] for k in range(n)]
+        x = solve_linear(matrix, self.demand(count))
+        # 生产链无法自给 (消耗不小于产出) 时解不存在或为负
+        if x is None or any(v < 0 for v in x):
+            return None
+        return x
+
+    def least_integer(self, count, start):
+        """从下界 start 出发的单调不动点迭代，返回最小整数解。"""
+        x = [ceil(v) for v in start]
+        for _ in range(_MAX_ITERATIONS):
+            changed = False
+            for k, (net, demand, row) in enumerate(self.int_rows):
+                need = -(-(demand * count + sum(u * x[j] for j, u in row)) // net)
+                if need > x[k]:
+                    x[k] = need
+                    changed = True
+            if not changed:
+                return x
+        raise RuntimeError(f"整数解迭代未收敛: {self.target}")
+
+
+def select_chain(target, race, method, producers, extra_wares):
+    """选择链上每种物品的生产模块: 目标物品只用指定方式，其余物品依次回退到 default 与任意方式。"""
+    chosen = {}
+    pending = [target] + sorted(extra_wares)
+    while pending:
+        ware = pending.pop()
+        if ware in chosen or ware not in producers:
+            continue
+        candidates = [m for m in producers[ware] if m['method'] == method]
+        if not candidates and ware != target:
+            candidates = [m for m in producers[ware] if m['method'] == 'default'] or producers[ware]
+        if not candidates:
+            return None
+        module = pick_module(candidates, race, lambda m: m['outputs'][ware])
+        chosen[ware] = module
+        pending.extend(sorted(module['inputs']))
+    return chosen
+
+
+def solve_station(model, max_count):
+    """返回单个条目 (精确配比 + N = 1..max_count 的最小整数组合)；生产链无法自给时返回 None。"""
+    per_module = model.relaxation()
+    if per_module is None:
+        return None
+    period = lcm(*(v.denominator for v in per_module))
+    solutions, start = [], per_module
+    for count in range(1, min(period, max_count) + 1):
+        # N 的最小整数解不小于 N-1 的解，也不小于 N 倍的松弛解
+        start = model.least_integer(count, [max(a, b * count) for a, b in zip(start, per_module)])
+        solutions.append(start)
+
+    imports = {}
+    for j, amount in enumerate(per_module):
+        for w, per in model.imports[j].items():
+            imports[w] = imports.get(w, 0) + per * amount
+    workers = sum(u * v for u, v in zip(model.uses[-1], per_module)) if model.items[-1] == WORKFORCE else 0
+    # 只保留实际用到的模块；ratio 与 mixes 的每一列对应 modules 中的同一模块
+    used = [j for j in range(len(model.items)) if per_module[j] or any(x[j] for x in solutions)]
+    return {
+        "modules": [model.modules[j]['id'] for j in used],
+        "ratio": [round(float(per_module[j]), _PRECISION) for j in used],
+        "workforce": round(float(workers), _PRECISION),
+        "imports": {w: round(float(v), _PRECISION) for w, v in sorted(imports.items())},
+        "period": period if period <= max_count else None,
+        "mixes": [[x[j] for j in used] for x in solutions],
+    }
+
+
+def _model_key(target, chosen, habitat, worker_rates, max_count):
+    # 条目只取决于链上模块的产出/消耗/工位、居住舱与工人消耗
+    fields = lambda m: [m['id'], m['outputs'], m['inputs'], m.get('workforce')]
+    return json.dumps([target, max_count, [fields(chosen[w]) for w in sorted(chosen)], habitat and fields(habitat),
+                       sorted((w, str(v)) for w, v in worker_rates.items())], sort_keys=True)
+
+
+def _station_inputs(modules, wares):
+    """返回 (物品 -> 生产模块列表, 居住舱列表, 有居住舱的种族)。"""
+    mined = {w['id'] for w in wares if w.get('transport') in MINED_TRANSPORTS}
+    # 只使用玩家可建造的模块 (排除 Xenon 设施、地标居住区等)
+    modules = [m for m in modules if m.get('isPlayerBlueprint')]
+    producers = {}
+    for m in modules:
+        if m.get('type') == 'production' and m.get('method') not in ('recycling', 'none'):
+            for ware in m['outputs']:
+                if ware not in mined:
+                    producers.setdefault(ware, []).append(m)
+    habitats = [m for m in modules if m.get('type') == 'habitation' and (m.get('workforce') or {}).get('capacity', 0) > 0]
+    races = sorted({m['race'] for m in habitats})
+    return producers, habitats, races
+
+
+def _worker_rates(consumption, race):
+    rates = consumption.get(race) or consumption.get('default', {})
+    return {w: exact(v) * SECONDS_PER_HOUR for w, v in rates.items()}
+
+
+def build_station_ratios(modules, wares, consumption, max_count=10, memo=None):
+    """modules / wares / consumption: 处理器的 all_modules / wares_data / race_consumption。
+
+    max_count: 每个条目预先展开的最大目标模块数；周期不超过该值的条目对任意 N 都是精确的。
+    memo: 跨次调用复用的 {模型输入: 条目}，只重新求解输入发生变化的条目。
+    """
+    producers, habitats, races = _station_inputs(modules, wares)
+    stations = {}
+    failed = []
+    solved = {}
+    for target in sorted(producers):
+        methods = sorted({m['method'] for m in producers[target]})
+        for race in races:
+            worker_rates = _worker_rates(consumption, race)
+            habitat = pick_module(habitats, race, lambda m: m['workforce']['capacity'])
+            for method in methods:
+                chosen = select_chain(target, race, method, producers, worker_rates)
+                key = _model_key(target, chosen, habitat, worker_rates, max_count)
+                if memo is not None and key in memo:
+                    entry = memo[key]
+                else:
+                    entry = solve_station(StationModel(target, chosen, habitat, worker_rates), max_count)
+                solved[key] = entry
+                if entry is None:
+                    failed.append((target, race, method))
+                    continue
+                stations.setdefault(target, {}).setdefault(race, {})[method] = entry
+    if memo is not None:
+        memo.clear()
+        memo.update(solved)
+    return {"version": RATIOS_VERSION, "maxCount": max_count, "stations": stations}, failed
+
+
+def solve_target(modules, wares, consumption, target, race, method='default', count=1):
+    """自给自足地运行 count 个 target 生产模块所需的最小模块组合 {模块 id: 数量}；无解时返回 None。"""
+    producers, habitats, _ = _station_inputs(modules, wares)
+    if target not in producers:
+        return None
+    worker_rates = _worker_rates(consumption, race)
+    habitat = pick_module(habitats, race, lambda m: m['workforce']['capacity'])
+    model = StationModel(target, select_chain(target, race, method, producers, worker_rates), habitat, worker_rates)
+    per_module = model.relaxation()
+    if per_module is None:
+        return None
+    mix = model.least_integer(count, [v * count for v in per_module])
+    return {module['id']: n for module, n in zip(model.modules, mix) if n}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="求解自给自足地建造 N 个生产模块所需的最小模块组合")
+    parser.add_argument('ware', help="目标物品 id")
+    parser.add_argument('-n', '--count', type=int, default=1, help="目标生产模块数")
+    parser.add_argument('--race', default='argon', help="工人种族 (默认 argon)")
+    parser.add_argument('--method', default='default', help="目标物品的生产方式")
+    parser.add_argument('--data', help="处理器输出的 data 目录 (默认按项目配置)")
+    args = parser.parse_args(argv)
+    if args.count < 1:
+        parser.error("--count 至少为 1")
+
+    data_dir = args.data
+    if data_dir is None:
+        with open('x4-station-calculator.config.json', 'r', encoding='utf-8') as f:
+            v_config = json.load(f)
+        data_dir = os.path.join(v_config['processed_assets_dir'], v_config['folder_name'], "data")
+
+    def load(name):
+        with open(os.path.join(data_dir, name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    mix = solve_target(load("modules.json"), load("wares.json"), load("consumption.json"),
+                       args.ware, args.race, args.method, args.count)
+    if mix is None:
+        print(f"❌ {args.ware} ({args.race}, {args.method}) 没有可自给的生产链")
+        return 1
+    print(f"⚖️ 自给自足地运行 {args.count} 个 {args.ware} 生产模块 ({args.race}, {args.method}):")
+    for module_id, n in mix.items():
+        print(f"   {n:>4} × {module_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
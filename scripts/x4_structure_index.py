@@ -0,0 +1,98 @@
+import os
+import json
+
+# =============================================================================
+# 🗂️ 结构文件索引 (assets/structures/**/*.xml)
+# 按来源 (base / DLC id) 缓存 "文件名 -> 路径" 映射，以目录 mtime 判断是否失效。
+# =============================================================================
+
+INDEX_VERSION = 1
+
+
+class StructureIndex:
+    def __init__(self, path):
+        self.path = path
+        self.sources = {}  # source_key -> {root, dirs, files, duplicates}
+        self.refreshed = []
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == INDEX_VERSION:
+                    self.sources = data.get('sources', {})
+            except (OSError, ValueError):
+                pass
+
+    @staticmethod
+    def _structures_dir(root_path):
+        return os.path.join(root_path, "assets", "structures")
+
+    def _is_fresh(self, entry, root_path):
+        if entry.get('root') != os.path.abspath(root_path):
+            return False
+        base = self._structures_dir(root_path)
+        if not entry['dirs']:
+            return not os.path.isdir(base)
+        for rel, mtime_ns in entry['dirs'].items():
+            try:
+                if os.stat(os.path.join(base, rel)).st_mtime_ns != mtime_ns:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _rebuild(self, root_path):
+        # 单次 os.scandir 遍历：记录每个目录的 mtime 与所有 xml 文件
+        base = self._structures_dir(root_path)
+        dirs = {}
+        found = []
+        stack = [base] if os.path.isdir(base) else []
+        while stack:
+            d = stack.pop()
+            rel_dir = os.path.relpath(d, base)
+            try:
+                dirs[rel_dir] = os.stat(d).st_mtime_ns
+                with os.scandir(d) as it:
+                    for e in it:
+                        if e.name.startswith('.'): continue
+                        if e.is_dir(follow_symlinks=False):
+                            stack.append(e.path)
+                        elif e.name.lower().endswith('.xml'):
+                            found.append(os.path.join(rel_dir, e.name) if rel_dir != '.' else e.name)
+            except OSError:
+                continue
+
+        files = {}
+        duplicates = {}
+        for rel in sorted(found):
+            fname = os.path.splitext(os.path.basename(rel))[0]
+            if fname in files:
+                duplicates.setdefault(fname, [files[fname]]).append(rel)
+            else:
+                files[fname] = rel
+        return {"root": os.path.abspath(root_path), "dirs": dirs, "files": files, "duplicates": duplicates}
+
+    def lookup(self, source_key, root_path):
+        """返回该来源下 宏名 -> 文件路径；目录有变化时重新扫描。"""
+        entry = self.sources.get(source_key)
+        if entry is None or not self._is_fresh(entry, root_path):
+            entry = self._rebuild(root_path)
+            self.sources[source_key] = entry
+            self.refreshed.append(source_key)
+        base = self._structures_dir(root_path)
+        return {fname: os.path.join(base, rel) for fname, rel in entry['files'].items()}
+
+    def directories(self, source_key, root_path):
+        """该来源已索引的全部目录 (目录 mtime 变化即表示增删了结构文件)。"""
+        base = self._structures_dir(root_path)
+        return [os.path.normpath(os.path.join(base, rel)) for rel in self.sources.get(source_key, {}).get('dirs', {})]
+
+    def duplicates(self, source_key):
+        return self.sources.get(source_key, {}).get('duplicates', {})
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "sources": self.sources}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
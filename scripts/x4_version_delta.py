@@ -0,0 +1,140 @@
+import os
+import json
+import glob
+from x4_build_cache import write_text_if_changed
+
+# =============================================================================
+# 🔀 版本增量 (Delta)
+# 比较两个版本的处理结果 (data/*.json 与 locales/*.json)，只记录变化的部分:
+#   - 对象列表 (modules / wares / module_groups / languages): 按主键记录新增或修改的条目、删除的主键，
+#     顺序无法由 "原位替换 + 末尾追加" 得到时额外记录完整主键顺序
+#   - 字典 (语言包 / consumption / ware_modules / production_chains): 逐层记录 set / removed / patch
+# 已持有基准版本的一方只需下载增量，再用 apply_delta 还原目标版本 (前端目前只打包单个版本，没有切换版本的加载流程)。
+# 紧凑数据包 game_data.compact.json 由 modules / wares 派生，不参与比较。
+# =============================================================================
+
+DELTA_FORMAT = 1
+LIST_KEYS = {
+    "data/modules.json": "id",
+    "data/wares.json": "id",
+    "data/module_groups.json": "id",
+    "data/languages.json": "code",
+}
+EXCLUDED_FILES = {"data/game_data.compact.json"}
+
+
+def load_version_files(version_dir):
+    """读取一个版本目录下参与比较的 JSON 文件: 相对路径 (/ 分隔) -> 内容。"""
+    files = {}
+    for sub in ("data", "locales"):
+        for path in sorted(glob.glob(os.path.join(version_dir, sub, "*.json"))):
+            rel = f"{sub}/{os.path.basename(path)}"
+            if rel in EXCLUDED_FILES:
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                files[rel] = json.load(f)
+    return files
+
+
+def diff_dict(base, target):
+    delta = {}
+    set_items = {}
+    patch = {}
+    for key, value in target.items():
+        if key not in base:
+            set_items[key] = value
+        elif base[key] != value:
+            if isinstance(value, dict) and isinstance(base[key], dict):
+                patch[key] = diff_dict(base[key], value)
+            else:
+                set_items[key] = value
+    removed = [key for key in base if key not in target]
+    if set_items: delta["set"] = set_items
+    if removed: delta["removed"] = removed
+    if patch: delta["patch"] = patch
+    return delta
+
+
+def apply_dict(base, delta):
+    removed = set(delta.get("removed", ()))
+    result = {key: value for key, value in base.items() if key not in removed}
+    for key, sub_delta in delta.get("patch", {}).items():
+        result[key] = apply_dict(result[key], sub_delta)
+    result.update(delta.get("set", {}))
+    return result
+
+
+def diff_list(base, target, key):
+    base_by_key = {item[key]: item for item in base}
+    target_keys = {item[key] for item in target}
+    delta = {"key": key}
+    changed = [item for item in target if base_by_key.get(item[key]) != item]
+    removed = [item[key] for item in base if item[key] not in target_keys]
+    if changed: delta["set"] = changed
+    if removed: delta["removed"] = removed
+    if [item[key] for item in apply_list(base, delta)] != [item[key] for item in target]:
+        delta["order"] = [item[key] for item in target]
+    return delta
+
+
+def apply_list(base, delta):
+    key = delta["key"]
+    removed = set(delta.get("removed", ()))
+    updates = {item[key]: item for item in delta.get("set", ())}
+    result = [updates.pop(item[key], item) for item in base if item[key] not in removed]
+    result.extend(updates.values())
+    if "order" in delta:
+        by_key = {item[key]: item for item in result}
+        result = [by_key[k] for k in delta["order"]]
+    return result
+
+
+def build_delta(base_name, base_files, target_name, target_files):
+    files = {}
+    for rel, content in target_files.items():
+        if rel not in base_files:
+            files[rel] = {"replace": content}
+            continue
+        base = base_files[rel]
+        if base == content:
+            continue
+        key = LIST_KEYS.get(rel)
+        if key and isinstance(base, list) and isinstance(content, list):
+            files[rel] = diff_list(base, content, key)
+        elif isinstance(base, dict) and isinstance(content, dict):
+            files[rel] = diff_dict(base, content)
+        else:
+            files[rel] = {"replace": content}
+    return {
+        "format": DELTA_FORMAT,
+        "from": base_name,
+        "to": target_name,
+        "files": files,
+        "removedFiles": sorted(rel for rel in base_files if rel not in target_files),
+    }
+
+
+def apply_delta(base_files, delta):
+    removed = set(delta["removedFiles"])
+    result = {rel: content for rel, content in base_files.items() if rel not in removed}
+    for rel, file_delta in delta["files"].items():
+        if "replace" in file_delta:
+            result[rel] = file_delta["replace"]
+        elif "key" in file_delta:
+            result[rel] = apply_list(result[rel], file_delta)
+        else:
+            result[rel] = apply_dict(result[rel], file_delta)
+    return result
+
+
+def write_version_delta(processed_dir, base_name, target_name):
+    """写入 <target>/delta/<base>.json，返回 (路径, 是否写入, 增量字节数, 目标版本全量字节数)。"""
+    base_files = load_version_files(os.path.join(processed_dir, base_name))
+    target_dir = os.path.join(processed_dir, target_name)
+    target_files = load_version_files(target_dir)
+    text = json.dumps(build_delta(base_name, base_files, target_name, target_files), ensure_ascii=False, separators=(',', ':'))
+    delta_dir = os.path.join(target_dir, "delta")
+    os.makedirs(delta_dir, exist_ok=True)
+    path = os.path.join(delta_dir, f"{base_name}.json")
+    full_size = sum(len(json.dumps(c, ensure_ascii=False, separators=(',', ':')).encode('utf-8')) for c in target_files.values())
+    return path, write_text_if_changed(path, text), len(text.encode('utf-8')), full_size
@@ -0,0 +1,375 @@
+import os
+import io
+import sys
+import copy
+import time
+import shutil
+import argparse
+import contextlib
+from lxml import etree
+import x4_asset_distiller as distiller
+import x4_data_processor as processor
+from x4_build_cache import sync_directory
+from x4_structure_index import StructureIndex
+from x4_extensions import resolve_extensions, EXTENSIONS_DIR, CONTENT_FILE
+from x4_language import load_language, resolve_keys, needed_pages_of
+
+# =============================================================================
+# 👀 Watch 模式: 常驻内存的增量流水线 (Distiller + Processor)
+# 轮询 SOURCE 中参与构建的文件与配置文件；合并后的库文件、逐个宏的合并结果与语言库保留在内存中，
+# 变化的文件只重建依赖它的输出:
+#   - libraries/wares.xml (含 DLC 补丁) -> 重新合并 wares -> data/*.json (引用的宏变化时补充合并)
+#   - libraries/waregroups.xml            -> 重新合并 waregroups -> data/*.json
+#   - 单个宏文件 (Base 或 DLC)            -> macros 中的一个条目 -> data/*.json
+#   - assets/structures 下的目录           -> 重新索引宏来源 (新增 / 删除的宏文件) -> data/*.json
+#   - t/0001-L049.xml                     -> 只写出 locales/de.json (及其分片)
+#   - t/0001-L044.xml / t/0001.xml        -> locales/en.json + 数据中的英文 name 字段
+#   - 配置文件 / 扩展的 content.xml / 新增或删除扩展 -> 重新加载配置与加载顺序并全量构建
+# 用法 (在项目根目录): python scripts/x4_watch.py [--interval 0.5] [--jobs 0]
+# =============================================================================
+
+LIBRARY_FILES = ('wares.xml', 'waregroups.xml')
+CONFIG_FILES = ('x4-game.config.json', processor.CONFIG_FILE)
+
+
+def file_state(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def needed_macros_of(wares_root):
+    # 与 Distiller 相同: tags 含 module 的商品所引用的宏
+    needed = set()
+    for ware in wares_root.iter('ware'):
+        if 'module' in ware.get('tags', ''):
+            comp = ware.find('component')
+            if comp is not None and comp.get('ref'):
+                needed.add(comp.get('ref'))
+    return needed
+
+
+class WarmLanguages:
+    """常驻内存的语言库，可直接替换 X4PrecisionLoader.resolve_language。
+
+    每种语言只在文件变化 (invalidate) 或需要尚未载入的页面时重新解析，
+    所需 Key 变化时直接在内存中重新展开。
+    """
+
+    def __init__(self):
+        self.dbs = {}      # X4 语言 ID -> (语言库, 已覆盖的页面)
+        self.results = {}  # X4 语言 ID -> (所需 Key, 展开结果)，Key 不变时直接复用
+
+    def invalidate(self, x4_id):
+        self.dbs.pop(x4_id, None)
+        self.results.pop(x4_id, None)
+
+    def __call__(self, t_path, x4_id, needed_raw_names):
+        needed = frozenset(needed_raw_names)
+        cached = self.results.get(x4_id)
+        if cached is not None and cached[0] == needed:
+            return cached[1]
+        pages = needed_pages_of(needed)
+        entry = self.dbs.get(x4_id)
+        if entry is None or not pages <= entry[1]:
+            entry = self.dbs[x4_id] = (load_language(t_path, x4_id, pages), pages)
+        result = resolve_keys(entry[0], needed_raw_names)
+        self.results[x4_id] = (needed, result)
+        return result
+
+
+class PipelineWatcher:
+    def __init__(self, jobs=1, keep_final=False, verbose=False):
+        self.jobs = jobs
+        self.keep_final = keep_final
+        self.verbose = verbose
+        self.parser = etree.XMLParser(remove_blank_text=True)
+        self.pending = {}  # 轮询到的新文件状态，重建成功后才提交
+        self.failed = None # 上次重建失败时的文件状态 (未再变化时不重复重试)
+        self.load()
+
+    # =======================================================
+    # 冷启动 (配置变化时重新执行)
+    # =======================================================
+    def load(self):
+        start = time.perf_counter()
+        self.m_config, self.config = distiller.load_all_configs()
+        self.xml_diff = distiller.load_patch_engine(self.m_config, 'native')
+        self.src = self.m_config['X4_PATHS']['SOURCE']
+        self.extensions, self.dlc_order, problems = resolve_extensions(self.src, self.config)
+        self.raw_path = os.path.join(self.config['raw_assets_dir'], self.config['folder_name'])
+        self.output_dir = os.path.join(self.config['processed_assets_dir'], self.config['folder_name'])
+        print(f"👀 Watch 模式: {self.config['folder_name']} ({self.src})")
+        print(f"   🧩 扩展加载顺序: {', '.join(self.dlc_order) or '(无)'}")
+        for problem in problems:
+            print(f"      ⚠️ {problem}")
+
+        self.base_trees = {}    # Base 库文件路径 -> (文件状态, 解析结果)
+        self.libraries = {}     # 库文件名 -> 合并后的根节点
+        self.macro_sources = {} # 宏名 -> {'base' / DLC id: 文件路径}
+        self.macro_nodes = {}   # 宏名 -> 合并后的 <macro> 节点 (无结果时为 None)
+        self.macros_root = None
+        self.structure_dirs = []  # 宏来源索引涉及的目录 (增删宏文件时 mtime 变化)
+        self.languages = WarmLanguages()
+        self.loader = None
+        self.i18n = {}          # 上次写出的语言包 iso -> {raw_key: text}
+        self.generation = 0
+
+        t_src = os.path.join(self.src, "t")
+        if os.path.isdir(t_src):
+            sync_directory(t_src, os.path.join(self.raw_path, "t"))
+        for lib_file in LIBRARY_FILES:
+            self.merge_library(lib_file)
+        self.refresh_macro_index()
+        fragments = distiller.aggregate_macros(sorted(self.macro_sources), self.macro_sources, self.dlc_order,
+                                               self.xml_diff, self.m_config, self.jobs or os.cpu_count() or 1)
+        for macro_id, fragment in fragments.items():
+            self.macro_nodes[macro_id] = etree.fromstring(fragment, self.parser) if fragment is not None else None
+        self.assemble_macros()
+        self.write_finals(LIBRARY_FILES + ('macros.xml',))
+        written = self.process(quiet=False)
+        self.watch_files()
+        print(f"✅ 冷启动完成: 写入 {written} 个文件，{len(self.macro_nodes)} 个宏，"
+              f"监视 {len(self.states)} 个文件 ({time.perf_counter() - start:.2f}s)")
+
+    # =======================================================
+    # 内存中的合并结果
+    # =======================================================
+    def base_tree(self, path):
+        # Base 库文件体积大，解析结果常驻内存，只在文件变化时重新解析
+        state = file_state(path)
+        cached = self.base_trees.get(path)
+        if cached is None or cached[0] != state:
+            cached = self.base_trees[path] = (state, etree.parse(path, self.parser))
+        return cached[1]
+
+    def merge_library(self, lib_file):
+        base_path = os.path.join(self.src, "libraries", lib_file)
+        if not os.path.exists(base_path):
+            print(f"      ⚠️ Base 文件不存在: {base_path}")
+            self.libraries.pop(lib_file, None)
+            return
+        root = copy.deepcopy(self.base_tree(base_path).getroot())
+        for dlc_id in self.dlc_order:
+            # 监视的库文件只有两个，直接检查路径 (运行期间新增的补丁也能生效)
+            patch_path = os.path.join(self.extensions[dlc_id].path, "libraries", lib_file)
+            if os.path.exists(patch_path):
+                try:
+                    self.xml_diff.Apply_Patch(root, etree.parse(patch_path, self.parser).getroot())
+                except Exception as e:
+                    print(f"      ⚠️ 警告: 补丁失败 {dlc_id}: {e}")
+        self.libraries[lib_file] = root
+
+    def refresh_macro_index(self):
+        """按 wares 的引用更新宏来源索引，返回新增的宏 (不再引用的宏直接移除)。"""
+        wares_root = self.libraries.get('wares.xml')
+        needed = needed_macros_of(wares_root) if wares_root is not None else set()
+        structure_index = StructureIndex(os.path.join(self.config['raw_assets_dir'], distiller.STRUCTURE_INDEX_NAME))
+        sources = {}
+        self.structure_dirs = []
+        for source_key, root_path in [('base', self.src)] + [(d, self.extensions[d].path) for d in self.dlc_order]:
+            if source_key != 'base' and not os.path.exists(root_path): continue
+            for fname, path in structure_index.lookup(source_key, root_path).items():
+                if fname in needed:
+                    sources.setdefault(fname, {})[source_key] = path
+            self.structure_dirs.extend(structure_index.directories(source_key, root_path))
+        structure_index.save()
+        added = {m for m in sources if sources[m] != self.macro_sources.get(m)}
+        for macro_id in set(self.macro_nodes) - set(sources):
+            del self.macro_nodes[macro_id]
+        self.macro_sources = sources
+        return added
+
+    def merge_macro(self, macro_id):
+        fragment = distiller.merge_macro(macro_id, self.macro_sources[macro_id], self.dlc_order, self.xml_diff)
+        self.macro_nodes[macro_id] = etree.fromstring(fragment, self.parser) if fragment is not None else None
+
+    def assemble_macros(self):
+        # 按名称顺序组装，与 Distiller 输出一致
+        self.macros_root = etree.Element('macros')
+        for macro_id in sorted(self.macro_nodes):
+            if self.macro_nodes[macro_id] is not None:
+                self.macros_root.append(self.macro_nodes[macro_id])
+
+    def write_finals(self, names):
+        lib_dir = os.path.join(self.raw_path, "libraries")
+        os.makedirs(lib_dir, exist_ok=True)
+        for name in names:
+            root = self.macros_root if name == 'macros.xml' else self.libraries.get(name)
+            path = os.path.join(lib_dir, name.replace('.xml', '_final.xml'))
+            if not self.keep_final:
+                # 不写出时删除旧的产物，避免单独运行处理器时读到过期数据
+                if os.path.exists(path): os.remove(path)
+            elif root is not None:
+                etree.ElementTree(root).write(path, encoding='utf-8', xml_declaration=True, pretty_print=True)
+
+    # =======================================================
+    # 处理器: 内存交接合并结果，语言使用常驻的语言库
+    # =======================================================
+    def process(self, quiet=True):
+        """重新运行数据阶段，只写出数据文件与内容变化的语言包，返回写入的文件数。"""
+        self.generation += 1
+        handoff = {f"{name[:-len('.xml')]}_final.xml": (root, f"watch-{self.generation}")
+                   for name, root in list(self.libraries.items()) + [('macros.xml', self.macros_root)] if root is not None}
+        with self.output(quiet):
+            loader = processor.X4PrecisionLoader(self.raw_path, self.output_dir, self.config, handoff=handoff)
+            loader.resolve_language = self.languages
+            loader.build_production_chains()
+            loader.extract_and_resolve_languages()
+            loader.inject_english_names()
+            changed = {iso for iso, entries in loader.i18n_data.items() if entries != self.i18n.get(iso)}
+            written = loader.save(locales=changed)
+        self.loader = loader
+        self.i18n = {iso: dict(entries) for iso, entries in loader.i18n_data.items()}
+        return written
+
+    def process_languages(self, x4_ids):
+        """只重新展开这些语言 (数据不变)，返回写入的文件数。"""
+        isos = set()
+        with self.output(quiet=True):
+            for x4_id in x4_ids:
+                iso = processor.X4_LANG_CONFIG[x4_id]['iso']
+                self.loader.resolved_languages.discard(x4_id)
+                self.i18n[iso] = dict(self.loader.locale(iso))
+                isos.add(iso)
+            return self.loader.save(write_data=False, locales=isos)
+
+    def output(self, quiet):
+        return contextlib.redirect_stdout(io.StringIO()) if quiet and not self.verbose else contextlib.nullcontext()
+
+    # =======================================================
+    # 文件 -> 受影响的输出
+    # =======================================================
+    def watch_files(self):
+        self.owners = {os.path.abspath(p): ('config', None) for p in CONFIG_FILES}
+        for lib_file in LIBRARY_FILES:
+            self.owners[os.path.join(self.src, "libraries", lib_file)] = ('library', lib_file)
+            for dlc_id in self.dlc_order:
+                self.owners[os.path.join(self.extensions[dlc_id].path, "libraries", lib_file)] = ('library', lib_file)
+        # 新增 / 删除扩展或修改依赖会改变加载顺序
+        self.owners[os.path.join(self.src, EXTENSIONS_DIR)] = ('config', None)
+        for ext in self.extensions.values():
+            self.owners[os.path.join(ext.path, CONTENT_FILE)] = ('config', None)
+        for path in self.structure_dirs:
+            self.owners[path] = ('structures', None)
+        for macro_id, sources in self.macro_sources.items():
+            for path in sources.values():
+                self.owners[path] = ('macro', macro_id)
+        t_src = os.path.join(self.src, "t")
+        self.owners[os.path.join(t_src, "0001.xml")] = ('language', '044')
+        for x4_id in processor.X4_LANG_CONFIG:
+            self.owners[os.path.join(t_src, f"0001-L{x4_id}.xml")] = ('language', x4_id)
+        previous = getattr(self, 'states', {})
+        self.states = {path: previous.get(path, file_state(path)) for path in self.owners}
+
+    def poll(self):
+        # 只记下新状态；重建成功后才提交 (commit)，失败的变化会在下次轮询时再次出现
+        changed = []
+        for path, state in self.states.items():
+            current = file_state(path)
+            if current != state:
+                self.pending[path] = current
+                changed.append(path)
+        return changed
+
+    def commit(self, changed):
+        for path in changed:
+            if path in self.pending:
+                state = self.pending.pop(path)
+                if path in self.states: self.states[path] = state
+
+    def rebuild(self, changed):
+        """按变化的源文件重建受影响的输出，返回写入的文件数；成功后提交这些文件的新状态。"""
+        kinds = [self.owners[p] for p in changed if p in self.owners]
+        if any(kind == 'config' for kind, _ in kinds):
+            self.load()
+            self.commit(changed)
+            return None
+        libraries = {target for kind, target in kinds if kind == 'library'}
+        macros = {target for kind, target in kinds if kind == 'macro'}
+        languages = {target for kind, target in kinds if kind == 'language'}
+        # wares 引用变化或结构目录中增删了文件时重新索引宏来源
+        reindex = 'wares.xml' in libraries or any(kind == 'structures' for kind, _ in kinds)
+
+        for lib_file in sorted(libraries):
+            self.merge_library(lib_file)
+        if reindex:
+            macros |= self.refresh_macro_index()
+        for macro_id in sorted(macros & set(self.macro_sources)):
+            self.merge_macro(macro_id)
+        if macros or reindex:
+            self.assemble_macros()
+        self.write_finals(sorted(libraries) + (['macros.xml'] if macros or reindex else []))
+
+        t_src, t_dest = os.path.join(self.src, "t"), os.path.join(self.raw_path, "t")
+        for path in changed:
+            if self.owners.get(path, (None,))[0] != 'language': continue
+            # 同步到 raw 目录 (处理器从这里读取)
+            dest = os.path.join(t_dest, os.path.relpath(path, t_src))
+            if os.path.exists(path):
+                os.makedirs(t_dest, exist_ok=True)
+                shutil.copy2(path, dest)
+            elif os.path.exists(dest):
+                os.remove(dest)
+        for x4_id in languages:
+            self.languages.invalidate(x4_id)
+
+        # 英文同时决定数据中的 name 字段
+        if libraries or macros or reindex or '044' in languages:
+            written = self.process()
+        else:
+            written = self.process_languages(sorted(languages))
+        if libraries or macros or reindex:
+            self.watch_files()
+        self.commit(changed)
+        return written
+
+    def run(self, interval):
+        print(f"👀 正在监视变化 (每 {interval}s 轮询，Ctrl+C 退出)...")
+        while True:
+            time.sleep(interval)
+            changed = self.poll()
+            if not changed: continue
+            attempt = {p: self.pending.get(p) for p in changed}
+            if attempt == self.failed: continue
+            start = time.perf_counter()
+            names = ", ".join(os.path.basename(p) for p in changed[:5]) + (f" (+{len(changed) - 5})" if len(changed) > 5 else "")
+            try:
+                written = self.rebuild(changed)
+            except Exception as e:
+                # 文件可能仍在写入中；新状态未提交，文件再次变化 (如写入完成) 后重试
+                self.failed = attempt
+                print(f"❌ [{time.strftime('%H:%M:%S')}] {names}: {e}")
+                continue
+            self.failed = None
+            if written is not None:
+                print(f"🔄 [{time.strftime('%H:%M:%S')}] {names} -> 写入 {written} 个文件 ({time.perf_counter() - start:.3f}s)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="X4 资产 Watch 模式: 源文件变化时增量重建输出")
+    parser.add_argument('--interval', type=float, default=0.5, help="轮询间隔 (秒，默认 0.5)")
+    parser.add_argument('--jobs', type=int, default=1, help="冷启动时宏聚合的并行进程数 (0 = CPU 核心数，默认串行)")
+    parser.add_argument('--keep-final', action='store_true', help="同时写出 *_final.xml 调试产物")
+    parser.add_argument('--verbose', action='store_true', help="显示增量重建时处理器的完整输出")
+    parser.add_argument('--once', action='store_true', help="只执行冷启动构建，不进入监视")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    watcher = PipelineWatcher(jobs=args.jobs, keep_final=args.keep_final, verbose=args.verbose)
+    if not args.once:
+        watcher.run(args.interval)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n👋 已停止监视。")
+    except Exception as e:
+        print(f"\n程序终止: {e}")
+        sys.exit(1)
@@ -0,0 +1,201 @@
+import re
+import copy
+from lxml import etree
+
+# =============================================================================
+# 🩹 X4 <diff> 补丁引擎 (RFC 5261 子集，lxml 实现)
+# 支持 add (pos = before/after/prepend，type="@attr")、replace、remove，以及 if / silent / msel。
+# sel 表达式编译后按字符串缓存，DLC 中大量重复的选择器只编译一次；
+# 连续、同 sel 的追加操作合并为一次定位。
+# 接口与 X4 Customizer 的 Framework.File_Manager.XML_Diff.Apply_Patch 相同。
+# =============================================================================
+
+class XMLDiffError(Exception):
+    def __init__(self, message, applied=0):
+        super().__init__(message)
+        self.applied = applied  # Apply_Patch 汇总错误时: 已执行的操作数
+
+
+_ATTR_SEL_RE = re.compile(r'^(.*)/@([\w.:-]+)$')
+_ATTR_PREDICATE_RE = re.compile(r'''\[\s*@[\w.:-]+\s*(?:=\s*(?:'[^']*'|"[^"]*")\s*)?(?:(?:and|or)\s*@[\w.:-]+\s*(?:=\s*(?:'[^']*'|"[^"]*")\s*)?)*\]''')
+_selector_cache = {}
+_condition_cache = {}
+
+
+class _Selector:
+    __slots__ = ('xpath', 'attr', 'text', 'stable')
+
+    def __init__(self, sel):
+        self.attr = None
+        self.text = False
+        node_sel = sel
+        match = _ATTR_SEL_RE.match(sel)
+        if match:
+            node_sel, self.attr = match.groups()
+        elif sel.endswith('/text()'):
+            node_sel, self.text = sel[:-len('/text()')], True
+        self.xpath = etree.XPath(node_sel)
+        # 绝对路径且谓词只比较属性: 往目标下追加子节点不会改变匹配结果，可以合并连续的追加
+        self.stable = sel.startswith('/') and '//' not in node_sel and '[' not in _ATTR_PREDICATE_RE.sub('', node_sel)
+
+
+def compile_selector(sel):
+    selector = _selector_cache.get(sel)
+    if selector is None:
+        try:
+            selector = _selector_cache[sel] = _Selector(sel)
+        except etree.XPathSyntaxError as e:
+            raise XMLDiffError(f"无效的 sel 表达式 '{sel}': {e}")
+    return selector
+
+
+def selector_cache_info():
+    return {"compiled": len(_selector_cache)}
+
+
+def _is_true(value):
+    return value is not None and value.lower() in ('true', '1')
+
+
+def _targets(root, op):
+    sel = op.get('sel')
+    if not sel:
+        raise XMLDiffError(f"<{op.tag}> 缺少 sel 属性")
+    selector = compile_selector(sel)
+    nodes = selector.xpath(root)
+    if not isinstance(nodes, list):
+        raise XMLDiffError(f"sel 未选中节点: {sel}")
+    if not nodes:
+        if _is_true(op.get('silent')):
+            return selector, []
+        raise XMLDiffError(f"sel 未匹配任何节点: {sel}")
+    if len(nodes) > 1 and not _is_true(op.get('msel')):
+        raise XMLDiffError(f"sel 匹配到 {len(nodes)} 个节点: {sel}")
+    return selector, nodes
+
+
+def _condition_holds(root, op):
+    condition = op.get('if')
+    if condition is None:
+        return True
+    compiled = _condition_cache.get(condition)
+    if compiled is None:
+        compiled = _condition_cache[condition] = etree.XPath(condition)
+    return bool(compiled(root))
+
+
+def _content(op):
+    return [copy.deepcopy(child) for child in op]
+
+
+def _append_text(node, text):
+    if len(node):
+        node[-1].tail = (node[-1].tail or '') + text
+    else:
+        node.text = (node.text or '') + text
+
+
+def _add(selector, node, op, content):
+    if selector.attr or selector.text:
+        raise XMLDiffError(f"add 的 sel 必须指向元素: {op.get('sel')}")
+    add_type = op.get('type')
+    if add_type:
+        if not add_type.startswith('@'):
+            raise XMLDiffError(f"不支持的 add type: {add_type}")
+        node.set(add_type[1:], op.text or '')
+        return
+    pos = op.get('pos')
+    if pos == 'before':
+        for child in content:
+            node.addprevious(child)
+    elif pos == 'after':
+        for child in reversed(content):
+            node.addnext(child)
+    elif pos == 'prepend':
+        for child in reversed(content):
+            node.insert(0, child)
+    else:
+        if op.text and op.text.strip() and not len(op):
+            _append_text(node, op.text)
+        node.extend(content)
+
+
+def _replace(selector, node, op, content):
+    if selector.attr:
+        if selector.attr not in node.attrib:
+            raise XMLDiffError(f"要替换的属性不存在: {op.get('sel')}")
+        node.set(selector.attr, op.text or '')
+        return
+    if selector.text:
+        node.text = op.text
+        return
+    parent = node.getparent()
+    if parent is None:
+        raise XMLDiffError(f"不能替换根节点: {op.get('sel')}")
+    tail = node.tail
+    for child in content:
+        node.addprevious(child)
+    parent.remove(node)
+    if content:
+        content[-1].tail = tail
+
+
+def _remove(selector, node, op):
+    if selector.attr:
+        if selector.attr not in node.attrib:
+            raise XMLDiffError(f"要删除的属性不存在: {op.get('sel')}")
+        del node.attrib[selector.attr]
+        return
+    if selector.text:
+        node.text = None
+        return
+    parent = node.getparent()
+    if parent is None:
+        raise XMLDiffError(f"不能删除根节点: {op.get('sel')}")
+    parent.remove(node)
+
+
+def _is_plain_append(op):
+    return op.tag == 'add' and op.get('pos') is None and op.get('type') is None and op.get('if') is None
+
+
+def Apply_Patch(original_node, patch_node):
+    """将 <diff> 补丁应用到 original_node 所在的文档 (原地修改)。
+
+    单个操作失败不会中断其余操作；全部应用后若有失败，抛出 XMLDiffError 汇总错误 (applied 为已执行的操作数)。
+    """
+    ops = [op for op in patch_node if isinstance(op.tag, str)]
+    errors = []
+    applied = 0
+    i = 0
+    while i < len(ops):
+        op = ops[i]
+        i += 1
+        try:
+            if op.tag not in ('add', 'replace', 'remove'):
+                raise XMLDiffError(f"未知的补丁操作 <{op.tag}>")
+            if not _condition_holds(original_node, op):
+                continue
+            selector, nodes = _targets(original_node, op)
+            batch = [op]
+            if op.tag == 'add':
+                # 合并后续同 sel 的追加操作，只定位一次目标节点
+                if _is_plain_append(op) and selector.stable and len(nodes) == 1:
+                    while i < len(ops) and ops[i].get('sel') == op.get('sel') and _is_plain_append(ops[i]):
+                        batch.append(ops[i])
+                        i += 1
+                for node in nodes:
+                    for batch_op in batch:
+                        _add(selector, node, batch_op, _content(batch_op))
+            elif op.tag == 'replace':
+                for node in nodes:
+                    _replace(selector, node, op, _content(op))
+            else:
+                for node in nodes:
+                    _remove(selector, node, op)
+            applied += len(batch)
+        except (XMLDiffError, etree.XPathError) as e:
+            errors.append(f"<{op.tag} sel=\"{op.get('sel')}\">: {e}")
+    if errors:
+        raise XMLDiffError("; ".join(errors), applied=applied)
+    return original_node
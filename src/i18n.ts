@@ -31,6 +31,92 @@ const i18n = createI18n({
 // 记录已加载的语言，避免重复请求
 const loadedLanguages = ['en']
 
+// 启动 / 切换语言时只加载模块与分组的翻译；物品 (wares) 与其他 (misc) 在界面首次用到时再加载
+const STARTUP_CATEGORIES = ['modules', 'groups']
+// 每种语言已加载 (或正在加载) 的分片类别；英文完整打包，无需分片
+const gameCategories = new Map<string, Map<string, Promise<void>>>()
+
+// 游戏数据语言包分片 (scripts/x4_locale_shards.py 生成)：共享字符串表 + 各语言的差异部分，文件名带内容哈希
+interface LocaleShardManifest {
+  version: number
+  categories: string[]
+  shared: Record<string, string>
+  languages: Record<string, Record<string, string>>
+}
+
+const SHARD_DIR = '/src/assets/x4_game_data/8.0-Diplomacy/locales/shards/'
+const shardFiles = import.meta.glob<Record<string, string | null>>(
+  ['@/assets/x4_game_data/8.0-Diplomacy/locales/shards/*.json', '!**/manifest.json'],
+  { import: 'default' }
+)
+let shardManifest: Promise<LocaleShardManifest> | null = null
+const shardCache = new Map<string, Promise<Record<string, string | null>>>()
+
+function loadShard(fileName: string) {
+  let shard = shardCache.get(fileName)
+  if (!shard) {
+    const loader = shardFiles[SHARD_DIR + fileName]
+    if (!loader) throw new Error(`Locale shard not found: ${fileName}`)
+    shard = loader()
+    shardCache.set(fileName, shard)
+  }
+  return shard
+}
+
+/**
+ * 按类别加载某种语言的游戏数据翻译：共享分片在语言之间复用，null 表示该语言缺少此 Key
+ */
+export async function loadGameMessages(lang: string, categories?: string[]) {
+  shardManifest ??= import('@/assets/x4_game_data/8.0-Diplomacy/locales/shards/manifest.json')
+    .then(module => module.default as LocaleShardManifest)
+  const manifest = await shardManifest
+  const files = manifest.languages[lang]
+  if (!files) throw new Error(`No locale shards for language: ${lang}`)
+  const wanted = categories ?? manifest.categories
+  const shards = await Promise.all(wanted.flatMap(category => [
+    loadShard(manifest.shared[category]),
+    loadShard(files[category])
+  ]))
+  const messages: Record<string, string> = {}
+  for (let i = 0; i < shards.length; i += 2) {
+    Object.assign(messages, shards[i])
+    for (const [key, text] of Object.entries(shards[i + 1])) {
+      if (text === null) delete messages[key]
+      else messages[key] = text
+    }
+  }
+  return messages
+}
+
+/**
+ * 该语言尚未加载 (或未开始加载) 的类别
+ */
+export function pendingGameCategories(lang: string, categories: string[]) {
+  if (lang === 'en') return []
+  const loaded = gameCategories.get(lang)
+  return categories.filter(category => !loaded?.has(category))
+}
+
+/**
+ * 按需加载某种语言的若干类别并合并到 i18n 消息中 (同一类别只请求一次)
+ */
+export function loadGameCategories(lang: string, categories: string[]) {
+  let loaded = gameCategories.get(lang)
+  if (!loaded) gameCategories.set(lang, (loaded = new Map()))
+  const missing = pendingGameCategories(lang, categories)
+  if (missing.length) {
+    const request = loadGameMessages(lang, missing).then(messages => {
+      i18n.global.mergeLocaleMessage(lang, messages)
+    })
+    request.catch(() => {
+      // 失败时允许下次重试
+      for (const category of missing) loaded!.delete(category)
+    })
+    for (const category of missing) loaded.set(category, request)
+  }
+  return Promise.all(categories.map(category => loaded!.get(category))).then(() => undefined)
+}
+
 /**
  * 切换语言并更新 HTML 属性
  */
@@ -71,7 +157,7 @@ export async function loadLanguageAsync(lang: string) {
   try {
     // A. 加载游戏数据 (Python 生成的，必然存在)
     // Vite 的 import 必须包含一部分静态路径以便静态分析
-    const gameMsg = (lang === 'en') ? { default: gameEn } : await import(`@/assets/x4_game_data/8.0-Diplomacy/locales/${lang}.json`);
+    const gameMsg = (lang === 'en') ? { default: gameEn } : { default: await loadGameMessages(lang, STARTUP_CATEGORIES) };
 
     // B. 加载 UI 数据 (可能不存在，需要容错)
     let uiMsg = {};
@@ -93,6 +179,9 @@ export async function loadLanguageAsync(lang: string) {
     })
 
     loadedLanguages.push(lang)
+    if (lang !== 'en') {
+      gameCategories.set(lang, new Map(STARTUP_CATEGORIES.map(category => [category, Promise.resolve()])))
+    }
     return setI18nLanguage(lang)
     
   } catch (error) {
@@ -1,4 +1,8 @@
 import type { SavedModule, X4Module, X4Ware } from '@/types/x4'
+import wareModulesRaw from '@/assets/x4_game_data/8.0-Diplomacy/data/ware_modules.json'
+
+// Python 预计算的 物品 -> 生产/消耗模块 邻接表
+const wareModules = wareModulesRaw as Record<string, { producers: string[]; consumers: string[] }>
 /**
  * 通用模块选择器
  * 逻辑: 来源池锁定(Pool Priority) -> 种族正交筛选(Race Filter) -> 权重排序(Sorter)
@@ -60,8 +64,11 @@ export function findBestProducer(
     return (m && isValidProducer(m)) ? [m] : [];
   });
 
-  // 准备 Pool B: 数据库模块
-  const dbCandidates = Object.values(modules).filter(isValidProducer);
+  // 准备 Pool B: 数据库模块 (查预计算的生产者索引，无需遍历全部模块)
+  const dbCandidates = (wareModules[wareId]?.producers ?? []).flatMap(id => {
+    const m = modules[id];
+    return (m && isValidProducer(m)) ? [m] : [];
+  });
 
   // 定义排序: 按该物资的产出量降序
   const sortByOutput = (a: X4Module, b: X4Module) => 
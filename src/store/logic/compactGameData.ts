@@ -0,0 +1,106 @@
+import type { X4Module, X4Ware } from '@/types/x4'
+
+/**
+ * 紧凑数据包 (game_data.compact.json) 结构 - 由 scripts/x4_compact.py 生成
+ * 列式布局: 物品 id 统一编号，低基数字段字典编码，
+ * buildCost / inputs / outputs 展平为 [物品序号, 数量, ...]
+ */
+export interface CompactGameData {
+  version: number
+  wareIds: string[]
+  enums: Record<string, string[]>
+  modules: {
+    id: string[]
+    wareId: string[]
+    nameId: string[]
+    name: string[]
+    buildTime: number[]
+    cycleTime: number[]
+    type: number[]
+    group: number[]
+    method: number[]
+    race: number[]
+    isPlayerBlueprint: number[]
+    workforce: [number, number, number][]
+    capacity: (number | null)[]
+    buildCost: number[][]
+    inputs: number[][]
+    outputs: number[][]
+  }
+  wares: {
+    id: number[]
+    nameId: string[]
+    name: string[]
+    price: number[]
+    volume: number[]
+    minPrice: number[]
+    maxPrice: number[]
+    group: number[]
+    transport: number[]
+  }
+}
+
+export type DecodedX4Module = X4Module & { isPlayerBlueprint: boolean }
+export type DecodedX4Ware = X4Ware & { group: string }
+
+function decodeWareAmounts(flat: number[], wareIds: string[]): Record<string, number> {
+  const map: Record<string, number> = {}
+  for (let i = 0; i < flat.length; i += 2) {
+    map[wareIds[flat[i]!]!] = flat[i + 1]!
+  }
+  return map
+}
+
+/**
+ * 还原为与 modules.json 相同的模块对象数组
+ */
+export function decodeModules(data: CompactGameData): DecodedX4Module[] {
+  const { wareIds, enums, modules: c } = data
+  const result: DecodedX4Module[] = []
+  for (let i = 0; i < c.id.length; i++) {
+    const [capacity, needed, maxBonus] = c.workforce[i]!
+    const module: DecodedX4Module = {
+      id: c.id[i]!,
+      wareId: c.wareId[i]!,
+      nameId: c.nameId[i]!,
+      name: c.name[i]!,
+      type: enums['module.type']![c.type[i]!]!,
+      group: enums['module.group']![c.group[i]!]!,
+      method: enums['module.method']![c.method[i]!]! as X4Module['method'],
+      race: enums['module.race']![c.race[i]!]!,
+      isPlayerBlueprint: c.isPlayerBlueprint[i] === 1,
+      buildTime: c.buildTime[i]!,
+      buildCost: decodeWareAmounts(c.buildCost[i]!, wareIds),
+      cycleTime: c.cycleTime[i]!,
+      workforce: { capacity, needed, maxBonus },
+      outputs: decodeWareAmounts(c.outputs[i]!, wareIds),
+      inputs: decodeWareAmounts(c.inputs[i]!, wareIds)
+    }
+    const storageCapacity = c.capacity[i]
+    if (storageCapacity !== null && storageCapacity !== undefined) module.capacity = storageCapacity
+    result.push(module)
+  }
+  return result
+}
+
+/**
+ * 还原为与 wares.json 相同的商品对象数组
+ */
+export function decodeWares(data: CompactGameData): DecodedX4Ware[] {
+  const { wareIds, enums, wares: c } = data
+  const result: DecodedX4Ware[] = []
+  for (let i = 0; i < c.id.length; i++) {
+    result.push({
+      id: wareIds[c.id[i]!]!,
+      nameId: c.nameId[i]!,
+      group: enums['ware.group']![c.group[i]!]!,
+      name: c.name[i]!,
+      transport: enums['ware.transport']![c.transport[i]!]! as X4Ware['transport'],
+      price: c.price[i]!,
+      volume: c.volume[i]!,
+      minPrice: c.minPrice[i]!,
+      maxPrice: c.maxPrice[i]!
+    })
+  }
+  return result
+}
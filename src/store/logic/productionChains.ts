@@ -0,0 +1,64 @@
+import productionChainsRaw from '@/assets/x4_game_data/8.0-Diplomacy/data/production_chains.json'
+
+// Python 预计算的生产链依赖图 (scripts/x4_production_graph.py)
+// 非 default 生产方式只包含与 default 不同的条目，查不到时回退到 default
+interface MethodChain {
+  order: string[] | null
+  cycles: string[][]
+  inputs: Record<string, Record<string, number>>
+  raw: Record<string, Record<string, number>>
+}
+
+interface ProductionChains {
+  version: number
+  methods: Record<string, MethodChain>
+  raceMethods: Record<string, string[]>
+}
+
+const chains = productionChainsRaw as ProductionChains
+const defaultChain = chains.methods['default']!
+
+function lookup(table: 'inputs' | 'raw', wareId: string, method: string) {
+  return chains.methods[method]?.[table][wareId] ?? defaultChain[table][wareId]
+}
+
+/** 每生产 1 单位物品所需的直接原料；基础资源返回 undefined */
+export function getDirectInputs(wareId: string, method = 'default'): Record<string, number> | undefined {
+  return lookup('inputs', wareId, method)
+}
+
+/** 每生产 1 单位物品所需的基础资源 (递归展开)；基础资源本身返回 { [wareId]: 1 } */
+export function getRawRequirements(wareId: string, method = 'default'): Record<string, number> | undefined {
+  const raw = lookup('raw', wareId, method)
+  if (raw) return raw
+  return getDirectInputs(wareId, method) ? undefined : { [wareId]: 1 }
+}
+
+/** 拓扑顺序 (原料在前) */
+export function getChainOrder(method = 'default'): string[] {
+  return chains.methods[method]?.order ?? defaultChain.order!
+}
+
+/** 存在循环依赖的物品组 */
+export function getChainCycles(method = 'default'): string[][] {
+  return chains.methods[method]?.cycles ?? defaultChain.cycles
+}
+
+/** 该种族生产模块实际使用的生产方式 */
+export function getRaceMethods(race: string): string[] {
+  return chains.raceMethods[race] ?? ['default']
+}
+
+/** 该种族补给产线中从 roots 可达的物品，按拓扑顺序 (原料在前) 排列；回收方式不参与补给产线 */
+export function getRaceChainOrder(race: string, roots: string[]): string[] {
+  const method = getRaceMethods(race).find(m => m !== 'recycling') ?? 'default'
+  const reachable = new Set<string>()
+  const stack = [...roots]
+  while (stack.length) {
+    const wareId = stack.pop()!
+    if (reachable.has(wareId)) continue
+    reachable.add(wareId)
+    stack.push(...Object.keys(getDirectInputs(wareId, method) ?? {}))
+  }
+  return getChainOrder(method).filter(w => reachable.has(w))
+}
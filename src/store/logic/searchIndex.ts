@@ -0,0 +1,164 @@
+// Python 预计算的模块搜索索引 (scripts/x4_search_index.py)，规范化与分词规则须与之保持一致
+export interface SearchIndex {
+  version: number
+  locale: string
+  fold: boolean
+  modules: string[]
+  groups: string[]
+  moduleGroups: number[]
+  postings: { m: Record<string, number[]>; g: Record<string, number[]> }
+}
+
+const INDEX_DIR = '/src/assets/x4_game_data/8.0-Diplomacy/locales/search/'
+const indexFiles = import.meta.glob<SearchIndex>('@/assets/x4_game_data/8.0-Diplomacy/locales/search/*.json', {
+  import: 'default'
+})
+const indexCache = new Map<string, Promise<SearchIndex | null>>()
+
+const PREFIX = 2
+const GRAM = 3
+const FOLD_MAP: Record<string, string> = { 'ß': 'ss', 'ł': 'l', 'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'đ': 'd', 'ı': 'i' }
+const CJK = '\u1100-\u11ff\u3040-\u30ff\u3130-\u318f\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff'
+const TOKEN = new RegExp(`[${CJK}]+|(?:(?![${CJK}])[\\p{L}\\p{N}])+`, 'gu')
+const CJK_CHAR = new RegExp(`^[${CJK}]`, 'u')
+
+/** 当前语言的搜索索引；没有索引文件时返回 null (回退到逐个扫描) */
+export function loadSearchIndex(locale: string): Promise<SearchIndex | null> {
+  let index = indexCache.get(locale)
+  if (!index) {
+    const loader = indexFiles[`${INDEX_DIR}${locale}.json`]
+    index = loader ? loader().catch(() => null) : Promise.resolve(null)
+    indexCache.set(locale, index)
+  }
+  return index
+}
+
+/** NFKC + 小写；fold 时去掉重音 (与 x4_search_index.normalize 相同) */
+export function normalize(text: string, fold: boolean): string {
+  text = text.normalize('NFKC').toLowerCase()
+  if (!fold) return text
+  return text.normalize('NFKD').replace(/\p{M}/gu, '').replace(/[ßłøæœđı]/g, c => FOLD_MAP[c]!)
+}
+
+const tokenCache = [new Map<string, string[]>(), new Map<string, string[]>()]
+
+export function tokenize(text: string, fold: boolean): string[] {
+  const cache = tokenCache[fold ? 1 : 0]!
+  let tokens = cache.get(text)
+  if (!tokens) {
+    tokens = normalize(text, fold).match(TOKEN) ?? []
+    cache.set(text, tokens)
+  }
+  return tokens
+}
+
+function isCjk(token: string) {
+  return CJK_CHAR.test(token)
+}
+
+function grams(token: string, n: number): string[] {
+  const result: string[] = []
+  for (let i = 0; i + n <= token.length; i++) result.push(token.slice(i, i + n))
+  return result
+}
+
+function queryKeys(token: string): string[] {
+  if (isCjk(token)) return token.length === 1 ? [token] : grams(token, 2)
+  return token.length <= PREFIX ? [token] : grams(token, GRAM)
+}
+
+function intersect(a: number[], b: number[]): number[] {
+  const result: number[] = []
+  let i = 0
+  let j = 0
+  while (i < a.length && j < b.length) {
+    if (a[i]! < b[j]!) i++
+    else if (a[i]! > b[j]!) j++
+    else {
+      result.push(a[i]!)
+      i++
+      j++
+    }
+  }
+  return result
+}
+
+/** 候选文档 (升序)：所有查询词的全部键的倒排表交集 */
+function lookup(postings: Record<string, number[]>, queryTokens: string[]): number[] {
+  const lists = queryTokens.flatMap(queryKeys).map(key => postings[key] ?? [])
+  lists.sort((a, b) => a.length - b.length)
+  return lists.slice(1).reduce((acc, list) => (acc.length ? intersect(acc, list) : acc), lists[0] ?? [])
+}
+
+const normCache = [new Map<string, string>(), new Map<string, string>()]
+
+/** query (已规范化) 是文本的子串，与无索引时的逐个扫描相同，只多了规范化 */
+export function matchesQuery(query: string, text: string, fold: boolean): boolean {
+  const cache = normCache[fold ? 1 : 0]!
+  let normalized = cache.get(text)
+  if (normalized === undefined) {
+    normalized = normalize(text, fold)
+    cache.set(text, normalized)
+  }
+  return normalized.includes(query)
+}
+
+/**
+ * 索引能否给出全部子串命中的候选：只有第一个查询词可能落在文本某个词的中间，
+ * 普通短词 (1-2 个字符) 在索引中只有前缀键，此时需回退到逐个扫描
+ */
+export function canUseIndex(queryTokens: string[]): boolean {
+  const first = queryTokens[0]
+  return first !== undefined && (isCjk(first) || first.length > PREFIX)
+}
+
+export interface SearchCandidates {
+  modules: string[]
+  groups: string[]
+}
+
+/** 索引中可能命中的模块 (modules.json 顺序) 与分组 (排序后的顺序)，需再用 matchesQuery 校验 */
+export function searchCandidates(index: SearchIndex, queryTokens: string[]): SearchCandidates {
+  return {
+    modules: lookup(index.postings.m, queryTokens).map(i => index.modules[i]!),
+    groups: lookup(index.postings.g, queryTokens).map(i => index.groups[i]!)
+  }
+}
+
+const groupMembers = new WeakMap<SearchIndex, Record<string, string[]>>()
+const groupRanks = new WeakMap<SearchIndex, Record<string, number>>()
+const moduleRanks = new WeakMap<SearchIndex, Record<string, number>>()
+
+/** 分组 -> 组内模块 (modules.json 顺序) */
+export function getGroupModules(index: SearchIndex): Record<string, string[]> {
+  let members = groupMembers.get(index)
+  if (!members) {
+    members = {}
+    index.moduleGroups.forEach((g, i) => {
+      if (g < 0) return
+      ;(members![index.groups[g]!] ??= []).push(index.modules[i]!)
+    })
+    groupMembers.set(index, members)
+  }
+  return members
+}
+
+/** 预先排好的分组顺序 (类型优先级 -> 分组优先级 -> id) */
+export function getGroupRank(index: SearchIndex): Record<string, number> {
+  let ranks = groupRanks.get(index)
+  if (!ranks) {
+    ranks = Object.fromEntries(index.groups.map((g, i) => [g, i]))
+    groupRanks.set(index, ranks)
+  }
+  return ranks
+}
+
+/** 模块在 modules.json 中的顺序 */
+export function getModuleRank(index: SearchIndex): Record<string, number> {
+  let ranks = moduleRanks.get(index)
+  if (!ranks) {
+    ranks = Object.fromEntries(index.modules.map((m, i) => [m, i]))
+    moduleRanks.set(index, ranks)
+  }
+  return ranks
+}
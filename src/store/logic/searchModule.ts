@@ -4,6 +4,17 @@ import type {
   GroupedModuleItem,
   ModuleGroupResult
 } from '../useStationStore'
+import {
+  type SearchIndex,
+  tokenize,
+  normalize,
+  matchesQuery,
+  canUseIndex,
+  searchCandidates,
+  getGroupModules,
+  getGroupRank,
+  getModuleRank
+} from './searchIndex'
 
 const TYPE_PRIORITY: Record<string, number> = {
   production: 1,
@@ -25,18 +36,31 @@ const GROUP_PRIORITY: Record<string, number> = {
  * @param currentLocale 当前语言环境
  * @param localizedModulesMap 本地化模块映射
  * @param localizedModuleGroupsMap 本地化模块组映射
+ * @param searchIndex 当前语言的搜索索引 (可选)，有索引时只校验索引给出的候选
  * @returns 按类型和优先级排序的分组模块结果
  */
 export function generateFilteredModulesGrouped(
   query: string,
   currentLocale: string,
   localizedModulesMap: Record<string, LocalizedX4Module>,
-  localizedModuleGroupsMap: Record<string, LocalizedX4ModuleGroup>
+  localizedModuleGroupsMap: Record<string, LocalizedX4ModuleGroup>,
+  searchIndex: SearchIndex | null = null
 ): ModuleGroupResult[] {
   const searchQuery = query.trim().toLowerCase()
   const isSearching = searchQuery.length > 0
   const isEn = currentLocale === 'en'
 
+  // 始终按整个查询的子串匹配 (有索引时先规范化、去重音)；索引只用来缩小候选范围，
+  // 查询以 1-2 个字符的普通词开头时索引无法覆盖词中间的片段，回退到逐个扫描
+  const fold = searchIndex?.fold ?? false
+  const normalizedQuery = isSearching && searchIndex ? normalize(searchQuery, fold) : searchQuery
+  const queryTokens = isSearching && searchIndex ? tokenize(searchQuery, fold) : []
+  const index = canUseIndex(queryTokens) ? searchIndex : null
+  const candidates = index ? searchCandidates(index, queryTokens) : null
+  const candidateGroups = candidates ? new Set(candidates.groups) : null
+  const hit = (text: string | undefined) =>
+    searchIndex ? matchesQuery(normalizedQuery, text || '', fold) : (text || '').toLowerCase().includes(searchQuery)
+
   const groups: Record<string, GroupedModuleItem[]> = {}
   const typeMetadata: Record<string, { displayLabel: string; isHit: boolean }> = {}
 
@@ -44,24 +68,21 @@ export function generateFilteredModulesGrouped(
   Object.keys(localizedModuleGroupsMap).forEach(typeId => {
     const mg = localizedModuleGroupsMap[typeId]
     if (!mg) return
-    const name = (mg.name || '').toLowerCase()
-    const id = (mg.id || '').toLowerCase()
-    const localeName = (mg.localeName || '').toLowerCase()
     let isHit = false
     let displayLabel = mg.localeName
 
-    if (isSearching) {
+    if (isSearching && (!candidateGroups || candidateGroups.has(typeId))) {
       if (isEn) {
         // EN 模式：仅匹配 id 或 name
-        const idHit = id.includes(searchQuery)
-        const nameHit = name.includes(searchQuery)
+        const idHit = hit(mg.id)
+        const nameHit = hit(mg.name)
         isHit = idHit || nameHit
         if (idHit && !nameHit) displayLabel += ` (${mg.id})`
       } else {
         // 非 EN 模式：匹配 id, name 或 localeName
-        const localeHit = localeName.includes(searchQuery)
-        const nameHit = name.includes(searchQuery)
-        const idHit = id.includes(searchQuery)
+        const localeHit = hit(mg.localeName)
+        const nameHit = hit(mg.name)
+        const idHit = hit(mg.id)
         isHit = localeHit || nameHit || idHit
 
         if (!localeHit) {
@@ -74,19 +95,29 @@ export function generateFilteredModulesGrouped(
     typeMetadata[typeId] = { displayLabel, isHit }
   })
 
-  // 2. 遍历模块，结合类型命中状态进行级联过滤
-  Object.values(localizedModulesMap).forEach(m => {
-    const localeName = (m.localeName || '').toLowerCase()
-    const originalName = (m.name || '').toLowerCase()
-    const id = (m.id || '').toLowerCase()
-
+  // 2. 遍历模块 (有索引时只遍历候选模块与命中分组的模块)，结合类型命中状态进行级联过滤
+  let moduleList = Object.values(localizedModulesMap)
+  if (index && candidates) {
+    const ids = new Set(candidates.modules)
+    const members = getGroupModules(index)
+    Object.keys(typeMetadata).forEach(typeId => {
+      if (typeMetadata[typeId]?.isHit) members[typeId]?.forEach(id => ids.add(id))
+    })
+    const rank = getModuleRank(index)
+    moduleList = [...ids]
+      .sort((a, b) => rank[a]! - rank[b]!)
+      .map(id => localizedModulesMap[id])
+      .filter((m): m is LocalizedX4Module => !!m)
+  }
+
+  moduleList.forEach(m => {
     const typeInfo = typeMetadata[m.group] || { displayLabel: m.group, isHit: false }
 
     let moduleHit = false
     if (isEn) {
-      moduleHit = id.includes(searchQuery) || originalName.includes(searchQuery)
+      moduleHit = hit(m.id) || hit(m.name)
     } else {
-      moduleHit = localeName.includes(searchQuery) || originalName.includes(searchQuery) || id.includes(searchQuery)
+      moduleHit = hit(m.localeName) || hit(m.name) || hit(m.id)
     }
 
     const isMatch = !isSearching || typeInfo.isHit || moduleHit
@@ -94,9 +125,9 @@ export function generateFilteredModulesGrouped(
     if (isMatch) {
       let label = m.localeName
       if (isSearching) {
-        const localeHit = !isEn && localeName.includes(searchQuery)
-        const nameHit = originalName.includes(searchQuery)
-        const idHit = id.includes(searchQuery)
+        const localeHit = !isEn && hit(m.localeName)
+        const nameHit = hit(m.name)
+        const idHit = hit(m.id)
 
         if (isEn) {
           if (idHit && !nameHit) label += ` (${m.id})`
@@ -116,8 +147,18 @@ export function generateFilteredModulesGrouped(
     }
   })
 
+  const groupRank = searchIndex ? getGroupRank(searchIndex) : null
   return Object.keys(groups)
     .sort((a, b) => {
+      // 0. 索引中预先排好的分组顺序 (不在索引中的分组排在后面)
+      const rankA = groupRank?.[a]
+      const rankB = groupRank?.[b]
+      if (rankA !== undefined || rankB !== undefined) {
+        if (rankA === undefined) return 1
+        if (rankB === undefined) return -1
+        return rankA - rankB
+      }
+
       const typeA = localizedModuleGroupsMap[a]?.type || a
       const typeB = localizedModuleGroupsMap[b]?.type || b
 
@@ -5,11 +5,15 @@ import { useX4I18n } from '@/utils/UseX4I18n'
 import { loadLanguageAsync } from '@/i18n'
 import type { X4Module, X4Ware, X4ModuleGroup, RaceMedicalConsumption } from '@/types/x4'
 
-// 静态导入游戏数据
-import waresRaw from '@/assets/x4_game_data/8.0-Diplomacy/data/wares.json'
-import ModulesRaw from '@/assets/x4_game_data/8.0-Diplomacy/data/modules.json'
+// 静态导入游戏数据 (modules / wares 使用列式紧凑数据包，体积与解析耗时更小)
+import compactGameData from '@/assets/x4_game_data/8.0-Diplomacy/data/game_data.compact.json'
+import { decodeModules, decodeWares, type CompactGameData } from './compactGameData'
 import moduleGroupsRaw from '@/assets/x4_game_data/8.0-Diplomacy/data/module_groups.json'
 import consumptionRaw from '@/assets/x4_game_data/8.0-Diplomacy/data/consumption.json'
+import { loadSearchIndex, type SearchIndex } from './searchIndex'
+
+const waresRaw = decodeWares(compactGameData as unknown as CompactGameData)
+const ModulesRaw = decodeModules(compactGameData as unknown as CompactGameData)
 // --- 类型导出 ---
 export type LocalizedX4Module = X4Module & { localeName: string }
 export type LocalizedX4ModuleGroup = X4ModuleGroup & { localeName: string }
@@ -20,6 +24,7 @@ export interface GameDataState {
   localizedModulesMap: Ref<Record<string, LocalizedX4Module>>
   localizedModuleGroupsMap: Ref<Record<string, LocalizedX4ModuleGroup>>
   medicalConsumptionMap: Ref<RaceMedicalConsumption>
+  searchIndex: Ref<SearchIndex | null>
 }
 
 /**
@@ -39,6 +44,7 @@ export function useGameData(): GameDataState & { initialize: () => Promise<void>
   const localizedModulesMap = ref<Record<string, LocalizedX4Module>>({})
   const localizedModuleGroupsMap = ref<Record<string, LocalizedX4ModuleGroup>>({})
   const medicalConsumptionMap = ref<RaceMedicalConsumption>({})
+  const searchIndex = ref<SearchIndex | null>(null)
   /**
    * 构建 Wares 基础映射
    * 确保每个 Ware 对象都具有必要的默认值
@@ -131,8 +137,9 @@ export function useGameData(): GameDataState & { initialize: () => Promise<void>
    * 完整初始化：一次性执行所有 Map 构建和数据预热
    */
   async function initialize() {
-    // 加载语言包
-    await loadLanguageAsync(currentLocale.value)
+    // 加载语言包与搜索索引
+    const [, index] = await Promise.all([loadLanguageAsync(currentLocale.value), loadSearchIndex(currentLocale.value)])
+    searchIndex.value = index
 
     // 构建基础 Map
     buildWaresMap()
@@ -151,7 +158,8 @@ export function useGameData(): GameDataState & { initialize: () => Promise<void>
   watch(
     () => currentLocale.value,
     async (newLang) => {
-      await loadLanguageAsync(newLang)
+      const [, index] = await Promise.all([loadLanguageAsync(newLang), loadSearchIndex(newLang)])
+      searchIndex.value = index
       prepareLocalizedModules()
       prepareLocalizedModuleGroups()
     }
@@ -164,6 +172,7 @@ export function useGameData(): GameDataState & { initialize: () => Promise<void>
     localizedModulesMap,
     localizedModuleGroupsMap,
     medicalConsumptionMap,
+    searchIndex,
     initialize,
     currentLocale
   }
@@ -1,5 +1,6 @@
 import type { X4Module, X4Ware } from '@/types/x4'
 import { findBestProducer } from './bestModuleSelector'
+import { getRaceChainOrder } from './productionChains'
 import consumptionRaw from '@/assets/x4_game_data/8.0-Diplomacy/data/consumption.json'
 
 // --- 私有辅助函数：递归计算单单位物资的工人成本 ---
@@ -76,6 +77,11 @@ export function calculateSustainMultiplier(
   // 获取种族消耗数据
   const raceData = (consumptionRaw as any)[raceKey] || (consumptionRaw as any)['default'];
   const consumptionRates = raceData?.wares || raceData || {};
+
+  // 只对工人消耗品可达的物资，按预计算的拓扑顺序 (原料在前) 填充缓存，之后每次计算只需查原料的缓存，不再逐层递归
+  for (const wareId of getRaceChainOrder(raceKey, Object.keys(consumptionRates))) {
+    _getRecursiveWorkforceCost(wareId, raceKey, modulesMap, waresMap, useEfficiency, cache, visited);
+  }
   
   let R = 0;
 
@@ -124,21 +130,25 @@ export function calculateWorkerSupplyNeeds(
 
   let currentTotalWorkers = Math.ceil(targetWorkerCount * M);
   let finalModules: Record<string, number> = {};
+
+  // 产品在前的拓扑顺序：处理到某物资时，它的所有消费者都已处理完，缺口一次汇总到位
+  const raceData = (consumptionRaw as any)[raceKey] || (consumptionRaw as any)['default'];
+  const consumptionRates = raceData?.wares || raceData || {};
+  const demandOrder = [...getRaceChainOrder(raceKey, Object.keys(consumptionRates))].reverse();
   
   // 2. 收敛循环
   for (let iter = 0; iter < 5; iter++) {
     const tempModules: Record<string, number> = {};
     const productionState: Record<string, number> = {};
+    for (const wareId of demandOrder) productionState[wareId] = 0;
     
     // A. 初始化需求
-    const raceData = (consumptionRaw as any)[raceKey] || (consumptionRaw as any)['default'];
-    const consumptionRates = raceData?.wares || raceData || {};
-    
     for (const [ware, amount] of Object.entries(consumptionRates)) {
       productionState[ware] = (productionState[ware] || 0) - (currentTotalWorkers * (amount as number) * 3600);
     }
 
     // B. 产业链求解
+    // 按 demandOrder 一轮即可补齐；不在预计算图中的物资由后续轮次兜底
     let hasDeficit = true;
     let loopGuard = 0;
     
@@ -146,7 +156,8 @@ export function calculateWorkerSupplyNeeds(
       hasDeficit = false;
       loopGuard++;
       
-      for (const [wareId, amount] of Object.entries(productionState)) {
+      for (const wareId of Object.keys(productionState)) {
+        const amount = productionState[wareId]!;
         if (amount >= -0.001) continue;
         
         const deficit = Math.abs(amount);
@@ -88,7 +88,8 @@ export const useStationStore = defineStore('station', () => {
       searchQuery.value,
       gameData.currentLocale.value,
       localizedModulesMap.value,
-      localizedModuleGroupsMap.value
+      localizedModuleGroupsMap.value,
+      gameData.searchIndex.value
     )
   })
 
@@ -2,12 +2,16 @@ import { useI18n } from 'vue-i18n';
 import type { X4Module, X4Ware, X4ModuleGroup } from '../types/x4';
 import { useStatusStore } from '../store/useStatusStore';
 import { ref } from 'vue';
+import { loadGameCategories, pendingGameCategories } from '../i18n';
 
 // 仅修改数据结构：使用 Map 存储 ID 到 NameId 的映射
 const missingKeys = ref(new Map<string, string>());
 
+// 翻译类别 -> 游戏语言包分片 (未归类的 Key 在 misc 中)
+const CATEGORY_SHARDS = { module: 'modules', ware: 'wares', type: 'groups' } as const;
+
 export function useX4I18n() {
-  const { t, te } = useI18n();
+  const { t, te, locale } = useI18n();
   const statusStore = useStatusStore();
 
   const translate = (id: string, nameId: string, category: 'module' | 'ware' | 'type'): string => {
@@ -15,6 +19,13 @@ export function useX4I18n() {
       return t(nameId);
     }
 
+    // 该类别的分片尚未加载：按需加载，完成后消息更新，组件自动重新渲染；加载期间显示英文
+    const pending = pendingGameCategories(locale.value, [CATEGORY_SHARDS[category], 'misc']);
+    if (pending.length) {
+      loadGameCategories(locale.value, pending).catch(e => console.error(`[i18n] Failed to load ${pending.join(', ')}`, e));
+      return te(nameId, 'en') ? t(nameId) : id;
+    }
+
     // 仅修改记录逻辑：记录 ID 和缺失的 nameId 的对应关系
     if (nameId && !missingKeys.value.has(id)) {
       missingKeys.value.set(id, nameId);